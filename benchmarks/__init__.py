@@ -0,0 +1 @@
+"""Microbenchmarks for the newsletter's size-dependent hot paths (see run.py)."""
@@ -0,0 +1,81 @@
+"""Deterministic synthetic inputs shaped like real feed entries."""
+
+import random
+import datetime
+
+WORDS = (
+    "model agent launch startup research chip cloud data privacy robot vision "
+    "language open source funding policy benchmark training inference team "
+    "release platform update security enterprise developer tool video"
+).split()
+AI_WORDS = ("AI", "OpenAI", "LLM", "GPT", "machine learning", "neural", "Claude", "Gemini")
+SOURCES = ("TechCrunch", "The Verge", "Reuters", "Wired", "Ars Technica", "VentureBeat", "Bloomberg")
+TAGS = ("<p>", "</p>", "<b>", "</b>", '<a href="https://example.com/x">', "</a>", "&amp;", "&quot;", "&#39;")
+
+
+def _rng(seed):
+    return random.Random(seed)
+
+
+def titles(n, seed=0, ai_share=0.5):
+    """Headlines; about ai_share of them mention an AI term."""
+    rng = _rng(seed)
+    out = []
+    for i in range(n):
+        words = rng.sample(WORDS, rng.randint(5, 10))
+        if rng.random() < ai_share:
+            words.insert(rng.randrange(len(words)), rng.choice(AI_WORDS))
+        out.append(f"{' '.join(words).capitalize()} {i}")
+    return out
+
+
+def raw_titles(n, seed=0):
+    """Google News style 'Headline - Source' titles, some with dashes inside."""
+    rng = _rng(seed)
+    return [
+        f"{title}{' - update' if rng.random() < 0.2 else ''} - {rng.choice(SOURCES)}"
+        for title in titles(n, seed)
+    ]
+
+
+def summaries(n, seed=0):
+    """HTML-laden RSS summaries of varying length, some over the 300 char cap."""
+    rng = _rng(seed)
+    out = []
+    for _ in range(n):
+        parts = []
+        for _ in range(rng.randint(10, 80)):
+            parts.append(rng.choice(WORDS))
+            if rng.random() < 0.2:
+                parts.append(rng.choice(TAGS))
+        out.append(' '.join(parts))
+    return out
+
+
+def news_items(n, seed=0, duplicate_share=0.3):
+    """News item dicts; duplicate_share of them are light rewrites of earlier titles."""
+    rng = _rng(seed)
+    base = titles(n, seed)
+    items = []
+    for i, title in enumerate(base):
+        if items and rng.random() < duplicate_share:
+            title = rng.choice(items)['title'].replace(' ', '  ', 1) + ' (updated)'
+        items.append({
+            'title': title,
+            'link': f"https://news.example.com/{i}",
+            'published': f"2026-03-{1 + i % 28:02d}T07:00:00",
+            'summary': 'No summary available.',
+            'source': rng.choice(SOURCES),
+        })
+    return items
+
+
+def history(n, seed=0):
+    """A content history holding n published titles."""
+    from newsletter.history import record_published
+
+    when = datetime.datetime(2026, 3, 1)
+    hist = {'published_titles': {}, 'last_updated': None}
+    for title in titles(n, seed + 1):
+        record_published(title, hist, when=when)
+    return hist
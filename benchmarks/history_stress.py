@@ -0,0 +1,94 @@
+"""Stress the content history with many concurrent writer and reader processes.
+
+    python -m benchmarks.history_stress                 # 32 writers x 20 saves
+    python -m benchmarks.history_stress --writers 64 --saves 50
+
+Each writer repeatedly loads the shared history, records titles of its own
+and saves. Readers load in a tight loop and fail on any partial or
+unreadable snapshot. At the end every title recorded by every writer must
+be in the file; otherwise the command exits with status 1.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import multiprocessing
+
+# Keep stress runs out of the run log
+os.environ.setdefault('NEWSLETTER_LOG_LEVEL', 'WARNING')
+
+from newsletter import history  # noqa: E402
+
+
+def _writer(path, writer, saves, titles_per_save):
+    history.HISTORY_FILE = path
+    for i in range(saves):
+        hist = history.load_history()
+        for j in range(titles_per_save):
+            history.record_published(f"writer {writer} save {i} title {j}", hist, "news",
+                                     url=f"https://example.com/{writer}/{i}/{j}")
+        history.save_history(hist)
+
+
+def _reader(path, stop, errors):
+    history.HISTORY_FILE = path
+    while not stop.is_set():
+        if not os.path.exists(path):
+            continue
+        with open(path) as f:
+            text = f.read()
+        try:
+            json.loads(text)
+        except ValueError:
+            errors.value += 1
+
+
+def run(writers, saves, titles_per_save, readers):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'content_history.json')
+        stop = multiprocessing.Event()
+        errors = multiprocessing.Value('i', 0)
+        reader_procs = [multiprocessing.Process(target=_reader, args=(path, stop, errors)) for _ in range(readers)]
+        writer_procs = [multiprocessing.Process(target=_writer, args=(path, w, saves, titles_per_save))
+                        for w in range(writers)]
+        started = time.perf_counter()
+        for p in reader_procs + writer_procs:
+            p.start()
+        for p in writer_procs:
+            p.join()
+        elapsed = time.perf_counter() - started
+        stop.set()
+        for p in reader_procs:
+            p.join()
+
+        history.HISTORY_FILE = path
+        final = history.load_history()
+        expected = writers * saves * titles_per_save
+        missing = sum(
+            1 for w in range(writers) for i in range(saves) for j in range(titles_per_save)
+            if not history.was_published(f"writer {w} save {i} title {j}", final)
+        )
+        failed = sum(1 for p in writer_procs if p.exitcode != 0)
+
+    print(f"{writers} writers x {saves} saves in {elapsed:.2f}s "
+          f"({writers * saves / elapsed:.0f} saves/s), {readers} readers")
+    print(f"titles: {expected - missing}/{expected} present, {missing} lost; "
+          f"unreadable snapshots: {errors.value}; failed writers: {failed}")
+    return missing == 0 and errors.value == 0 and failed == 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.history_stress', description=__doc__.split('\n')[0])
+    parser.add_argument('--writers', type=int, default=32, help="Concurrent writer processes")
+    parser.add_argument('--saves', type=int, default=20, help="Saves per writer")
+    parser.add_argument('--titles', type=int, default=3, help="Titles recorded per save")
+    parser.add_argument('--readers', type=int, default=4, help="Concurrent reader processes")
+    args = parser.parse_args(argv)
+    return 0 if run(args.writers, args.saves, args.titles, args.readers) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
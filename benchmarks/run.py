@@ -0,0 +1,264 @@
+"""Run the microbenchmarks and compare them against stored baselines.
+
+    python -m benchmarks.run                      # all benchmarks, all sizes
+    python -m benchmarks.run --max-size 1000      # quick pass
+    python -m benchmarks.run -k dedup             # only matching benchmarks
+    python -m benchmarks.run --update-baseline    # record new baselines
+
+Each benchmark processes n synthetic items (n = 10^2 .. 10^5) and reports
+items per second (best of several timed runs) and the peak memory
+allocated during one run, measured separately with tracemalloc (skipped
+for runs longer than MAX_TRACE_SECONDS, which tracing would slow down
+several times over).
+
+Speeds are compared as multiples of a fixed pure-Python calibration loop
+timed at startup, so benchmarks/baselines.json holds no machine-specific
+absolute numbers. A result more than --threshold worse than its baseline
+is a regression and makes the command exit with status 1.
+"""
+
+import os
+import sys
+import gc
+import json
+import random
+import time
+import argparse
+import tracemalloc
+
+# Keep benchmark runs out of the run log
+os.environ.setdefault('NEWSLETTER_LOG_LEVEL', 'WARNING')
+
+from newsletter.fetchers import is_ai_relevant, _clean_summary, _extract_source  # noqa: E402
+from newsletter.dedup import deduplicate_news  # noqa: E402
+from newsletter.history import was_published, record_published  # noqa: E402
+from newsletter.formatter import DocFormatter  # noqa: E402
+from newsletter.content_pools import generate_why_it_matters  # noqa: E402
+
+from . import generators as gen  # noqa: E402
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), 'baselines.json')
+SIZES = (100, 1_000, 10_000, 100_000)
+MIN_SAMPLE_SECONDS = 0.05
+MAX_BENCH_SECONDS = 2.0  # stop repeating once a size has taken this long
+REPEAT = 5
+ALLOCATION_SLACK_BYTES = 4096  # absolute tolerance for tiny peaks
+MAX_TRACE_SECONDS = 1.0  # only trace allocations of runs faster than this
+CALIBRATION_ITEMS = 10_000
+
+
+def bench_is_ai_relevant(n):
+    pairs = list(zip(gen.titles(n), gen.summaries(n)))
+    return lambda: [is_ai_relevant(t, s) for t, s in pairs]
+
+
+def bench_clean_summary(n):
+    raw = gen.summaries(n)
+    return lambda: [_clean_summary(s) for s in raw]
+
+
+def bench_extract_source(n):
+    raw = gen.raw_titles(n)
+    return lambda: [_extract_source(t) for t in raw]
+
+
+def bench_deduplicate_news(n):
+    items = gen.news_items(n)
+    return lambda: deduplicate_news(items)
+
+
+def bench_was_published(n):
+    hist = gen.history(n)
+    published = [v['title'] for v in hist['published_titles'].values()]
+    queries = [t for pair in zip(published, gen.titles(n, seed=7)) for t in pair][:n]
+    return lambda: [was_published(t, hist) for t in queries]
+
+
+def bench_record_published(n):
+    titles = gen.titles(n)
+
+    def run():
+        hist = {'published_titles': {}}
+        for title in titles:
+            record_published(title, hist)
+    return run
+
+
+def _format_titles(titles):
+    fmt = DocFormatter()
+    for i, title in enumerate(titles):
+        if i % 3 == 0:
+            fmt.add_bold_text(title)
+        elif i % 3 == 1:
+            fmt.add_link(title, f"https://example.com/{i}")
+        else:
+            fmt.add_text(title)
+        fmt.add_newline()
+    return fmt
+
+
+def bench_build_requests(n):
+    # Includes the json.dumps googleapiclient applies to a request body
+    fmt = _format_titles(gen.titles(n))
+    return lambda: json.dumps({'requests': fmt.build_requests()})
+
+
+def bench_build_payload(n):
+    fmt = _format_titles(gen.titles(n))
+    return fmt.build_payload
+
+
+def bench_why_it_matters(n):
+    pairs = list(zip(gen.titles(n), gen.summaries(n)))
+    return lambda: [generate_why_it_matters(t, s, "Reuters") for t, s in pairs]
+
+
+# name -> (setup, largest size); deduplicate_news is quadratic by design
+BENCHMARKS = {
+    'is_ai_relevant': (bench_is_ai_relevant, 100_000),
+    'clean_summary': (bench_clean_summary, 100_000),
+    'extract_source': (bench_extract_source, 100_000),
+    'deduplicate_news': (bench_deduplicate_news, 1_000),
+    'was_published': (bench_was_published, 100_000),
+    'record_published': (bench_record_published, 100_000),
+    'build_requests': (bench_build_requests, 100_000),
+    'build_payload': (bench_build_payload, 100_000),
+    'why_it_matters': (bench_why_it_matters, 100_000),
+}
+
+
+def calibration(n):
+    """A fixed mix of string, dict and sorting work that stands in for interpreter speed."""
+    rng = random.Random(0)
+    words = [''.join(rng.choice('abcdefghij') for _ in range(8)) for _ in range(n)]
+
+    def run():
+        counts = {}
+        for word in words:
+            key = word[:3].upper()
+            counts[key] = counts.get(key, 0) + len(word)
+        return sorted(counts.items(), key=lambda kv: kv[1])
+    return run
+
+
+def measure(run, n, trace=True):
+    """Return {'ops_per_sec', 'peak_bytes'} for a callable processing n items.
+
+    The first (calibration) samples double as the warm-up; best-of-REPEAT
+    discards them if they were slow. peak_bytes is None if trace is false
+    or one run takes longer than MAX_TRACE_SECONDS.
+    """
+    loops = 1
+    started = time.perf_counter()
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SAMPLE_SECONDS or loops >= 1 << 20:
+            break
+        loops *= 2
+
+    best = elapsed / loops
+    gc.disable()
+    try:
+        for _ in range(REPEAT - 1):
+            if time.perf_counter() - started > MAX_BENCH_SECONDS:
+                break
+            start = time.perf_counter()
+            for _ in range(loops):
+                run()
+            best = min(best, (time.perf_counter() - start) / loops)
+    finally:
+        gc.enable()
+
+    peak = None
+    if trace and best <= MAX_TRACE_SECONDS:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {'ops_per_sec': round(n / best, 1), 'peak_bytes': peak}
+
+
+def compare(key, result, baseline, threshold):
+    """Return a list of regression messages for one result."""
+    problems = []
+    if result['relative'] < baseline['relative'] * (1 - threshold):
+        problems.append(
+            f"{key}: {result['relative']:.4g}x calibration vs baseline {baseline['relative']:.4g}x"
+        )
+    if result['peak_bytes'] is None or baseline.get('peak_bytes') is None:
+        return problems
+    allowed = baseline['peak_bytes'] * (1 + threshold) + ALLOCATION_SLACK_BYTES
+    if result['peak_bytes'] > allowed:
+        problems.append(
+            f"{key}: peak {result['peak_bytes']:,} B vs baseline {baseline['peak_bytes']:,} B"
+        )
+    return problems
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Newsletter microbenchmarks")
+    parser.add_argument('-k', dest='pattern', help="Only run benchmarks whose name contains this")
+    parser.add_argument('--max-size', type=int, default=SIZES[-1], help="Largest input size to run")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="Allowed fractional regression before failing (default 0.25)")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="Baseline file")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="Store these results as the new baselines instead of comparing")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+
+    results = {}
+    regressions = []
+    reference = measure(calibration(CALIBRATION_ITEMS), CALIBRATION_ITEMS, trace=False)['ops_per_sec']
+    print(f"Calibration loop: {reference:,.0f} ops/s\n")
+    print(f"{'benchmark':<28}{'n':>9}{'ops/s':>16}{'peak KiB':>12}{'vs base':>10}")
+    for name, (setup, largest) in BENCHMARKS.items():
+        if args.pattern and args.pattern not in name:
+            continue
+        for n in SIZES:
+            if n > min(largest, args.max_size):
+                break
+            key = f"{name}@{n}"
+            measured = measure(setup(n), n)
+            result = {'relative': round(measured['ops_per_sec'] / reference, 4),
+                      'peak_bytes': measured['peak_bytes']}
+            results[key] = result
+            baseline = baselines.get(key)
+            ratio = f"{result['relative'] / baseline['relative']:.2f}x" if baseline else '-'
+            peak = f"{measured['peak_bytes'] / 1024:,.1f}" if measured['peak_bytes'] is not None else '-'
+            print(f"{name:<28}{n:>9}{measured['ops_per_sec']:>16,.0f}{peak:>12}{ratio:>10}")
+            if baseline and not args.update_baseline:
+                regressions += compare(key, result, baseline, args.threshold)
+
+    if args.update_baseline:
+        baselines.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(dict(sorted(baselines.items())), f, indent=2)
+            f.write('\n')
+        print(f"Updated {len(results)} baselines in {args.baseline}")
+        return 0
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for problem in regressions:
+            print(f"  {problem}")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
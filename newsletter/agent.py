@@ -2,15 +2,14 @@
 
 import os
 import json
+import uuid
 import datetime
 import random
-
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from . import config
-from .history import load_history, save_history, record_published
-from .fetchers import fetch_ai_news
+from .history import load_history, save_history, record_published, content_fingerprint, INDEXES
+from .fetchers import fetch_ai_news, replaying, wait_for_downloads
 from .content_pools import (
     fetch_ai_tools,
     fetch_youtube_video,
@@ -19,47 +18,172 @@ from .content_pools import (
     generate_why_it_matters,
     FALLBACK_TOOLS,
 )
-from .formatter import DocFormatter
-from .gdoc import clear_document, write_to_doc
-
-
-def _log(message, level="INFO"):
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{level}] {timestamp} - {message}")
+from .sections import render_section, render_sections, assemble, save_render_cache, render_cache_stats
+from .gdoc import clear_document, write_to_doc, publish_staged, rollback, payload_stats
+from .auth import start_client_init, AuthError
+from .ratelimit import rate_limit_stats
+from .feed_registry import save_registry
+from .ingest import save_index, ingest_stats
+from .feed_health import save_health, health_table
+from .resolver import save_url_cache, resolver_stats, start_run as start_resolution_run
+from .hedging import hedge_stats
+from .urls import item_url
+from .snapshots import save_snapshots, staleness_report
+from .profiling import RunProfiler
+from . import archive
+from . import checkpoints
+from .checkpoints import STAGES
+from .log import get_logger, bind_context, in_context
+
+
+logger = get_logger(__name__)
+
+# Sections in document order, each with the content attribute it shows (if any)
+SECTIONS = [
+    ('title', None),
+    ('headline', 'news_items'),
+    ('welcome', None),
+    ('main_story', 'news_items'),
+    ('prompt_tip', 'prompt_tip'),
+    ('tools', 'ai_tools'),
+    ('quick_hits', 'news_items'),
+    ('video', 'youtube_video'),
+    ('insights', 'insights'),
+    ('footer', None),
+]
 
 
 class NewsletterAgent:
-    def __init__(self):
-        _log("Initializing Newsletter Agent")
+    def __init__(self, now=None, history=None, offline=False, profiler=None, dry_run=None):
+        """Set up the agent.
+
+        now and history default to the current time and the saved history;
+        the backfill passes past dates and an as-of history instead.
+        offline=True skips the Google Docs client so the agent can only
+        select and render content. profiler defaults to one configured
+        from the NEWSLETTER_PROFILE* environment variables.
+        dry_run is a file path: run() then writes the Docs payload there
+        instead of publishing, and needs no credentials. A dry run saves no
+        state (feed registry, snapshots, watermarks, caches, checkpoints).
+        """
+        logger.info("Initializing Newsletter Agent")
+        self.profiler = profiler or RunProfiler.from_env()
+        self.now = now or datetime.datetime.now()
+        self.today = self.now.strftime("%A, %B %d, %Y")
+        self.history = load_history() if history is None else history
+        self.edition = checkpoints.edition_key(self.now)
+        self.specs = None
+        self.fragments = None  # section name -> fragment, when rendered while fetching
+
+        self.dry_run = dry_run
+        self._docs_service = None
+        self._client_future = None
+        self.doc_id = None
+        if offline or dry_run:
+            return
+
         creds_json = os.environ.get('GOOGLE_CREDENTIALS')
         self.doc_id = os.environ.get('DOCUMENT_ID')
 
         if not creds_json or not self.doc_id:
-            _log("Missing environment variables. Set GOOGLE_CREDENTIALS and DOCUMENT_ID.", "ERROR")
+            logger.error("Missing environment variables. Set GOOGLE_CREDENTIALS and DOCUMENT_ID.")
             raise ValueError("Missing required environment variables")
 
-        try:
-            creds_dict = json.loads(creds_json)
-            creds = service_account.Credentials.from_service_account_info(
-                creds_dict,
-                scopes=['https://www.googleapis.com/auth/documents'],
-            )
-            self.docs_service = build('docs', 'v1', credentials=creds)
-            _log("Google Docs API client initialized")
-        except Exception as e:
-            _log(f"Failed to initialize Google Docs API client: {e}", "ERROR")
-            raise
-
-        self.today = datetime.datetime.now().strftime("%A, %B %d, %Y")
-        self.history = load_history()
+        # Client setup and the access preflight run while feeds are fetched
+        self._client_future = start_client_init(
+            creds_json, self.doc_id, check_access=config.DOCS_PREFLIGHT,
+        )
+
+    @property
+    def docs_service(self):
+        """The Google Docs client, waiting for background initialization if needed."""
+        if self._docs_service is None and self._client_future is not None:
+            try:
+                self._docs_service = self._client_future.result()
+            except AuthError as e:
+                logger.error("Failed to initialize Google Docs API client: %s", e)
+                raise
+            logger.info("Google Docs API client initialized")
+        return self._docs_service
+
+    def _check_client(self):
+        """Abort the run early if background client initialization has already failed."""
+        future = self._client_future
+        if future is not None and future.done() and future.exception() is not None:
+            self.docs_service  # re-raises with logging
+
+    def _fetch_sources(self):
+        """Fetch each content source in turn, yielding its attribute name once it is set.
+
+        The feed candidates each source saw before history filtering are
+        collected in self.candidates. Stops early if Docs auth has failed.
+        """
+        self.candidates = {}
+        for attr, fetch in (
+            ('news_items', fetch_ai_news),
+            ('ai_tools', fetch_ai_tools),
+            ('youtube_video', fetch_youtube_video),
+            ('insights', fetch_insights),
+        ):
+            self._check_client()
+            setattr(self, attr, fetch(self.history, candidates=self.candidates.setdefault(attr, [])))
+            yield attr
+        self.prompt_tip = get_prompt_tip(self.history)
+        yield 'prompt_tip'
 
     def _fetch_all_content(self):
-        """Fetch all content sections."""
-        self.news_items = fetch_ai_news(self.history)
-        self.ai_tools = fetch_ai_tools(self.history)
-        self.youtube_video = fetch_youtube_video(self.history)
-        self.insights = fetch_insights(self.history)
-        self.prompt_tip = get_prompt_tip(self.history)
+        """Fetch all content sections, stopping early if Docs auth has failed."""
+        for _ in self._fetch_sources():
+            pass
+        self._save_fetch_state()
+
+    def iter_sections(self):
+        """Fetch all content, yielding (name, fragment) for each section as soon as it is rendered.
+
+        A section is rendered in the background as soon as the content it
+        shows has been fetched, overlapping the fetches still in flight;
+        sections are yielded in the order they finish. Their specs (and
+        random picks) are chosen in the calling thread in a fixed order, so
+        a seeded run stays reproducible. Once all content is fetched,
+        self.specs holds the specs in document order, ready for assemble().
+        """
+        specs = {}
+        with ThreadPoolExecutor(max_workers=config.RENDER_WORKERS, thread_name_prefix='render') as pool:
+            pending = set()
+
+            def start(source):
+                for name, needs in SECTIONS:
+                    spec = self._section_spec(name) if needs == source else None
+                    if spec:
+                        specs[name] = spec
+                        pending.add(pool.submit(in_context(lambda spec=spec: (spec[0], render_section(*spec)))))
+
+            start(None)
+            for source in self._fetch_sources():
+                start(source)
+                finished = {future for future in pending if future.done()}
+                pending -= finished
+                for future in finished:
+                    yield future.result()
+
+            self.specs = [specs[name] for name, _ in SECTIONS if name in specs]
+            for future in as_completed(pending):
+                yield future.result()
+
+    def _save_fetch_state(self):
+        """Persist the feed state learnt while fetching.
+
+        A dry run, or a fetch from replayed feeds (e.g. a backfill), leaves
+        the live state alone.
+        """
+        if self.dry_run or replaying():
+            return
+        wait_for_downloads()
+        save_registry()
+        save_snapshots()
+        save_index()
+        save_url_cache()
+        save_health()
 
     def _validate_content(self):
         """Ensure minimum viable content before publishing."""
@@ -74,222 +198,368 @@ class NewsletterAgent:
             issues.append(f"Only {len(self.insights)} insights (need {config.MIN_INSIGHTS})")
 
         if issues:
-            _log(f"Content validation failed: {'; '.join(issues)}", "WARNING")
+            logger.warning("Content validation failed: %s", '; '.join(issues))
             return False
         return True
 
-    def _build_formatted_doc(self):
-        """Build the newsletter using DocFormatter for rich Google Doc output."""
-        _log("Building formatted newsletter")
-        fmt = DocFormatter()
-
-        # --- Title ---
-        fmt.add_heading(f"Return of the Jed(AI) - {self.today}", level=1)
-        fmt.add_newline()
-
-        # --- Headline from top story ---
-        headline_emoji = config.random_emoji("headline")
-        if self.news_items:
-            fmt.add_heading(f"{headline_emoji} {self.news_items[0]['title']}", level=2)
-            fmt.add_italic_text("PLUS: The AI tools reshaping how we work & create")
-            fmt.add_newline()
-        else:
-            fmt.add_heading(f"{headline_emoji} AI's Wild Week: Breakthroughs & Innovations", level=2)
-
-        fmt.add_newline()
-        fmt.add_horizontal_rule()
-        fmt.add_newline()
-
-        # --- Welcome ---
-        welcome_emoji = config.random_emoji("welcome")
-        fmt.add_heading(f"{welcome_emoji} Welcome, fellow humans!", level=2)
-        fmt.add_text("Hope your algorithms are optimized and your neural nets are firing on all nodes today. ")
-        fmt.add_text("Let's dive into the latest from the AI universe.")
-        fmt.add_newline()
-        fmt.add_newline()
-        fmt.add_horizontal_rule()
-        fmt.add_newline()
-
-        # --- Main Story ---
-        if self.news_items:
+    def _section_spec(self, name):
+        """The section's (name, inputs), or None if there is nothing to show.
+
+        Random picks (emojis, the "why it matters" line) are made here, so
+        the inputs fully determine the section's output.
+        """
+        if name == 'title':
+            return ('title', {'today': self.today})
+        if name == 'headline':
+            return ('headline', {
+                'emoji': config.random_emoji("headline"),
+                'title': self.news_items[0]['title'] if self.news_items else None,
+            })
+        if name == 'welcome':
+            return ('welcome', {'emoji': config.random_emoji("welcome")})
+        if name == 'main_story' and self.news_items:
             main = self.news_items[0]
-            fmt.add_heading("Main Story", level=2)
-            fmt.add_newline()
-            fmt.add_heading(f"{main['title']}", level=3)
-            fmt.add_text(main['summary'])
-            fmt.add_newline()
-            fmt.add_newline()
             why = generate_why_it_matters(main['title'], main['summary'], main['source'])
-            fmt.add_bold_text("Why it matters: ")
-            fmt.add_text(why)
-            fmt.add_newline()
-            fmt.add_newline()
-            fmt.add_link("Read the full story \u2192", main['link'])
-            fmt.add_newline()
-            fmt.add_newline()
-            fmt.add_horizontal_rule()
-            fmt.add_newline()
-
-        # --- Prompt Tip ---
-        if self.prompt_tip:
-            prompt_emoji = config.random_emoji("prompt")
-            fmt.add_heading(f"{prompt_emoji} Prompt Magic of the Day", level=2)
-            fmt.add_newline()
-            fmt.add_bold_text(self.prompt_tip['intro'])
-            fmt.add_newline()
-            fmt.add_newline()
-            fmt.add_text("Try this prompt:")
-            fmt.add_newline()
-            fmt.add_newline()
-            fmt.add_italic_text(self.prompt_tip['prompt'])
-            fmt.add_newline()
-            fmt.add_newline()
-            fmt.add_text(self.prompt_tip['explanation'])
-            fmt.add_newline()
-            fmt.add_newline()
-            fmt.add_horizontal_rule()
-            fmt.add_newline()
-
-        # --- AI Tools ---
-        if self.ai_tools:
-            tools_emoji = config.random_emoji("tools")
-            fmt.add_heading(f"{tools_emoji} AI Toolkit: New & Noteworthy", level=2)
-            fmt.add_newline()
-            bullet_start = fmt._cursor
-            for tool in self.ai_tools:
-                fmt.add_bold_text(tool['name'])
-                fmt.add_text(f" \u2014 {tool['description']}")
-                fmt.add_newline()
-            bullet_end = fmt._cursor
-            fmt.add_bullets_to_range(bullet_start, bullet_end)
-            fmt.add_newline()
-            fmt.add_horizontal_rule()
-            fmt.add_newline()
-
-        # --- Quick Hits ---
-        if len(self.news_items) > 1:
-            news_emoji = config.random_emoji("news")
-            fmt.add_heading(f"{news_emoji} Around the Horn (Quick Hits)", level=2)
-            fmt.add_newline()
-            bullet_start = fmt._cursor
-            for news in self.news_items[1:5]:
-                fmt.add_bold_text(f"{news['source']}: ")
-                fmt.add_text(news['title'])
-                fmt.add_newline()
-            bullet_end = fmt._cursor
-            fmt.add_bullets_to_range(bullet_start, bullet_end)
-            fmt.add_newline()
-            fmt.add_horizontal_rule()
-            fmt.add_newline()
-
-        # --- YouTube Video ---
-        if self.youtube_video:
-            video_emoji = config.random_emoji("video")
-            fmt.add_heading(f"{video_emoji} This Week in AI (Video Pick)", level=2)
-            fmt.add_newline()
-            fmt.add_bold_text(self.youtube_video['title'])
-            fmt.add_text(f" from {self.youtube_video['channel']}")
-            fmt.add_newline()
-            fmt.add_newline()
-            fmt.add_link("Watch Now \u2192", self.youtube_video['link'])
-            fmt.add_newline()
-            fmt.add_newline()
-            fmt.add_horizontal_rule()
-            fmt.add_newline()
-
-        # --- Insights ---
-        if self.insights:
-            insights_emoji = config.random_emoji("insights")
-            fmt.add_heading(f"{insights_emoji} Intelligent Insights", level=2)
-            fmt.add_newline()
-            bullet_start = fmt._cursor
-            for insight in self.insights:
-                if insight.get('source') and insight['source'] != 'AI Research':
-                    fmt.add_bold_text(f"{insight['source']}: ")
-                fmt.add_text(insight['text'])
-                if insight.get('link'):
-                    fmt.add_text(" ")
-                    fmt.add_link("[source]", insight['link'])
-                fmt.add_newline()
-            bullet_end = fmt._cursor
-            fmt.add_bullets_to_range(bullet_start, bullet_end)
-            fmt.add_newline()
-            fmt.add_horizontal_rule()
-            fmt.add_newline()
-
-        # --- CTA Footer ---
-        fmt.add_heading("That's a wrap!", level=2)
-        fmt.add_newline()
-        fmt.add_text("Thanks for reading! The best way to support us is by sharing this newsletter with a friend.")
-        fmt.add_newline()
-
-        return fmt.build_requests()
+            return ('main_story', {
+                'story': {k: main[k] for k in ('title', 'summary', 'link')},
+                'why': why,
+            })
+        if name == 'prompt_tip' and self.prompt_tip:
+            return ('prompt_tip', {'emoji': config.random_emoji("prompt"), 'tip': self.prompt_tip})
+        if name == 'tools' and self.ai_tools:
+            return ('tools', {
+                'emoji': config.random_emoji("tools"),
+                'tools': [{'name': t['name'], 'description': t['description']} for t in self.ai_tools],
+            })
+        if name == 'quick_hits' and len(self.news_items) > 1:
+            return ('quick_hits', {
+                'emoji': config.random_emoji("news"),
+                'items': [{'source': n['source'], 'title': n['title']} for n in self.news_items[1:5]],
+            })
+        if name == 'video' and self.youtube_video:
+            return ('video', {'emoji': config.random_emoji("video"), 'video': self.youtube_video})
+        if name == 'insights' and self.insights:
+            return ('insights', {'emoji': config.random_emoji("insights"), 'insights': self.insights})
+        if name == 'footer':
+            return ('footer', {})
+        return None
+
+    def _section_specs(self):
+        """List the edition's sections as (name, inputs) in document order.
+
+        Random picks are made in document order, so a seeded run stays
+        reproducible.
+        """
+        return [spec for spec in map(self._section_spec, (name for name, _ in SECTIONS)) if spec]
+
+    def _build_formatted_doc(self):
+        """Build the newsletter using DocFormatter for rich Google Doc output.
+
+        Sections are rendered as independent fragments (cached by content
+        hash, rendered concurrently) and concatenated in order. The section
+        specs are chosen here unless the select stage already did. Returns
+        the batchUpdate body as JSON bytes.
+        """
+        logger.info("Building formatted newsletter")
+        if self.specs is None:
+            self.specs = self._section_specs()
+        fragments = render_sections(self.specs)
+        return assemble(fragments)
 
     def _record_all_published(self):
-        """Record all published content in history to avoid future repeats."""
+        """Record all published content in history to avoid future repeats.
+
+        Returns the (title hash, URL key) pairs recorded.
+        """
+        recorded = []
         for item in self.news_items[:5]:
-            record_published(item['title'], self.history, category='news')
+            recorded.append(record_published(item['title'], self.history, category='news', when=self.now,
+                                             url=item_url(item)))
         for tool in self.ai_tools:
-            record_published(tool['name'], self.history, category='tool')
+            recorded.append(record_published(tool['name'], self.history, category='tool', when=self.now,
+                                             url=tool.get('link')))
         if self.youtube_video:
-            record_published(self.youtube_video['title'], self.history, category='video')
+            recorded.append(record_published(self.youtube_video['title'], self.history, category='video',
+                                             when=self.now, url=self.youtube_video.get('link')))
         for insight in self.insights:
-            record_published(insight['text'], self.history, category='insight')
+            recorded.append(record_published(insight['text'], self.history, category='insight', when=self.now))
         if self.prompt_tip:
-            record_published(self.prompt_tip['intro'], self.history, category='prompt_tip')
-
-    def run(self):
-        """Run the complete newsletter generation process."""
-        _log("Starting Return of the Jed(AI) Newsletter Agent")
-
+            recorded.append(record_published(self.prompt_tip['intro'], self.history, category='prompt_tip',
+                                             when=self.now))
+        return recorded
+
+    def _forget_last_edition(self):
+        """Drop the last published edition from history, so a rollback can publish its items again."""
+        edition = self.history.get("last_edition")
+        if not edition:
+            return
+        self.history["last_fingerprint"] = edition["previous_fingerprint"]
+        self.history["last_edition"] = None
+        save_history(self.history, forget={index: edition[index] for index in INDEXES})
+
+    def _edition_fingerprint(self):
+        """Fingerprint the feed candidates this edition was selected from.
+
+        The candidates are taken before history filtering: the selection
+        itself never matches the last edition, whose items are in history by
+        the next run. Unchanged feeds therefore give an unchanged
+        fingerprint. Static pools (fallbacks, prompt tips) rotate on their
+        own and are left out.
+        """
+        return content_fingerprint({
+            'news': sorted(self.candidates.get('news_items', [])),
+            'tools': self.candidates.get('ai_tools', []),
+            'video': self.candidates.get('youtube_video', []),
+            'insights': self.candidates.get('insights', []),
+        })
+
+    def _archive(self, payload, fingerprint, metrics):
+        """Append the published edition to the edition archive; failures are only logged."""
+        if not config.ARCHIVE_EDITIONS:
+            return
         try:
-            # 1. Fetch all content
-            self._fetch_all_content()
-
-            # 2. Validate minimum content
+            archive.append(archive.make_entry(
+                self.now, None, f"Return of the Jed(AI) - {self.today}",
+                [[name, inputs] for name, inputs in self.specs],
+                json.loads(payload)['requests'], metrics, fingerprint=fingerprint,
+            ))
+        except Exception as e:
+            logger.warning("Could not archive edition: %s", e)
+
+    def _write_dry_run(self, payload):
+        """Write the edition's Docs payload to self.dry_run instead of publishing.
+
+        The file holds the exact batchUpdate body a publish would send, with
+        the size statistics added as a "stats" field.
+        """
+        stats = payload_stats(payload)
+        for warning in stats['warnings']:
+            logger.warning("Payload approaching Docs API limits: %s", warning)
+
+        with open(self.dry_run, 'wb') as f:
+            f.write(b'{"stats":' + json.dumps(stats).encode() + b',' + payload[1:])
+        logger.info("Dry run: wrote %d requests (%d bytes) to %s",
+                    stats['request_count'], stats['payload_bytes'], self.dry_run)
+        return {
+            "status": "dry_run",
+            "timestamp": datetime.datetime.now().isoformat(),
+            "message": f"Docs payload written to {self.dry_run}; Google Doc not modified",
+            "payload": stats,
+        }
+
+    def rollback(self):
+        """Restore the edition that the last publish replaced.
+
+        The rolled-back edition is also dropped from history (its items and
+        fingerprint), so its content can be published again.
+        """
+        try:
+            if rollback(self.docs_service, self.doc_id):
+                self._forget_last_edition()
+                return {
+                    "status": "success",
+                    "timestamp": datetime.datetime.now().isoformat(),
+                    "message": "Rolled back to the previous edition",
+                }
+            message = "No previous edition recorded"
+        except Exception as e:
+            logger.error("Rollback failed: %s", e)
+            message = str(e)
+        return {
+            "status": "error",
+            "timestamp": datetime.datetime.now().isoformat(),
+            "message": message,
+        }
+
+    def run(self, resume=False, stage=None):
+        """Run the complete newsletter generation process.
+
+        With resume=True the run continues after the last stage checkpointed
+        for this edition; with stage, only that stage runs, starting from the
+        checkpoints of the stages before it (see checkpoints.py).
+        """
+        run_id = uuid.uuid4().hex[:12]
+        bind_context(run_id=run_id, tenant=config.TENANT)
+        start_resolution_run()
+        result = self._run(resume=resume, stage=stage)
+        result["run_id"] = run_id
+        if self.profiler.enabled:
+            result["profile"] = self.profiler.summary()
+        return result
+
+    def _checkpoint(self, stage, artifact):
+        """Persist a completed stage's artifact; dry runs leave the checkpoint alone."""
+        if config.CHECKPOINT_STAGES and not self.dry_run:
+            checkpoints.save(self.edition, stage, artifact)
+
+    def _restore(self, stage, artifact):
+        """Load a checkpointed stage's artifact back onto the agent."""
+        if stage == 'fetch':
+            self.news_items = artifact['news_items']
+            self.ai_tools = artifact['ai_tools']
+            self.youtube_video = artifact['youtube_video']
+            self.insights = artifact['insights']
+            self.prompt_tip = artifact['prompt_tip']
+            self.candidates = artifact.get('candidates', {})
+        elif stage == 'select':
+            self.fingerprint = artifact['fingerprint']
+            self.specs = artifact['specs']
+        elif stage == 'render':
+            self.payload = artifact['payload'].encode()
+
+    def _stage_fetch(self):
+        """1. Fetch all content, rendering sections as their content arrives if configured."""
+        with self.profiler.stage("fetch"):
+            if config.PIPELINE_SECTIONS:
+                self.fragments = dict(self.iter_sections())
+                self._save_fetch_state()
+            else:
+                self._fetch_all_content()
+        self._checkpoint('fetch', {
+            'news_items': self.news_items,
+            'ai_tools': self.ai_tools,
+            'youtube_video': self.youtube_video,
+            'insights': self.insights,
+            'prompt_tip': self.prompt_tip,
+            'candidates': self.candidates,
+        })
+
+    def _stage_select(self):
+        """2. Validate the content, skip unchanged editions and choose the sections."""
+        with self.profiler.stage("select"):
             if not self._validate_content():
-                _log("Insufficient content — skipping publish", "ERROR")
+                logger.error("Insufficient content — skipping publish")
                 return {
                     "status": "error",
                     "timestamp": datetime.datetime.now().isoformat(),
                     "message": "Content validation failed — not enough content to publish",
                 }
 
-            # 3. Build formatted document requests
-            api_requests = self._build_formatted_doc()
-
-            # 4. Clear the doc and write new content
-            clear_document(self.docs_service, self.doc_id)
-            success = write_to_doc(self.docs_service, self.doc_id, api_requests)
-
-            if success:
-                # 5. Record published content and save history
-                self._record_all_published()
-                save_history(self.history)
-
-                _log("Newsletter generation and update completed successfully!")
+            # Skip the publish if the feeds offer nothing beyond the last edition's candidates
+            self.fingerprint = self._edition_fingerprint()
+            if (not self.dry_run and config.SKIP_UNCHANGED_EDITIONS
+                    and self.fingerprint == self.history.get("last_fingerprint")):
+                logger.info("Edition content unchanged since last publish — skipping")
                 return {
-                    "status": "success",
+                    "status": "unchanged",
                     "timestamp": datetime.datetime.now().isoformat(),
-                    "message": "Newsletter updated successfully",
-                    "stats": {
-                        "news_items": len(self.news_items),
-                        "tools": len(self.ai_tools),
-                        "insights": len(self.insights),
-                        "has_video": bool(self.youtube_video),
-                        "has_prompt_tip": bool(self.prompt_tip),
-                    },
+                    "message": "Edition content unchanged — Google Doc left as is",
+                    "fingerprint": self.fingerprint,
                 }
+
+            if self.specs is None:
+                self.specs = self._section_specs()
+            self._checkpoint('select', {'fingerprint': self.fingerprint, 'specs': self.specs})
+
+    def _stage_render(self):
+        """3. Build the batchUpdate body (or write it out for a dry run)."""
+        with self.profiler.stage("render"):
+            if self.fragments is not None:
+                # Rendered while fetching: only concatenate
+                logger.info("Assembling %d pre-rendered sections", len(self.specs))
+                self.payload = assemble([self.fragments[name] for name, _ in self.specs])
+            else:
+                self.payload = self._build_formatted_doc()
+            if not self.dry_run:
+                save_render_cache()
+        if self.dry_run:
+            return self._write_dry_run(self.payload)
+        self._checkpoint('render', {'payload': self.payload.decode()})
+
+    def _stage_publish(self):
+        """4. Replace the document content, then record the edition."""
+        with self.profiler.stage("publish"):
+            if config.STAGED_PUBLISH:
+                success = publish_staged(self.docs_service, self.doc_id, self.payload)
             else:
-                _log("Failed to update newsletter", "ERROR")
+                clear_document(self.docs_service, self.doc_id)
+                success = write_to_doc(self.docs_service, self.doc_id, self.payload)
+
+        if not success:
+            logger.error("Failed to update newsletter")
+            return {
+                "status": "error",
+                "timestamp": datetime.datetime.now().isoformat(),
+                "message": "Failed to update Google Doc",
+            }
+
+        # Record published content and save history, keeping what was recorded for a rollback
+        recorded = self._record_all_published()
+        self.history["last_edition"] = {
+            "published_titles": [title_hash for title_hash, _ in recorded],
+            "published_urls": [key for _, key in recorded if key is not None],
+            "previous_fingerprint": self.history.get("last_fingerprint"),
+        }
+        self.history["last_fingerprint"] = self.fingerprint
+        save_history(self.history)
+
+        logger.info("Newsletter generation and update completed successfully!")
+        result = {
+            "status": "success",
+            "timestamp": datetime.datetime.now().isoformat(),
+            "message": "Newsletter updated successfully",
+            "fingerprint": self.fingerprint,
+            "stats": {
+                "news_items": len(self.news_items),
+                "tools": len(self.ai_tools),
+                "insights": len(self.insights),
+                "has_video": bool(self.youtube_video),
+                "has_prompt_tip": bool(self.prompt_tip),
+            },
+            "rate_limits": rate_limit_stats(),
+            "staleness": staleness_report(),
+            "render_cache": render_cache_stats(),
+            "ingest": ingest_stats(),
+            "url_resolution": resolver_stats(),
+            "feed_health": health_table()[:config.HEALTH_REPORT_ROWS],
+            "hedging": hedge_stats(),
+        }
+        self._archive(self.payload, self.fingerprint, {
+            "stats": result["stats"],
+            "payload": payload_stats(self.payload),
+            "render_cache": result["render_cache"],
+            "ingest": result["ingest"],
+        })
+        self._checkpoint('publish', result)
+        return result
+
+    def _run(self, resume=False, stage=None):
+        logger.info("Starting Return of the Jed(AI) Newsletter Agent")
+
+        try:
+            completed = checkpoints.load(self.edition) if resume or stage else {}
+            first = stage or (checkpoints.next_stage(completed) if resume else STAGES[0])
+            if first is None:
+                logger.info("All stages already completed for edition %s", self.edition)
+                return dict(completed['publish'], message="Edition already published — nothing to resume")
+
+            earlier = STAGES[:STAGES.index(first)]
+            missing = [s for s in earlier if s not in completed]
+            if missing:
                 return {
                     "status": "error",
                     "timestamp": datetime.datetime.now().isoformat(),
-                    "message": "Failed to update Google Doc",
+                    "message": f"No checkpoint for stage {missing[0]} of edition {self.edition}",
                 }
+            for done in earlier:
+                self._restore(done, completed[done])
+            if earlier:
+                logger.info("Resuming edition %s at stage %s", self.edition, first)
+
+            for name in ([stage] if stage else STAGES[STAGES.index(first):]):
+                result = getattr(self, f"_stage_{name}")()
+                if result is not None:
+                    return result
+
+            return {
+                "status": "stage_complete",
+                "timestamp": datetime.datetime.now().isoformat(),
+                "message": f"Stage {stage} completed and checkpointed",
+                "stage": stage,
+            }
 
         except Exception as e:
-            _log(f"Error in newsletter generation: {e}", "ERROR")
+            logger.error("Error in newsletter generation: %s", e)
             return {
                 "status": "error",
                 "message": str(e),
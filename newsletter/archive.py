@@ -0,0 +1,273 @@
+"""Append-only, compressed archive of every published edition.
+
+Each entry holds one edition's structured content (the section specs it
+was rendered from), its Docs request payload and the run's metrics. Entries
+are appended to editions.dat as
+
+    magic b'NLED' | payload length u32 | payload crc32 u32 | zlib(JSON)
+
+and located through index.json, a small list of
+[date, tenant, offset, length, fingerprint] rows, so any entry is read with
+one seek. The index can always be rebuilt by scanning the data file; rows
+missing after a crash between the two writes are recovered that way.
+Appends hold an exclusive lock on the data file, so concurrent runs never
+interleave records.
+
+    python -m newsletter.archive list
+    python -m newsletter.archive show 2026-03-01 [--requests]
+    python -m newsletter.archive diff 2026-03-02
+    python -m newsletter.archive export 2026-03-01 payload.json
+    python -m newsletter.archive page archive.html
+"""
+
+import os
+import sys
+import json
+import html
+import zlib
+import fcntl
+import struct
+import difflib
+import argparse
+import datetime
+import tempfile
+
+from . import config
+from .log import get_logger
+
+MAGIC = b'NLED'
+_HEADER = struct.Struct('<4sII')
+DATA_FILE = 'editions.dat'
+INDEX_FILE = 'index.json'
+
+logger = get_logger(__name__)
+
+
+class ArchiveError(Exception):
+    """An archive record is corrupt or missing."""
+
+
+def _paths(archive_dir=None):
+    archive_dir = archive_dir or config.ARCHIVE_DIR
+    return os.path.join(archive_dir, DATA_FILE), os.path.join(archive_dir, INDEX_FILE)
+
+
+def _read_index(index_path):
+    if not os.path.exists(index_path):
+        return []
+    try:
+        with open(index_path) as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return []
+
+
+def _write_index(index_path, rows):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(index_path), prefix='.index.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(rows, f, separators=(',', ':'))
+        os.replace(tmp_path, index_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _scan(f, start):
+    """Yield (offset, length, entry) for every complete record from start to the end of f."""
+    f.seek(start)
+    offset = start
+    while True:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return
+        magic, length, crc = _HEADER.unpack(header)
+        payload = f.read(length)
+        if magic != MAGIC or len(payload) < length or zlib.crc32(payload) != crc:
+            return  # torn or foreign tail: stop at the last good record
+        yield offset, length, json.loads(zlib.decompress(payload))
+        offset += _HEADER.size + length
+
+
+def _row(offset, entry, length):
+    return [entry['date'], entry['tenant'], offset, length, entry.get('fingerprint')]
+
+
+def _indexed_rows(f, index_path):
+    """Return the index, extended with any records appended after it was last written."""
+    rows = _read_index(index_path)
+    end = rows[-1][2] + _HEADER.size + rows[-1][3] if rows else 0
+    f.seek(0, os.SEEK_END)
+    if f.tell() == end:
+        return rows
+    if f.tell() < end:
+        rows, end = [], 0  # index belongs to another data file: rebuild
+    recovered = [_row(offset, entry, length) for offset, length, entry in _scan(f, end)]
+    if recovered:
+        logger.info("Recovered %d archive index rows", len(recovered))
+    return rows + recovered
+
+
+def append(entry, archive_dir=None):
+    """Append an entry (needs 'date' and 'tenant') and index it; return its row."""
+    data_path, index_path = _paths(archive_dir)
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    payload = zlib.compress(json.dumps(entry, ensure_ascii=False, separators=(',', ':')).encode(), 9)
+    with open(data_path, 'a+b') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            rows = _indexed_rows(f, index_path)
+            offset = rows[-1][2] + _HEADER.size + rows[-1][3] if rows else 0
+            f.seek(0, os.SEEK_END)
+            if f.tell() > offset:
+                logger.warning("Dropping %d bytes of torn archive tail", f.tell() - offset)
+                f.truncate(offset)
+            f.write(_HEADER.pack(MAGIC, len(payload), zlib.crc32(payload)))
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+            row = _row(offset, entry, len(payload))
+            _write_index(index_path, rows + [row])
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+    logger.info("Archived edition %s (%s, %d bytes compressed)", entry['date'], entry['tenant'], len(payload))
+    return row
+
+
+def index(archive_dir=None):
+    """All index rows [date, tenant, offset, length, fingerprint] in append order."""
+    data_path, index_path = _paths(archive_dir)
+    if not os.path.exists(data_path):
+        return []
+    with open(data_path, 'rb') as f:
+        return _indexed_rows(f, index_path)
+
+
+def _read(row, archive_dir=None):
+    data_path, _ = _paths(archive_dir)
+    with open(data_path, 'rb') as f:
+        f.seek(row[2])
+        magic, length, crc = _HEADER.unpack(f.read(_HEADER.size))
+        payload = f.read(length)
+    if magic != MAGIC or zlib.crc32(payload) != crc:
+        raise ArchiveError(f"Corrupt archive record at offset {row[2]}")
+    return json.loads(zlib.decompress(payload))
+
+
+def _find(rows, date=None, tenant=None, before=None):
+    tenant = tenant or config.TENANT
+    matches = [r for r in rows if r[1] == tenant
+               and (date is None or r[0] == date)
+               and (before is None or r[0] < before)]
+    # Latest date, then the most recent append for that date
+    return max(matches, key=lambda r: (r[0], r[2])) if matches else None
+
+
+def get(date, tenant=None, archive_dir=None):
+    """The latest entry archived for date and tenant, or None."""
+    row = _find(index(archive_dir), date=date, tenant=tenant)
+    return _read(row, archive_dir) if row else None
+
+
+def previous(date, tenant=None, archive_dir=None):
+    """The latest entry for tenant dated before date, or None."""
+    row = _find(index(archive_dir), tenant=tenant, before=date)
+    return _read(row, archive_dir) if row else None
+
+
+def iter_entries(tenant=None, archive_dir=None):
+    """Yield every archived entry (optionally one tenant's) in append order."""
+    for row in index(archive_dir):
+        if tenant is None or row[1] == tenant:
+            yield _read(row, archive_dir)
+
+
+def edition_text(entry):
+    """The plain text of an archived edition, as inserted into the Doc."""
+    requests = entry.get('requests') or []
+    return requests[0]['insertText']['text'] if requests else ''
+
+
+def diff(entry, other):
+    """Unified diff of the text of other (older) against entry."""
+    return ''.join(difflib.unified_diff(
+        edition_text(other).splitlines(keepends=True) if other else [],
+        edition_text(entry).splitlines(keepends=True),
+        fromfile=other['date'] if other else '(none)',
+        tofile=entry['date'],
+    ))
+
+
+def render_page(entries):
+    """A self-contained HTML page listing archived editions, newest first."""
+    sections = []
+    for entry in sorted(entries, key=lambda e: e['date'], reverse=True):
+        sections.append(
+            f"<section id=\"{html.escape(entry['date'])}\"><h2>{html.escape(entry.get('title', entry['date']))}</h2>"
+            f"<pre>{html.escape(edition_text(entry))}</pre></section>"
+        )
+    return ("<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Return of the Jed(AI) archive</title>"
+            "</head><body><h1>Return of the Jed(AI) archive</h1>" + ''.join(sections) + "</body></html>\n")
+
+
+def make_entry(now, tenant, title, content, api_requests, metrics, fingerprint=None):
+    """Build an archive entry for an edition published at `now`."""
+    return {
+        'date': now.date().isoformat(),
+        'tenant': tenant or config.TENANT,
+        'archived_at': datetime.datetime.now().isoformat(),
+        'title': title,
+        'fingerprint': fingerprint,
+        'content': content,
+        'requests': api_requests,
+        'metrics': metrics,
+    }
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python -m newsletter.archive', description="Edition archive")
+    parser.add_argument('--tenant', help="Tenant (default: config.TENANT)")
+    parser.add_argument('--dir', help="Archive directory (default: config.ARCHIVE_DIR)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help="List archived editions")
+    show = sub.add_parser('show', help="Print an edition's text")
+    show.add_argument('date')
+    show.add_argument('--requests', action='store_true', help="Print the Docs payload instead")
+    diff_cmd = sub.add_parser('diff', help="Diff an edition against the one before it")
+    diff_cmd.add_argument('date')
+    export = sub.add_parser('export', help="Write an edition's Docs payload to a file")
+    export.add_argument('date')
+    export.add_argument('out')
+    page = sub.add_parser('page', help="Write an HTML archive page")
+    page.add_argument('out')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    if args.command == 'list':
+        for date, tenant, offset, length, fingerprint in index(args.dir):
+            if args.tenant is None or tenant == args.tenant:
+                print(f"{date}  {tenant:<12} {length:>8} B  {(fingerprint or '')[:12]}")
+        return 0
+    if args.command == 'page':
+        with open(args.out, 'w') as f:
+            f.write(render_page(iter_entries(args.tenant, args.dir)))
+        return 0
+
+    entry = get(args.date, args.tenant, args.dir)
+    if entry is None:
+        print(f"No archived edition for {args.date}", file=sys.stderr)
+        return 1
+    if args.command == 'show':
+        print(json.dumps(entry['requests'], indent=2, ensure_ascii=False) if args.requests else edition_text(entry))
+    elif args.command == 'diff':
+        print(diff(entry, previous(args.date, args.tenant, args.dir)), end='')
+    elif args.command == 'export':
+        with open(args.out, 'w') as f:
+            json.dump({'requests': entry['requests']}, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
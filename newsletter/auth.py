@@ -0,0 +1,90 @@
+"""Google Docs client initialization and document access preflight.
+
+Used both by the agent, which runs it in the background while feeds are
+fetched, and by debug_auth.py, which runs it interactively.
+"""
+
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from googleapiclient.errors import HttpError
+
+from .transport import get_docs_service
+
+
+class AuthError(Exception):
+    """Docs client setup or document access failed; hints explain likely fixes."""
+
+    def __init__(self, message, hints=()):
+        super().__init__(message)
+        self.hints = list(hints)
+
+
+def _access_hints(error, client_email):
+    status = error.resp.status if isinstance(error, HttpError) else None
+    if status == 404 or "404" in str(error):
+        return [
+            "Double-check your DOCUMENT_ID - it should be the string from the URL",
+            f"Make sure you've shared this document with {client_email}",
+        ]
+    if status == 403 or "403" in str(error):
+        return [
+            f"Make sure you've shared this document with {client_email}",
+            "Check that the Google Docs API is enabled in your Google Cloud project",
+        ]
+    return []
+
+
+def init_docs_client(creds_json, doc_id, check_access=True, write_test=False, report=None):
+    """Parse credentials, build the Docs client and optionally check access to the document.
+
+    report(message) is called after each passed check. Raises AuthError on
+    the first failing check. Returns the Docs client.
+    """
+    report = report or (lambda message: None)
+
+    if not doc_id:
+        raise AuthError("DOCUMENT_ID environment variable is not set.")
+    if not creds_json:
+        raise AuthError("GOOGLE_CREDENTIALS environment variable is not set.")
+    report(f"Found DOCUMENT_ID: {doc_id}")
+
+    try:
+        creds_dict = json.loads(creds_json)
+    except json.JSONDecodeError as e:
+        raise AuthError(f"GOOGLE_CREDENTIALS is not valid JSON: {e}")
+    client_email = creds_dict.get('client_email')
+    report(f"Credentials JSON is valid (service account: {client_email})")
+
+    try:
+        docs_service = get_docs_service(creds_dict)
+    except Exception as e:
+        raise AuthError(f"Failed to build Google Docs API client: {e}")
+    report("Built Google Docs API client")
+
+    if not check_access:
+        return docs_service
+
+    try:
+        document = docs_service.documents().get(documentId=doc_id).execute()
+        report(f"Retrieved document: '{document.get('title', 'Untitled')}'")
+        if write_test:
+            test_text = f"Auth test: {os.environ.get('GITHUB_RUN_ID', 'local test')}"
+            docs_service.documents().batchUpdate(
+                documentId=doc_id,
+                body={'requests': [{'insertText': {'location': {'index': 1}, 'text': test_text + '\n'}}]},
+            ).execute()
+            report("Write operation successful")
+    except Exception as e:
+        raise AuthError(f"Failed to access document {doc_id}: {e}", _access_hints(e, client_email))
+
+    return docs_service
+
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='docs-auth')
+
+
+def start_client_init(creds_json, doc_id, check_access=True):
+    """Run init_docs_client in the background; returns a Future of the Docs client."""
+    return _executor.submit(init_docs_client, creds_json, doc_id, check_access=check_access)
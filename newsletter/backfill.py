@@ -0,0 +1,170 @@
+"""Backfill: rebuild past editions from archived feed snapshots.
+
+Snapshots are laid out one directory per date, each holding the raw feed
+bodies and an index.json mapping feed URL to file name:
+
+    <snapshots>/2026-03-01/index.json
+    <snapshots>/2026-03-01/<file>.xml
+
+Work is split so that only the part that depends on history runs in order:
+
+1. Parse every date's snapshots (independent, process pool).
+2. Select each edition's content in date order, recording it in the history
+   so later dates see what earlier ones published. Replayed feeds never
+   update the live feed state (registry, snapshots, health, URL cache).
+3. Render every edition (independent, process pool).
+4. Write the editions in date order to files and/or a (fake) Docs service.
+
+Usage:
+    python -m newsletter.backfill 2026-03-01 2026-03-14 --snapshots archive/ --out editions/
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import feedparser
+
+from . import config
+from .agent import NewsletterAgent
+from .fake_docs import FakeDocsService
+from .fetchers import use_feed_source
+from .gdoc import clear_document, write_to_doc
+from .history import load_history, history_as_of
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+
+def _date_range(start, end):
+    day = start
+    while day <= end:
+        yield day
+        day += datetime.timedelta(days=1)
+
+
+def _edition_time(day):
+    """Editions are stamped at the scheduled run time of their day."""
+    return datetime.datetime.combine(day, datetime.time(hour=config.BACKFILL_EDITION_HOUR))
+
+
+def _parse_snapshots(day_dir):
+    """Parse one date's snapshots into {url: {'feed': ..., 'entries': [...]}}."""
+    index_path = os.path.join(day_dir, 'index.json')
+    if not os.path.exists(index_path):
+        return {}
+    with open(index_path, 'r') as f:
+        index = json.load(f)
+
+    feeds = {}
+    for url, filename in index.items():
+        with open(os.path.join(day_dir, filename), 'rb') as f:
+            parsed = feedparser.parse(f.read(), response_headers={'content-location': url})
+        if parsed.entries:
+            # Plain dicts keep the worker result small and picklable
+            feeds[url] = {
+                'feed': {k: parsed.feed.get(k) for k in ('title', 'author') if parsed.feed.get(k)},
+                'entries': [
+                    {k: e.get(k) for k in ('id', 'title', 'link', 'summary', 'published') if e.get(k)}
+                    for e in parsed.entries
+                ],
+            }
+    return feeds
+
+
+def _snapshot_source(feeds):
+    def source(url):
+        snapshot = feeds.get(url)
+        if snapshot is None:
+            return None
+        return feedparser.FeedParserDict(
+            feed=feedparser.FeedParserDict(snapshot['feed']),
+            entries=[feedparser.FeedParserDict(e) for e in snapshot['entries']],
+        )
+    return source
+
+
+def _render(agent):
+    """Process-pool worker: render one selected edition."""
+    random.seed(f"render-{agent.now.date().isoformat()}")
+    return agent._build_formatted_doc()
+
+
+def backfill(start, end, snapshot_dir, out_dir=None, docs_service=None, doc_id='backfill',
+             history=None, workers=None):
+    """Rebuild editions for every date in [start, end]; return the final history.
+
+    history defaults to the saved history; it is rolled back to its state at
+    `start` before the first edition is selected.
+    """
+    days = list(_date_range(start, end))
+    history = history_as_of(history if history is not None else load_history(), _edition_time(start))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        day_dirs = [os.path.join(snapshot_dir, day.isoformat()) for day in days]
+        snapshots = list(pool.map(_parse_snapshots, day_dirs))
+
+        agents = []
+        for day, feeds in zip(days, snapshots):
+            when = _edition_time(day)
+            history = history_as_of(history, when)
+            random.seed(f"select-{day.isoformat()}")
+            agent = NewsletterAgent(now=when, history=history, offline=True)
+            with use_feed_source(_snapshot_source(feeds)):
+                agent._fetch_all_content()
+            if not agent._validate_content():
+                logger.warning("Backfill %s: insufficient content, skipping", day)
+                continue
+            agent._record_all_published()
+            agents.append(agent)
+
+        rendered = list(pool.map(_render, agents))
+
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    for agent, payload in zip(agents, rendered):
+        day = agent.now.date().isoformat()
+        if out_dir:
+            with open(os.path.join(out_dir, f"{day}.json"), 'w') as f:
+                json.dump({'date': day, 'title': agent.today, 'requests': json.loads(payload)['requests']},
+                          f, indent=2)
+        if docs_service is not None:
+            clear_document(docs_service, doc_id)
+            write_to_doc(docs_service, doc_id, payload)
+        logger.info("Backfilled edition for %s", day)
+
+    return history
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild past editions from archived feed snapshots.")
+    parser.add_argument('start', type=datetime.date.fromisoformat)
+    parser.add_argument('end', type=datetime.date.fromisoformat)
+    parser.add_argument('--snapshots', required=True, help="Directory of per-date feed snapshots")
+    parser.add_argument('--out', help="Write each edition's request payload to this directory")
+    parser.add_argument('--fake-docs', action='store_true', help="Also publish to an in-memory Docs stand-in")
+    parser.add_argument('--workers', type=int, help="Process pool size (default: CPU count)")
+    parser.add_argument('--history-out', help="Write the resulting history to this file")
+    args = parser.parse_args(argv)
+
+    if not args.out and not args.fake_docs:
+        parser.error("choose at least one output: --out and/or --fake-docs")
+
+    docs_service = FakeDocsService() if args.fake_docs else None
+    history = backfill(args.start, args.end, args.snapshots, out_dir=args.out,
+                       docs_service=docs_service, workers=args.workers)
+    if args.history_out:
+        with open(args.history_out, 'w') as f:
+            json.dump(history, f, indent=2)
+    if docs_service is not None:
+        doc = docs_service.docs.get('backfill', {})
+        logger.info("Fake Docs service received %d batchUpdate calls", len(doc.get('batches', [])))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
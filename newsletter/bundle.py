@@ -0,0 +1,219 @@
+"""Single-file, versioned bundle of all state kept between runs.
+
+CI runners start empty, so the state directory (feed registry, snapshots,
+render cache, published editions, ...) is lost after every run. At the end
+of a run save_bundle() packs every state file, the content history and the
+Docs discovery document into one file that the workflow caches; the next
+run reads sections straight out of it.
+
+Layout (all integers little-endian):
+
+    magic b'NLSB' | version u16 | reserved u16 | index length u32 | index crc32 u32
+    index: JSON {"created": ..., "sections": {name: [offset, length, crc32]}}
+    sections: zlib-compressed JSON, at the offsets given in the index
+
+The file is memory-mapped and only the index is parsed on open; a section
+is decompressed and checksummed the first time it is read. A bundle with a
+bad magic, an unknown version or a failed checksum is ignored (or just the
+bad section is), so restoring any cache entry is safe.
+"""
+
+import os
+import json
+import mmap
+import zlib
+import struct
+import datetime
+import tempfile
+import threading
+
+from . import config
+from .log import get_logger
+
+MAGIC = b'NLSB'
+VERSION = 1
+_HEADER = struct.Struct('<4sHHII')
+
+logger = get_logger(__name__)
+
+
+class BundleError(Exception):
+    """The bundle file or one of its sections is corrupt or of an unknown version."""
+
+
+class StateBundle:
+    """A read-only, memory-mapped state bundle."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._decoded = {}
+        self._lock = threading.Lock()
+        try:
+            self.created, self._index = self._read_index()
+        except BaseException:
+            self._map.close()
+            raise
+
+    def _read_index(self):
+        if len(self._map) < _HEADER.size:
+            raise BundleError("truncated header")
+        magic, version, _, index_length, index_crc = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise BundleError("not a state bundle")
+        if version != VERSION:
+            raise BundleError(f"unsupported bundle version {version}")
+        raw = self._map[_HEADER.size:_HEADER.size + index_length]
+        if len(raw) != index_length or zlib.crc32(raw) != index_crc:
+            raise BundleError("index checksum mismatch")
+        index = json.loads(raw)
+        for name, (offset, length, _) in index['sections'].items():
+            if offset < _HEADER.size + index_length or offset + length > len(self._map):
+                raise BundleError(f"section {name} out of bounds")
+        return index.get('created'), index['sections']
+
+    def names(self):
+        return list(self._index)
+
+    def raw(self, name):
+        """Return a section's compressed bytes after verifying its checksum."""
+        offset, length, crc = self._index[name]
+        data = self._map[offset:offset + length]
+        if zlib.crc32(data) != crc:
+            raise BundleError(f"section {name} checksum mismatch")
+        return data
+
+    def get(self, name, default=None):
+        """Decode a section on first access; return default if missing or corrupt."""
+        if name not in self._index:
+            return default
+        with self._lock:
+            if name not in self._decoded:
+                try:
+                    self._decoded[name] = json.loads(zlib.decompress(self.raw(name)))
+                except (BundleError, zlib.error, ValueError) as e:
+                    logger.warning("Ignoring state bundle section %s: %s", name, e)
+                    self._decoded[name] = None
+            value = self._decoded[name]
+        return default if value is None else value
+
+    def close(self):
+        self._map.close()
+
+
+def write_bundle(path, sections):
+    """Atomically write a bundle.
+
+    sections maps names to JSON-serializable values, or to bytes that are
+    already compressed (copied through unchanged).
+    """
+    blobs = {}
+    for name, value in sections.items():
+        if isinstance(value, bytes):
+            blobs[name] = value
+        else:
+            payload = json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode()
+            blobs[name] = zlib.compress(payload, 6)
+
+    # Offsets depend on the index length, which depends on the offsets;
+    # offsets are fixed-width enough that two passes always converge
+    index_length = 0
+    while True:
+        offset = _HEADER.size + index_length
+        entries = {}
+        for name, blob in blobs.items():
+            entries[name] = [offset, len(blob), zlib.crc32(blob)]
+            offset += len(blob)
+        index = json.dumps({
+            'created': datetime.datetime.now().isoformat(),
+            'sections': entries,
+        }, separators=(',', ':')).encode()
+        if len(index) == index_length:
+            break
+        index_length = len(index)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.bundle.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, 0, len(index), zlib.crc32(index)))
+            f.write(index)
+            for blob in blobs.values():
+                f.write(blob)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+_lock = threading.Lock()
+_bundle = None
+_bundle_loaded = False
+
+
+def get_bundle():
+    """Return the bundle at config.STATE_BUNDLE_FILE, or None if absent or invalid."""
+    global _bundle, _bundle_loaded
+    with _lock:
+        if not _bundle_loaded:
+            _bundle_loaded = True
+            path = config.STATE_BUNDLE_FILE
+            if path and os.path.exists(path):
+                try:
+                    _bundle = StateBundle(path)
+                    logger.info("Loaded state bundle from %s (created %s, %d sections)",
+                                path, _bundle.created, len(_bundle.names()))
+                except (BundleError, OSError, ValueError, KeyError, TypeError) as e:
+                    logger.warning("Ignoring state bundle %s: %s", path, e)
+        return _bundle
+
+
+def load_section(name, default=None):
+    """Read one section from the state bundle, or return default."""
+    bundle = get_bundle()
+    return bundle.get(name, default) if bundle else default
+
+
+def save_bundle(history=None):
+    """Pack the state directory (and the history, if given) into the bundle.
+
+    State files written during this run replace the bundle's copies;
+    sections this run never touched are carried over without decoding.
+    """
+    global _bundle, _bundle_loaded
+    path = config.STATE_BUNDLE_FILE
+    if not path:
+        return None
+
+    sections = {}
+    bundle = get_bundle()
+    if bundle:
+        for name in bundle.names():
+            try:
+                sections[name] = bundle.raw(name)
+            except BundleError as e:
+                logger.warning("Dropping state bundle section %s: %s", name, e)
+
+    if os.path.isdir(config.STATE_DIR):
+        for filename in sorted(os.listdir(config.STATE_DIR)):
+            if not filename.endswith('.json') or filename.startswith('.'):
+                continue
+            try:
+                with open(os.path.join(config.STATE_DIR, filename)) as f:
+                    sections[filename[:-len('.json')]] = json.load(f)
+            except (json.JSONDecodeError, IOError) as e:
+                logger.warning("Skipping unreadable state file %s: %s", filename, e)
+    if history is not None:
+        sections['history'] = history
+
+    write_bundle(path, sections)
+    with _lock:
+        if _bundle is not None:
+            _bundle.close()
+        _bundle = None
+        _bundle_loaded = False
+    size = os.path.getsize(path)
+    logger.info("Wrote state bundle %s (%d sections, %d bytes)", path, len(sections), size)
+    return {'path': path, 'sections': len(sections), 'bytes': size}
@@ -0,0 +1,69 @@
+"""Per-edition checkpoints of the run's pipeline stages.
+
+A run is split into four stages, each persisting the artifact the next one
+needs:
+
+    fetch    the fetched content (news, tools, video, insights, prompt tip)
+    select   the validated edition: its fingerprint and section specs,
+             including the random picks, so a retry renders the same edition
+    render   the Docs request payload
+    publish  the run result
+
+The checkpoint belongs to one edition (date and tenant); completing a stage
+drops any later stages, whose artifacts no longer match. A run that failed
+can resume after its last completed stage (--resume), or a single stage can
+be run on its own from the checkpoint of the stages before it (--stage).
+The checkpoint is a state file, so it is carried between workflow runs in
+the state bundle.
+"""
+
+import datetime
+
+from . import config
+from .state import load_state, save_state
+from .log import get_logger
+
+STAGES = ('fetch', 'select', 'render', 'publish')
+STATE_NAME = 'checkpoint'
+
+logger = get_logger(__name__)
+
+
+def edition_key(now, tenant=None):
+    return f"{now.date().isoformat()}/{tenant or config.TENANT}"
+
+
+def load(edition):
+    """Return {stage: artifact} of the edition's completed stages, in stage order."""
+    checkpoint = load_state(STATE_NAME, None)
+    if not checkpoint:
+        return {}
+    if checkpoint.get('edition') != edition:
+        logger.info("Ignoring checkpoint for edition %s (current edition is %s)",
+                    checkpoint.get('edition'), edition)
+        return {}
+    stages = checkpoint.get('stages', {})
+    return {stage: stages[stage]['artifact'] for stage in STAGES if stage in stages}
+
+
+def save(edition, stage, artifact):
+    """Record a completed stage; stages after it are discarded."""
+    checkpoint = load_state(STATE_NAME, None) or {}
+    if checkpoint.get('edition') != edition:
+        checkpoint = {'edition': edition, 'stages': {}}
+    earlier = STAGES[:STAGES.index(stage)]
+    checkpoint['stages'] = {s: v for s, v in checkpoint.get('stages', {}).items() if s in earlier}
+    checkpoint['stages'][stage] = {
+        'completed_at': datetime.datetime.now().isoformat(),
+        'artifact': artifact,
+    }
+    save_state(STATE_NAME, checkpoint)
+    logger.info("Checkpointed stage %s for edition %s", stage, edition)
+
+
+def next_stage(completed):
+    """The first stage not completed, or None if the checkpoint is complete."""
+    for stage in STAGES:
+        if stage not in completed:
+            return stage
+    return None
@@ -1,5 +1,6 @@
 """Configuration constants for the newsletter agent."""
 
+import os
 import random
 
 # RSS feed URLs for news
@@ -50,13 +51,130 @@ MIN_NEWS_ITEMS = 3
 MIN_TOOLS = 3
 MIN_INSIGHTS = 2
 
+# Hour of day (local time) at which backfilled editions are stamped
+BACKFILL_EDITION_HOUR = 7
+
 # Content history settings
 HISTORY_MAX_DAYS = 90
 
+# Skip the Google Doc rewrite when the selected content matches the last edition
+SKIP_UNCHANGED_EDITIONS = True
+
 # Retry configuration
 MAX_RETRIES = 3
 RETRY_DELAY_SECONDS = 2
 
+# HTTP transport for Google Docs API calls
+DOCS_API_ENDPOINT = os.environ.get('DOCS_API_ENDPOINT')  # override for a local stand-in server
+DOCS_PREFLIGHT = True  # check document access while feeds are fetched
+STAGED_PUBLISH = True  # swap editions in one revision-pinned batchUpdate instead of clear + write
+CHECKPOINT_STAGES = True  # persist each pipeline stage's output so a failed run can resume (see checkpoints.py)
+DOCS_HTTP_TIMEOUT_SECONDS = 30
+HTTP_POOL_CONNECTIONS = 10
+HTTP_POOL_MAXSIZE = 10
+TOKEN_REFRESH_MARGIN_SECONDS = 300
+
+# HTTP settings for feed downloads
+FEED_CONNECT_TIMEOUT_SECONDS = 5
+FEED_READ_TIMEOUT_SECONDS = 15
+FEED_MAX_BYTES = 5 * 1024 * 1024
+FEED_USER_AGENT = 'ReturnOfTheJedAI/1.0 (+https://github.com/ishanyash/rotj_corpus)'
+
+# Per-host token buckets for feed fetching: host -> (requests per second, burst)
+HOST_RATE_LIMITS = {
+    'news.google.com': (1.0, 3),
+    'www.youtube.com': (2.0, 4),
+    'www.producthunt.com': (1.0, 2),
+}
+DEFAULT_HOST_RATE_LIMIT = (2.0, 5)
+# Separate buckets per host for other kinds of requests: scope -> (requests per second, burst)
+SCOPE_RATE_LIMITS = {
+    'resolve': (5.0, 10),  # URL resolution must not queue behind feed fetches
+}
+MAX_RETRY_AFTER_SECONDS = 120
+
+# Directory for state kept between runs (feed registry, caches, snapshots)
+STATE_DIR = os.environ.get(
+    'NEWSLETTER_STATE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), '.newsletter_state'),
+)
+
+# Warm-start bundle of all state, cached by the workflow between runs (see bundle.py)
+STATE_BUNDLE_FILE = os.environ.get(
+    'NEWSLETTER_STATE_BUNDLE',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), '.newsletter_state.bundle'),
+)
+
+# Tenant name used to key archived editions
+TENANT = os.environ.get('NEWSLETTER_TENANT', 'default')
+
+# Append-only archive of published editions (see archive.py), committed by the workflow
+ARCHIVE_EDITIONS = True
+ARCHIVE_DIR = os.environ.get(
+    'NEWSLETTER_ARCHIVE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'archive'),
+)
+
+# Adaptive feed polling: skip feeds that are unlikely to have new entries
+ADAPTIVE_POLLING = True
+POLL_MIN_INTERVAL_SECONDS = 15 * 60
+POLL_MAX_INTERVAL_SECONDS = 3 * 24 * 3600
+POLL_EXPECTED_NEW_ENTRIES = 0.5  # poll once this many new entries are expected
+POLL_RATE_SMOOTHING = 0.3  # EWMA weight of the latest arrival-rate observation
+
+# Incremental ingestion: only entries newer than each feed's watermark are re-processed
+INCREMENTAL_INGEST = True
+INGEST_MAX_SEEN_PER_FEED = 200
+
+# Canonical URL resolution of redirect links (see resolver.py)
+REDIRECT_HOSTS = {'news.google.com'}
+URL_RESOLVE_WORKERS = 8
+URL_RESOLVE_TIMEOUT_SECONDS = 5
+URL_RESOLVE_BUDGET = 15  # lookups per run; further links stay unresolved until a later run
+URL_CACHE_TTL_SECONDS = 30 * 24 * 3600  # resolved and non-redirecting links
+URL_CACHE_FAILURE_TTL_SECONDS = 3600  # retry failed resolutions after an hour
+
+# Feed health store and concurrent fetching (see feed_health.py)
+FETCH_WORKERS = 4  # concurrent feed downloads per section
+HEALTH_WINDOW = 50  # attempts (and yields) kept per feed
+HEALTH_DEAD_AFTER = 5  # consecutive failed attempts before a feed is skipped
+HEALTH_DEAD_RETRY_SECONDS = 24 * 3600  # probe a dead feed again after this long
+HEALTH_REPORT_ROWS = 10  # least healthy feeds listed in the run result
+INSIGHT_ENTRIES_PER_FEED = 5  # entries read from each insight feed; four are drawn from all of them
+
+# Hedged feed downloads: a second request once a feed outlasts its p90 latency (see hedging.py)
+HEDGE_REQUESTS = True
+HEDGE_MIN_DELAY_SECONDS = 0.5  # never hedge sooner than this
+HEDGE_BUDGET_MIN = 2  # hedges allowed per run regardless of volume...
+HEDGE_BUDGET_RATIO = 0.1  # ...plus this fraction of the run's downloads
+HEDGE_WORKERS = 16
+
+# Last-known-good feed snapshots, served when a feed fails, is slow or not due
+SNAPSHOT_ENTRIES = 15  # entries kept per feed
+SNAPSHOT_MAX_AGE_SECONDS = 7 * 24 * 3600
+FEED_LATENCY_BUDGET_SECONDS = 4  # read timeout for a single attempt when a snapshot exists
+
+# Opt-in profiling (see newsletter/profiling.py)
+PROFILE_DIR = os.path.join(STATE_DIR, 'profiles')
+PROFILE_TOP_N = 15
+PROFILE_SAMPLE_INTERVAL_SECONDS = 0.005
+
+# Section rendering: concurrent fragment rendering and the content-hash render cache
+RENDER_WORKERS = 4
+PIPELINE_SECTIONS = True  # render each section as soon as its content is fetched
+RENDER_CACHE_MAX_ENTRIES = 64
+
+# Google Docs API limits used to warn before a payload gets too large
+DOCS_MAX_DOCUMENT_CHARS = 1_020_000  # documented maximum document length
+DOCS_MAX_REQUEST_BYTES = 10 * 1024 * 1024  # conservative request body cap
+DOCS_LIMIT_WARNING_RATIO = 0.8
+
+# Logging (see newsletter/log.py)
+LOG_LEVEL = 'INFO'
+LOG_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'last_run.log')
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
 # Emoji maps for section headers
 EMOJIS = {
     "headline": ["🤖", "🚀", "🔥", "✨", "💡", "🌟", "🎮", "💻", "🧠", "🔮", "👁️", "🌐", "📱", "🤯"],
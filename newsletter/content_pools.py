@@ -6,8 +6,12 @@ import datetime
 import feedparser
 
 from . import config
-from .fetchers import fetch_feed_with_retry, _log, _clean_summary
+from .fetchers import _clean_summary
 from .history import was_published, record_published
+from .pipeline import new_meter, source, parse, record, keep, unique, take, record_yields
+from .log import get_logger
+
+logger = get_logger(__name__)
 
 
 # ---------------------------------------------------------------------------
@@ -48,33 +52,47 @@ FALLBACK_TOOLS = [
 ]
 
 
-def fetch_ai_tools(history):
-    """Fetch AI tools from Product Hunt RSS, falling back to expanded static pool."""
-    _log("Fetching AI tools")
-    tools = []
-
-    for feed_url in config.TOOL_FEEDS:
-        feed = fetch_feed_with_retry(feed_url)
-        if not feed:
-            continue
-        for entry in feed.entries[:15]:
-            title = html.unescape(entry.title) if hasattr(entry, 'title') else ""
-            if not title:
-                continue
-            tool = {
-                'name': title,
-                'link': entry.link if hasattr(entry, 'link') else "#",
-                'description': _clean_summary(getattr(entry, 'summary', '')),
-            }
-            if not was_published(tool['name'], history):
-                tools.append(tool)
+def _tool(entry, feed):
+    title = html.unescape(entry.title) if hasattr(entry, 'title') else ""
+    if not title:
+        return None
+    return {
+        'name': title,
+        'link': entry.link if hasattr(entry, 'link') else "#",
+        'description': _clean_summary(getattr(entry, 'summary', '')),
+    }
+
+
+def fetch_ai_tools(history, candidates=None):
+    """Fetch AI tools from Product Hunt RSS, falling back to expanded static pool.
+
+    Feeds are read lazily and stop being fetched once five tools are found.
+    The first five feed tools, published or not, are appended to candidates.
+    """
+    logger.info("Fetching AI tools")
+    meter = new_meter()
+    tools = take(
+        unique(
+            keep(
+                record(
+                    parse(source(config.TOOL_FEEDS, queue_key="tools", lookahead=config.FETCH_WORKERS),
+                          _tool, 15, meter),
+                    candidates, 5, lambda tool: [tool['name'], tool['link']],
+                ),
+                lambda tool: not was_published(tool['name'], history, url=tool['link']), meter,
+            ),
+            key=lambda tool: tool['name'].lower(),
+        ),
+        5,
+    )
+    record_yields(meter)
 
     if len(tools) >= 5:
-        _log(f"Found {len(tools)} tools from RSS feeds")
+        logger.info("Found %d tools from RSS feeds", len(tools))
         return tools[:5]
 
     # Fallback: use expanded static pool, filtered by history
-    _log("Using fallback tool pool")
+    logger.info("Using fallback tool pool")
     fallback = [t for t in FALLBACK_TOOLS if not was_published(t['name'], history)]
     random.shuffle(fallback)
     tools.extend(fallback)
@@ -109,34 +127,47 @@ FALLBACK_VIDEOS = [
 ]
 
 
-def fetch_youtube_video(history):
-    """Fetch latest AI video from YouTube channel RSS feeds."""
-    _log("Fetching YouTube recommendation")
-    candidates = []
-
-    for feed_url in config.YOUTUBE_CHANNEL_FEEDS:
-        feed = fetch_feed_with_retry(feed_url, max_retries=2)
-        if not feed:
-            continue
-        for entry in feed.entries[:3]:
-            title = html.unescape(entry.title) if hasattr(entry, 'title') else ""
-            if not title:
-                continue
-            video = {
-                'title': title,
-                'link': entry.link if hasattr(entry, 'link') else "#",
-                'channel': feed.feed.get('title', feed.feed.get('author', 'Unknown')),
-            }
-            if not was_published(video['title'], history):
-                candidates.append(video)
-
-    if candidates:
-        video = candidates[0]  # Most recent unwatched
-        _log(f"Selected video from RSS: {video['title']}")
+def _video(entry, feed):
+    title = html.unescape(entry.title) if hasattr(entry, 'title') else ""
+    if not title:
+        return None
+    return {
+        'title': title,
+        'link': entry.link if hasattr(entry, 'link') else "#",
+        'channel': feed.feed.get('title', feed.feed.get('author', 'Unknown')),
+    }
+
+
+def fetch_youtube_video(history, candidates=None):
+    """Fetch latest AI video from YouTube channel RSS feeds.
+
+    Channels are read in priority order and stop being fetched once an
+    unpublished video is found. The first feed video, published or not, is
+    appended to candidates.
+    """
+    logger.info("Fetching YouTube recommendation")
+    meter = new_meter()
+    videos = take(
+        keep(
+            record(
+                parse(source(config.YOUTUBE_CHANNEL_FEEDS, queue_key="video", max_retries=2,
+                             lookahead=config.FETCH_WORKERS),
+                      _video, 3, meter),
+                candidates, 1, lambda video: [video['title'], video['link']],
+            ),
+            lambda video: not was_published(video['title'], history, url=video['link']), meter,
+        ),
+        1,
+    )
+    record_yields(meter)
+
+    if videos:
+        video = videos[0]  # Most recent unwatched
+        logger.info("Selected video from RSS: %s", video['title'])
         return video
 
     # Fallback
-    _log("Using fallback video pool")
+    logger.info("Using fallback video pool")
     fallback = [v for v in FALLBACK_VIDEOS if not was_published(v['title'], history)]
     if fallback:
         return random.choice(fallback)
@@ -183,33 +214,52 @@ FALLBACK_INSIGHTS = [
 ]
 
 
-def fetch_insights(history):
-    """Fetch real insights from AI research blog RSS feeds, with fallback."""
-    _log("Fetching insights")
-    insights = []
-
-    for feed_url in config.INSIGHT_FEEDS:
-        feed = fetch_feed_with_retry(feed_url, max_retries=2)
-        if not feed:
-            continue
-        for entry in feed.entries[:5]:
-            title = html.unescape(entry.title) if hasattr(entry, 'title') else ""
-            if not title:
-                continue
-            if not was_published(title, history):
-                insights.append({
-                    'text': title,
-                    'source': feed.feed.get('title', 'AI Research'),
-                    'link': entry.link if hasattr(entry, 'link') else "#",
-                })
+def _insight(entry, feed):
+    title = html.unescape(entry.title) if hasattr(entry, 'title') else ""
+    if not title:
+        return None
+    return {
+        'text': title,
+        'source': feed.feed.get('title', 'AI Research'),
+        'link': entry.link if hasattr(entry, 'link') else "#",
+    }
+
+
+def fetch_insights(history, candidates=None):
+    """Fetch real insights from AI research blog RSS feeds, with fallback.
+
+    Four insights are drawn at random from the unpublished entries of all
+    INSIGHT_FEEDS (the first INSIGHT_ENTRIES_PER_FEED of each), so every
+    feed is sampled. The feed entries, published or not, are appended to
+    candidates.
+    """
+    logger.info("Fetching insights")
+    meter = new_meter()
+    pool = len(config.INSIGHT_FEEDS) * config.INSIGHT_ENTRIES_PER_FEED
+    insights = take(
+        unique(
+            keep(
+                record(
+                    parse(source(config.INSIGHT_FEEDS, queue_key="insights", max_retries=2,
+                                 lookahead=config.FETCH_WORKERS),
+                          _insight, config.INSIGHT_ENTRIES_PER_FEED, meter),
+                    candidates, pool, lambda insight: insight['text'],
+                ),
+                lambda insight: not was_published(insight['text'], history), meter,
+            ),
+            key=lambda insight: insight['text'].lower(),
+        ),
+        pool,
+    )
+    record_yields(meter)
 
     if len(insights) >= 4:
         random.shuffle(insights)
-        _log(f"Found {len(insights)} insights from RSS feeds")
+        logger.info("Found %d insights from RSS feeds", len(insights))
         return insights[:4]
 
     # Supplement with fallback insights
-    _log("Supplementing with fallback insights")
+    logger.info("Supplementing with fallback insights")
     fallback = [
         {'text': i, 'source': 'AI Research', 'link': None}
         for i in FALLBACK_INSIGHTS
@@ -355,7 +405,7 @@ ALL_PROMPT_TIPS = [
 
 def get_prompt_tip(history):
     """Return a prompt tip that hasn't been shown in the last 90 days."""
-    _log("Selecting prompt tip")
+    logger.info("Selecting prompt tip")
     for tip in ALL_PROMPT_TIPS:
         if not was_published(tip['intro'], history):
             return tip
@@ -2,6 +2,7 @@
 
 from difflib import SequenceMatcher
 from .history import was_published
+from .urls import url_key, item_url
 
 
 def similarity(a, b):
@@ -9,14 +10,22 @@ def similarity(a, b):
     return SequenceMatcher(None, a.lower(), b.lower()).ratio()
 
 
-def deduplicate_news(items, threshold=0.65):
+def deduplicate_news(items, threshold=0.65, known=()):
     """Remove near-duplicate news items based on title similarity.
 
     Uses O(n^2) comparison which is fine for <50 items.
     Keeps the first occurrence (earlier = higher priority feed).
+    known items (e.g. carried over from an earlier run) are already
+    deduplicated: they are kept, and items are only compared against them.
+    Items whose normalized URL was already accepted are rejected by a hash
+    lookup before any title comparison.
     """
-    unique = []
+    unique = list(known)
+    seen_urls = {url_key(item_url(item)) for item in unique} - {None}
     for item in items:
+        key = url_key(item_url(item))
+        if key in seen_urls:
+            continue
         is_dup = False
         for existing in unique:
             if similarity(item['title'], existing['title']) > threshold:
@@ -24,9 +33,11 @@ def deduplicate_news(items, threshold=0.65):
                 break
         if not is_dup:
             unique.append(item)
+            if key is not None:
+                seen_urls.add(key)
     return unique
 
 
 def filter_previously_published(items, history):
     """Remove items that were published in previous newsletter editions."""
-    return [item for item in items if not was_published(item['title'], history)]
+    return [item for item in items if not was_published(item['title'], history, url=item_url(item))]
@@ -0,0 +1,91 @@
+"""In-memory stand-in for the Google Docs v1 client.
+
+Implements just enough of documents().get() and documents().batchUpdate()
+for clear_document/write_to_doc/publish_staged: plain-text inserts and
+deletes are applied using UTF-16 indexes like the real API, a stale
+writeControl.requiredRevisionId is rejected, and formatting requests are
+recorded but not interpreted. Like a googleapiclient HttpRequest, a
+batchUpdate call's body can be replaced by raw JSON bytes before execute().
+"""
+
+import copy
+import json
+
+
+class FakeDocsError(Exception):
+    """Raised where the real API would answer with an HTTP 400."""
+
+
+class _Call:
+    """Mimics a googleapiclient HttpRequest: the work happens in execute()."""
+
+    def __init__(self, fn, body=None):
+        self._fn = fn
+        self.body = body
+        self.headers = {}
+
+    def execute(self):
+        if self.body is None:
+            return self._fn()
+        body = json.loads(self.body) if isinstance(self.body, (bytes, str)) else self.body
+        return self._fn(body)
+
+
+class _Documents:
+    def __init__(self, service):
+        self._service = service
+
+    def get(self, documentId):
+        return _Call(lambda: self._service._get(documentId))
+
+    def batchUpdate(self, documentId, body):
+        return _Call(lambda body: self._service._batch_update(documentId, body), body)
+
+
+class FakeDocsService:
+    """Records every batchUpdate and keeps a plain-text model of each document."""
+
+    def __init__(self):
+        self.docs = {}
+
+    def documents(self):
+        return _Documents(self)
+
+    def _doc(self, doc_id):
+        return self.docs.setdefault(doc_id, {
+            'title': doc_id, 'text': '\n', 'revision': 1, 'batches': [],
+        })
+
+    def _get(self, doc_id):
+        doc = self._doc(doc_id)
+        content = [{'endIndex': 1, 'sectionBreak': {}}]
+        length = len(doc['text'].encode('utf-16-le')) // 2
+        if length > 1:
+            content.append({'startIndex': 1, 'endIndex': length + 1})
+        return {
+            'documentId': doc_id,
+            'title': doc['title'],
+            'revisionId': str(doc['revision']),
+            'body': {'content': content},
+        }
+
+    def _batch_update(self, doc_id, body):
+        doc = self._doc(doc_id)
+        required = body.get('writeControl', {}).get('requiredRevisionId')
+        if required is not None and required != str(doc['revision']):
+            raise FakeDocsError(f"Revision {required} is not the current revision {doc['revision']}")
+
+        requests = body.get('requests', [])
+        text = doc['text'].encode('utf-16-le')
+        for request in requests:
+            if 'insertText' in request:
+                at = 2 * (request['insertText']['location']['index'] - 1)
+                text = text[:at] + request['insertText']['text'].encode('utf-16-le') + text[at:]
+            elif 'deleteContentRange' in request:
+                rng = request['deleteContentRange']['range']
+                text = text[:2 * (rng['startIndex'] - 1)] + text[2 * (rng['endIndex'] - 1):]
+        doc['text'] = text.decode('utf-16-le')
+        doc['batches'].append(copy.deepcopy(body))
+        doc['revision'] += 1
+        return {'documentId': doc_id, 'replies': [{} for _ in requests],
+                'writeControl': {'requiredRevisionId': str(doc['revision'])}}
@@ -0,0 +1,156 @@
+"""Per-feed health statistics kept across runs.
+
+Every download attempt records its latency and outcome (ok, empty or
+error), and every section records how many of a feed's entries it could
+use (the yield). From a rolling window of these the store derives latency
+percentiles, error, empty and yield rates. fetchers.fetch_feeds() uses
+them to start the slowest feeds first and to skip feeds that keep failing;
+a dead feed is probed again once HEALTH_DEAD_RETRY_SECONDS have passed.
+
+    python -m newsletter.feed_health     # print the ranked health table
+"""
+
+import math
+import time
+import threading
+
+from . import config
+from .state import load_state, save_state
+
+STATE_NAME = 'feed_health'
+
+_lock = threading.Lock()
+_health = None
+
+
+def _load():
+    global _health
+    if _health is None:
+        _health = load_state(STATE_NAME, {}) or {}
+    return _health
+
+
+def _record(url):
+    return _load().setdefault(url, {'attempts': [], 'yields': [], 'consecutive_failures': 0})
+
+
+def record_attempt(url, latency, outcome, now=None):
+    """Record one download attempt: outcome is 'ok', 'empty' or 'error'."""
+    now = now or time.time()
+    with _lock:
+        record = _record(url)
+        record['attempts'] = (record['attempts'] + [[now, round(latency, 3), outcome]])[-config.HEALTH_WINDOW:]
+        record['last_attempt'] = now
+        if outcome == 'ok':
+            record['consecutive_failures'] = 0
+            record['last_success'] = now
+        else:
+            record['consecutive_failures'] += 1
+
+
+def record_yield(url, relevant, considered):
+    """Record how many of the entries a section looked at it could use."""
+    if not considered:
+        return
+    with _lock:
+        record = _record(url)
+        record['yields'] = (record['yields'] + [[relevant, considered]])[-config.HEALTH_WINDOW:]
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    # Nearest-rank percentile
+    return sorted_values[max(0, math.ceil(q * len(sorted_values)) - 1)]
+
+
+def _summarize(url, record, now):
+    attempts = record.get('attempts', [])
+    latencies = sorted(a[1] for a in attempts if a[2] != 'error')
+    outcomes = [a[2] for a in attempts]
+    yields = record.get('yields', [])
+    considered = sum(y[1] for y in yields)
+    return {
+        'url': url,
+        'attempts': len(attempts),
+        'p50_seconds': _percentile(latencies, 0.5),
+        'p90_seconds': _percentile(latencies, 0.9),
+        'p99_seconds': _percentile(latencies, 0.99),
+        'error_rate': round(outcomes.count('error') / len(outcomes), 3) if outcomes else None,
+        'empty_rate': round(outcomes.count('empty') / len(outcomes), 3) if outcomes else None,
+        'yield_rate': round(sum(y[0] for y in yields) / considered, 3) if considered else None,
+        'consecutive_failures': record.get('consecutive_failures', 0),
+        'dead': _is_dead(record, now),
+    }
+
+
+def _is_dead(record, now):
+    return (record.get('consecutive_failures', 0) >= config.HEALTH_DEAD_AFTER
+            and now - record.get('last_attempt', 0) < config.HEALTH_DEAD_RETRY_SECONDS)
+
+
+def stats(url, now=None):
+    """Return the summarized health of one feed (all None if never fetched)."""
+    with _lock:
+        record = _load().get(url, {})
+        return _summarize(url, record, now or time.time())
+
+
+def is_dead(url, now=None):
+    """True if the feed keeps failing and is not yet due for another probe."""
+    with _lock:
+        record = _load().get(url)
+        return bool(record) and _is_dead(record, now or time.time())
+
+
+def latency_p90(url):
+    """The feed's 90th percentile download latency in seconds, or None if unknown."""
+    return stats(url)['p90_seconds']
+
+
+def order_by_latency(urls):
+    """Return urls slowest first (by p90 latency); feeds never fetched go first."""
+    with _lock:
+        now = time.time()
+        p90 = {url: _summarize(url, _load().get(url, {}), now)['p90_seconds'] for url in urls}
+    return sorted(urls, key=lambda url: -(p90[url] if p90[url] is not None else float('inf')))
+
+
+def health_table(now=None):
+    """All feeds ranked from least to most healthy."""
+    now = now or time.time()
+    with _lock:
+        rows = [_summarize(url, record, now) for url, record in _load().items()]
+    return sorted(rows, key=lambda r: (
+        not r['dead'],
+        -((r['error_rate'] or 0) + (r['empty_rate'] or 0)),
+        r['yield_rate'] if r['yield_rate'] is not None else 1.0,
+        -(r['p90_seconds'] or 0),
+    ))
+
+
+def format_table(rows):
+    """Render health_table() rows as fixed-width text."""
+    def fmt(value, pattern):
+        return '-' if value is None else pattern.format(value)
+
+    lines = [f"{'p50 s':>7} {'p90 s':>7} {'p99 s':>7} {'err':>6} {'empty':>6} {'yield':>6} {'n':>4}  feed"]
+    for r in rows:
+        lines.append(
+            f"{fmt(r['p50_seconds'], '{:.2f}'):>7} {fmt(r['p90_seconds'], '{:.2f}'):>7} "
+            f"{fmt(r['p99_seconds'], '{:.2f}'):>7} {fmt(r['error_rate'], '{:.0%}'):>6} "
+            f"{fmt(r['empty_rate'], '{:.0%}'):>6} {fmt(r['yield_rate'], '{:.0%}'):>6} "
+            f"{r['attempts']:>4}  {'[dead] ' if r['dead'] else ''}{r['url']}"
+        )
+    return '\n'.join(lines)
+
+
+def save_health():
+    """Persist the store if it was used during this run."""
+    with _lock:
+        if _health is not None:
+            save_state(STATE_NAME, _health)
+
+
+if __name__ == '__main__':
+    print(format_table(health_table()))
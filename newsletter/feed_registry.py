@@ -0,0 +1,96 @@
+"""Adaptive polling schedule for feeds, based on how often each one changes.
+
+The registry remembers, per feed URL, when it was last polled, when it last
+produced a new entry and an exponentially-weighted entry arrival rate.
+A feed is only polled again once enough time has passed that a new entry is
+likely; quiet feeds back off exponentially. Feeds that are not due are
+served from their last-known-good snapshot (see snapshots.py) instead.
+"""
+
+import time
+import threading
+
+from . import config
+from .state import load_state, save_state
+
+STATE_NAME = 'feed_registry'
+MAX_SEEN_IDS = 100
+
+_lock = threading.Lock()
+_registry = None
+
+
+def _load():
+    global _registry
+    if _registry is None:
+        _registry = load_state(STATE_NAME, {}) or {}
+    return _registry
+
+
+def _entry_id(entry):
+    return entry.get('id') or entry.get('link') or entry.get('title', '')
+
+
+def poll_interval(record):
+    """Seconds to wait before polling a feed again.
+
+    The base interval is the time in which we expect POLL_EXPECTED_NEW_ENTRIES
+    new entries at the observed rate; each consecutive unchanged poll doubles it.
+    """
+    if 'arrival_rate' not in record:
+        # Only one poll so far, no rate estimate yet
+        return config.POLL_MIN_INTERVAL_SECONDS
+    rate = record['arrival_rate']  # entries per hour
+    if rate > 0:
+        base = config.POLL_EXPECTED_NEW_ENTRIES / rate * 3600
+    else:
+        base = config.POLL_MAX_INTERVAL_SECONDS
+    backoff = 2 ** min(record.get('unchanged_polls', 0), 6)
+    return max(config.POLL_MIN_INTERVAL_SECONDS, min(base * backoff, config.POLL_MAX_INTERVAL_SECONDS))
+
+
+def is_due(url, now=None):
+    """Return True if the feed should be polled on this run."""
+    if not config.ADAPTIVE_POLLING:
+        return True
+    now = now or time.time()
+    with _lock:
+        record = _load().get(url)
+        if not record:
+            return True
+        return now >= record.get('next_poll', 0)
+
+
+def observe(url, feed, now=None):
+    """Record a successful poll: update arrival rate and backoff."""
+    now = now or time.time()
+    with _lock:
+        registry = _load()
+        record = registry.setdefault(url, {})
+        previous_ids = record.get('seen_ids', [])
+        seen = set(previous_ids)
+        ids = [_entry_id(e) for e in feed.entries]
+        current = set(ids)
+        new_count = sum(1 for i in ids if i not in seen) if seen else 0
+
+        last_polled = record.get('last_polled')
+        if last_polled and now > last_polled:
+            observed_rate = new_count / ((now - last_polled) / 3600)
+            alpha = config.POLL_RATE_SMOOTHING
+            record['arrival_rate'] = alpha * observed_rate + (1 - alpha) * record.get('arrival_rate', observed_rate)
+        if new_count or not seen:
+            record['last_changed'] = now
+            record['unchanged_polls'] = 0
+        else:
+            record['unchanged_polls'] = record.get('unchanged_polls', 0) + 1
+
+        record['last_polled'] = now
+        record['seen_ids'] = (ids + [i for i in previous_ids if i not in current])[:MAX_SEEN_IDS]
+        record['next_poll'] = now + poll_interval(record)
+
+
+def save_registry():
+    """Persist the registry if it was loaded during this run."""
+    with _lock:
+        if _registry is not None:
+            save_state(STATE_NAME, _registry)
@@ -4,42 +4,205 @@ import re
 import html
 import time
 import datetime
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, wait
 import feedparser
 
 from . import config
 from .dedup import deduplicate_news, filter_previously_published
 from .history import was_published
+from .transport import FeedFetchError
+from .hedging import hedged_download
+from .ratelimit import acquire, honour_retry_after
+from . import feed_registry
+from . import snapshots
+from . import ingest
+from . import feed_health
+from .resolver import resolve_items, needs_resolution
+from .urls import item_url
+from .log import get_logger, in_context
 
+logger = get_logger(__name__)
 
-def _log(message, level="INFO"):
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{level}] {timestamp} - {message}")
+# Optional replacement for live fetching, e.g. archived snapshots in a backfill
+_feed_source = None
 
+# Downloads still running after their fetch_feeds() consumer stopped early
+_in_flight_lock = threading.Lock()
+_in_flight = set()
 
-def fetch_feed_with_retry(url, max_retries=None, delay=None):
-    """Fetch an RSS feed with exponential backoff retry."""
+
+@contextlib.contextmanager
+def use_feed_source(source):
+    """Serve get_feed() from source(url) instead of the network while active."""
+    global _feed_source
+    previous, _feed_source = _feed_source, source
+    try:
+        yield
+    finally:
+        _feed_source = previous
+
+
+def replaying():
+    """True while get_feed() is served by use_feed_source() rather than the network."""
+    return _feed_source is not None
+
+
+def fetch_feed_with_retry(url, max_retries=None, delay=None, queue_key="default", timeout=None):
+    """Fetch an RSS feed with exponential backoff retry.
+
+    Every attempt first waits for a token from the host's rate limiter;
+    queue_key (usually the section name) decides fair ordering between callers.
+    timeout overrides the default (connect, read) timeouts of the download.
+    A download slower than the feed's usual p90 latency is hedged with a
+    second request (see hedging.py).
+    """
     if max_retries is None:
         max_retries = config.MAX_RETRIES
     if delay is None:
         delay = config.RETRY_DELAY_SECONDS
 
     for attempt in range(max_retries):
+        started = time.monotonic()
         try:
-            feed = feedparser.parse(url)
+            acquire(url, queue_key)
+            started = time.monotonic()  # latency excludes the rate-limit wait
+            content, headers = hedged_download(url, queue_key, timeout=timeout)
+            feed = feedparser.parse(content, response_headers={
+                'content-type': headers.get('Content-Type', ''),
+                'content-location': url,
+            })
+            feed_health.record_attempt(url, time.monotonic() - started, 'ok' if feed.entries else 'empty')
             if feed.entries:
                 return feed
             # Empty feed — might be temporary, retry
             if attempt < max_retries - 1:
                 time.sleep(delay * (attempt + 1))
                 continue
+        except FeedFetchError as e:
+            feed_health.record_attempt(url, time.monotonic() - started, 'error')
+            logger.warning("Feed fetch attempt %d/%d failed for %s: %s", attempt + 1, max_retries, url, e,
+                           extra={'feed': url, 'section': queue_key})
+            # A Retry-After pause is enforced by the limiter on the next acquire
+            if honour_retry_after(url, e.retry_after) is None and attempt < max_retries - 1:
+                time.sleep(delay * (attempt + 1))
         except Exception as e:
-            _log(f"Feed fetch attempt {attempt + 1}/{max_retries} failed for {url}: {e}", "WARNING")
+            feed_health.record_attempt(url, time.monotonic() - started, 'error')
+            logger.warning("Feed fetch attempt %d/%d failed for %s: %s", attempt + 1, max_retries, url, e,
+                           extra={'feed': url, 'section': queue_key})
             if attempt < max_retries - 1:
                 time.sleep(delay * (attempt + 1))
 
     return None
 
 
+def get_feed(url, max_retries=None, queue_key="default"):
+    """Return a feed, polling it only if the adaptive schedule says it is due.
+
+    Feeds that are not due are served from their last-known-good snapshot.
+    If a fresh snapshot exists the feed gets a single attempt within
+    FEED_LATENCY_BUDGET_SECONDS, and the snapshot is served if that fails,
+    instead of sleeping through retries.
+    """
+    if _feed_source is not None:
+        return _feed_source(url)
+
+    has_snapshot = snapshots.has_fresh(url)
+    if has_snapshot and not feed_registry.is_due(url):
+        logger.info("Serving snapshot for %s (not due for polling)", url,
+                    extra={'feed': url, 'section': queue_key})
+        return snapshots.serve(url, queue_key, reason="not_due")
+
+    if has_snapshot:
+        feed = fetch_feed_with_retry(
+            url, max_retries=1, queue_key=queue_key,
+            timeout=(config.FEED_CONNECT_TIMEOUT_SECONDS, config.FEED_LATENCY_BUDGET_SECONDS),
+        )
+    else:
+        feed = fetch_feed_with_retry(url, max_retries=max_retries, queue_key=queue_key)
+
+    if feed:
+        feed_registry.observe(url, feed)
+        snapshots.store(url, feed)
+        return feed
+
+    if has_snapshot:
+        logger.warning("Serving last-known-good snapshot for %s", url,
+                       extra={'feed': url, 'section': queue_key})
+        return snapshots.serve(url, queue_key, reason="fetch_failed")
+    return None
+
+
+def fetch_feeds(urls, max_retries=None, queue_key="default", lookahead=None):
+    """Fetch feeds concurrently, yielding (url, feed) in the given priority order.
+
+    Downloads start slowest first (by p90 latency from the health store) so
+    the slow ones overlap the rest; feeds that keep failing are skipped
+    until they are due for another probe. feed is None if fetching failed.
+
+    With lookahead, downloads run at most that many feeds ahead of the
+    consumer. Closing the generator early (e.g. once a section has enough
+    items) cancels the downloads that have not started; those already
+    running finish in the background (see wait_for_downloads()).
+    """
+    urls = list(urls)
+    if _feed_source is None:
+        skipped = [url for url in urls if feed_health.is_dead(url)]
+        for url in skipped:
+            logger.info("Skipping dead feed %s", url, extra={'feed': url, 'section': queue_key})
+        urls = [url for url in urls if url not in skipped]
+    if not urls:
+        return
+
+    lookahead = lookahead or len(urls)
+    pool = ThreadPoolExecutor(max_workers=config.FETCH_WORKERS, thread_name_prefix='fetch')
+    futures = {}
+    consumed = 0
+    try:
+        for i, url in enumerate(urls):
+            window = [u for u in urls[i:i + lookahead] if u not in futures]
+            for u in feed_health.order_by_latency(window):
+                futures[u] = pool.submit(in_context(get_feed), u, max_retries, queue_key)
+            feed = futures[url].result()
+            consumed += 1
+            yield url, feed
+    finally:
+        cancelled = sum(1 for f in futures.values() if f.cancel())
+        running = [f for f in futures.values() if not f.done()]
+        with _in_flight_lock:
+            _in_flight.update(running)
+        for future in running:
+            future.add_done_callback(_finished)
+        pool.shutdown(wait=False, cancel_futures=True)
+        never_started = cancelled + len(urls) - len(futures)
+        if consumed < len(urls) and never_started:
+            logger.info("Stopped early: %d %s feed download(s) not started", never_started, queue_key,
+                        extra={'section': queue_key})
+
+
+def _finished(future):
+    with _in_flight_lock:
+        _in_flight.discard(future)
+
+
+def wait_for_downloads():
+    """Block until downloads left running by closed fetch_feeds() generators finish.
+
+    They still update the feed registry, snapshots and health store, so
+    call this before saving that state.
+    """
+    with _in_flight_lock:
+        running = list(_in_flight)
+    wait(running)
+
+
+def record_yield(url, relevant, considered):
+    """Feed the health store's yield statistics; replayed feeds are not recorded."""
+    if _feed_source is None:
+        feed_health.record_yield(url, relevant, considered)
+
+
 def is_ai_relevant(title, summary=""):
     """Check if an article is genuinely about AI, not a false positive."""
     text = (title + " " + summary).lower()
@@ -76,37 +239,74 @@ def _extract_source(title):
     return title, "AI News"
 
 
-def fetch_ai_news(history):
-    """Fetch AI news from Google News RSS feeds with dedup and history filtering."""
-    _log("Fetching AI news")
-    news_items = []
+def _news_item(entry):
+    """Turn a feed entry into a news item, or None if it is not about AI."""
+    raw_title = html.unescape(entry.title) if hasattr(entry, 'title') else "Untitled"
+    raw_summary = entry.summary if hasattr(entry, 'summary') else ""
 
-    for feed_url in config.NEWS_FEEDS:
-        feed = fetch_feed_with_retry(feed_url)
-        if not feed:
-            _log(f"Failed to fetch feed: {feed_url}", "WARNING")
-            continue
+    if not is_ai_relevant(raw_title, raw_summary):
+        return None
 
-        for entry in feed.entries[:5]:
-            raw_title = html.unescape(entry.title) if hasattr(entry, 'title') else "Untitled"
-            raw_summary = entry.summary if hasattr(entry, 'summary') else ""
+    title, source = _extract_source(raw_title)
+    summary = _clean_summary(raw_summary)
 
-            if not is_ai_relevant(raw_title, raw_summary):
-                continue
+    return {
+        'title': title,
+        'link': entry.link if hasattr(entry, 'link') else "#",
+        'published': entry.published if hasattr(entry, 'published') else datetime.datetime.now().isoformat(),
+        'summary': summary,
+        'source': source,
+    }
 
-            title, source = _extract_source(raw_title)
-            summary = _clean_summary(raw_summary)
 
-            news_items.append({
-                'title': title,
-                'link': entry.link if hasattr(entry, 'link') else "#",
-                'published': entry.published if hasattr(entry, 'published') else datetime.datetime.now().isoformat(),
-                'summary': summary,
-                'source': source,
-            })
+def fetch_ai_news(history, candidates=None):
+    """Fetch AI news from Google News RSS feeds with dedup and history filtering.
+
+    The deduplicated items, published or not, are appended to candidates as
+    [title, url] pairs.
+
+    With config.INCREMENTAL_INGEST, entries processed on earlier runs are
+    carried forward from the ingest index and only new entries are cleaned,
+    scored and deduplicated. Carried items whose redirect link was not
+    resolved yet (it was over an earlier run's lookup budget) are resolved
+    with the new ones. Replayed feeds (use_feed_source) are always
+    processed from scratch and their links are not resolved.
+    """
+    logger.info("Fetching AI news")
+    incremental = config.INCREMENTAL_INGEST and _feed_source is None
+    carried, news_items = [], []
+    pending = []  # fresh ingest slots awaiting the dedup outcome
+    carried_slots = []  # (slot, item) of carried items
+
+    for feed_url, feed in fetch_feeds(config.NEWS_FEEDS, queue_key="news"):
+        if not feed:
+            logger.warning("Failed to fetch feed: %s", feed_url, extra={'feed': feed_url, 'section': 'news'})
+            continue
+
+        entries = feed.entries[:5]
+        if incremental:
+            old, new = ingest.split_entries(feed_url, entries, _news_item, pending, carried_slots)
+            carried.extend(old)
+            news_items.extend(new)
+            record_yield(feed_url, len(old) + len(new), len(entries))
+            continue
+        items = [item for item in map(_news_item, entries) if item]
+        news_items.extend(items)
+        record_yield(feed_url, len(items), len(entries))
+
+    # Resolve redirect links so the same article from several queries dedups by URL
+    if _feed_source is None:
+        unresolved = [(slot, item) for slot, item in carried_slots
+                      if 'canonical_url' not in item and needs_resolution(item.get('link'))]
+        resolve_items(news_items + [item for _, item in unresolved])
+        ingest.refresh_carried([(slot, item) for slot, item in unresolved if 'canonical_url' in item])
 
-    # Deduplicate within this run
-    news_items = deduplicate_news(news_items)
+    # Deduplicate within this run; carried items were deduplicated when first seen
+    news_items = deduplicate_news(news_items, known=carried)
+    if incremental:
+        ingest.record_dedup(news_items, pending)
+    if candidates is not None:
+        candidates.extend([item['title'], item_url(item)] for item in news_items)
 
     # Filter out previously published stories
     news_items = filter_previously_published(news_items, history)
@@ -114,5 +314,5 @@ def fetch_ai_news(history):
     # Sort by publication date, newest first
     news_items.sort(key=lambda x: x['published'], reverse=True)
 
-    _log(f"Collected {len(news_items)} unique news items")
+    logger.info("Collected %d unique news items", len(news_items))
     return news_items
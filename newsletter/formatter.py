@@ -1,5 +1,110 @@
 """Google Docs API rich formatting — builds structured API requests for headings, bold, links, etc."""
 
+import json
+
+# Bumped whenever the shape or indexing of generated requests changes,
+# so cached fragments from older versions are not reused.
+FORMAT_VERSION = 3
+
+LINK_COLOR = (0.06, 0.45, 0.85)
+RULE_COLOR = (0.8, 0.8, 0.8)
+
+
+def utf16_length(text):
+    """Length of text in UTF-16 code units, the unit Docs API indexes use."""
+    return len(text.encode('utf-16-le')) // 2
+
+
+def _rgb(red, green, blue):
+    return {'color': {'rgbColor': {'red': red, 'green': green, 'blue': blue}}}
+
+
+def _range(start, end):
+    return {'startIndex': start, 'endIndex': end}
+
+
+# Formatting ops are kept as (kind, start, end, args) tuples; these turn
+# one into its API request.
+_BUILDERS = {
+    'heading': lambda start, end, style: {'updateParagraphStyle': {
+        'range': _range(start, end),
+        'paragraphStyle': {'namedStyleType': style},
+        'fields': 'namedStyleType',
+    }},
+    'bold': lambda start, end: {'updateTextStyle': {
+        'range': _range(start, end),
+        'textStyle': {'bold': True},
+        'fields': 'bold',
+    }},
+    'italic': lambda start, end: {'updateTextStyle': {
+        'range': _range(start, end),
+        'textStyle': {'italic': True},
+        'fields': 'italic',
+    }},
+    'link': lambda start, end, url: {'updateTextStyle': {
+        'range': _range(start, end),
+        'textStyle': {'link': {'url': url}, 'foregroundColor': _rgb(*LINK_COLOR)},
+        'fields': 'link,foregroundColor',
+    }},
+    'bold_link': lambda start, end, url: {'updateTextStyle': {
+        'range': _range(start, end),
+        'textStyle': {'bold': True, 'link': {'url': url}, 'foregroundColor': _rgb(*LINK_COLOR)},
+        'fields': 'bold,link,foregroundColor',
+    }},
+    'rule': lambda start, end: {'updateParagraphStyle': {
+        'range': _range(start, end),
+        'paragraphStyle': {
+            'borderBottom': {
+                'color': _rgb(*RULE_COLOR),
+                'width': {'magnitude': 1, 'unit': 'PT'},
+                'padding': {'magnitude': 6, 'unit': 'PT'},
+                'dashStyle': 'SOLID',
+            }
+        },
+        'fields': 'borderBottom',
+    }},
+    'color': lambda start, end, red, green, blue: {'updateTextStyle': {
+        'range': _range(start, end),
+        'textStyle': {'foregroundColor': _rgb(red, green, blue)},
+        'fields': 'foregroundColor',
+    }},
+    'bullets': lambda start, end: {'createParagraphBullets': {
+        'range': _range(start, end),
+        'bulletPreset': 'BULLET_DISC_CIRCLE_SQUARE',
+    }},
+}
+
+_ARITY = {'heading': 1, 'link': 1, 'bold_link': 1, 'color': 3}
+
+
+def _compile_template(kind):
+    """The compact JSON of a request with %s slots for start, end and each arg.
+
+    Built once by rendering the request with placeholder values, so it
+    always matches json.dumps of the corresponding build_requests() entry.
+    """
+    slots = ['\x00slot%d\x00' % i for i in range(2 + _ARITY.get(kind, 0))]
+    text = json.dumps(_BUILDERS[kind](*slots), separators=(',', ':')).replace('%', '%%')
+    for slot in slots:
+        text = text.replace(json.dumps(slot), '%s')
+    return text
+
+
+_TEMPLATES = {kind: _compile_template(kind) for kind in _BUILDERS}
+_encode = json.JSONEncoder(separators=(',', ':')).encode
+
+
+def _op_request(op):
+    kind, start, end, args = op
+    return _BUILDERS[kind](start, end, *args)
+
+
+def _op_json(op):
+    kind, start, end, args = op
+    if args:
+        return _TEMPLATES[kind] % (start, end, *map(_encode, args))
+    return _TEMPLATES[kind] % (start, end)
+
 
 class DocFormatter:
     """Builds a list of Google Docs API requests for rich document formatting.
@@ -9,33 +114,71 @@ class DocFormatter:
     2. Tracks formatting operations (headings, bold, links, dividers) with exact character ranges.
 
     After all content is added, call build_requests() to get the complete list
-    of API requests: one insertText followed by all formatting operations.
+    of API requests: one insertText followed by all formatting operations, or
+    build_payload() for the same requests already serialized as the JSON
+    body of a batchUpdate. Formatting operations are kept as compact
+    (kind, start, end, args) tuples until then.
+
+    A formatter created with fragment() starts at index 0 so it can be built
+    independently (and cached or rendered concurrently); extend() appends a
+    fragment and rebases its formatting ranges onto the current cursor.
     """
 
-    def __init__(self):
+    def __init__(self, origin=1):
         self._text_parts = []
         self._format_ops = []
-        self._cursor = 1  # Google Docs body starts at index 1
+        self._origin = origin
+        self._cursor = origin  # Google Docs body starts at index 1
+
+    @classmethod
+    def fragment(cls):
+        """Return a formatter with relative offsets, for later use with extend()."""
+        return cls(origin=0)
+
+    @property
+    def length(self):
+        return self._cursor - self._origin
+
+    def extend(self, fragment):
+        """Append a fragment's text and formatting, shifted to the current cursor."""
+        offset = self._cursor - fragment._origin
+        self._text_parts.extend(fragment._text_parts)
+        if offset:
+            self._format_ops.extend((kind, start + offset, end + offset, args)
+                                    for kind, start, end, args in fragment._format_ops)
+        else:
+            self._format_ops.extend(fragment._format_ops)
+        self._cursor += fragment.length
+
+    def to_dict(self):
+        """Serializable form of a fragment (for the render cache)."""
+        return {'text': ''.join(self._text_parts), 'ops': self._format_ops, 'origin': self._origin}
+
+    @classmethod
+    def from_dict(cls, data):
+        fmt = cls(origin=data['origin'])
+        if data['text']:
+            fmt._advance(data['text'])
+        fmt._format_ops = [(kind, start, end, tuple(args)) for kind, start, end, args in data['ops']]
+        return fmt
 
     def _advance(self, text):
         """Record text and advance the cursor."""
         self._text_parts.append(text)
-        length = len(text)
+        length = utf16_length(text)  # emoji outside the BMP count as two
         start = self._cursor
         self._cursor += length
         return start, self._cursor
 
+    def _format(self, kind, text, *args):
+        """Add text and a formatting op of the given kind over it."""
+        start, end = self._advance(text)
+        self._format_ops.append((kind, start, end, args))
+
     def add_heading(self, text, level=1):
         """Add a heading (H1, H2, or H3)."""
-        start, end = self._advance(text + '\n')
         heading_map = {1: 'HEADING_1', 2: 'HEADING_2', 3: 'HEADING_3'}
-        self._format_ops.append({
-            'updateParagraphStyle': {
-                'range': {'startIndex': start, 'endIndex': end},
-                'paragraphStyle': {'namedStyleType': heading_map.get(level, 'HEADING_1')},
-                'fields': 'namedStyleType',
-            }
-        })
+        self._format('heading', text + '\n', heading_map.get(level, 'HEADING_1'))
 
     def add_text(self, text):
         """Add plain text."""
@@ -47,91 +190,27 @@ class DocFormatter:
 
     def add_bold_text(self, text):
         """Add bold text (no trailing newline)."""
-        start, end = self._advance(text)
-        self._format_ops.append({
-            'updateTextStyle': {
-                'range': {'startIndex': start, 'endIndex': end},
-                'textStyle': {'bold': True},
-                'fields': 'bold',
-            }
-        })
+        self._format('bold', text)
 
     def add_italic_text(self, text):
         """Add italic text."""
-        start, end = self._advance(text)
-        self._format_ops.append({
-            'updateTextStyle': {
-                'range': {'startIndex': start, 'endIndex': end},
-                'textStyle': {'italic': True},
-                'fields': 'italic',
-            }
-        })
+        self._format('italic', text)
 
     def add_link(self, display_text, url):
         """Add a clickable hyperlink."""
-        start, end = self._advance(display_text)
-        self._format_ops.append({
-            'updateTextStyle': {
-                'range': {'startIndex': start, 'endIndex': end},
-                'textStyle': {
-                    'link': {'url': url},
-                    'foregroundColor': {
-                        'color': {'rgbColor': {'red': 0.06, 'green': 0.45, 'blue': 0.85}}
-                    },
-                },
-                'fields': 'link,foregroundColor',
-            }
-        })
+        self._format('link', display_text, url)
 
     def add_bold_link(self, display_text, url):
         """Add a bold clickable hyperlink."""
-        start, end = self._advance(display_text)
-        self._format_ops.append({
-            'updateTextStyle': {
-                'range': {'startIndex': start, 'endIndex': end},
-                'textStyle': {
-                    'bold': True,
-                    'link': {'url': url},
-                    'foregroundColor': {
-                        'color': {'rgbColor': {'red': 0.06, 'green': 0.45, 'blue': 0.85}}
-                    },
-                },
-                'fields': 'bold,link,foregroundColor',
-            }
-        })
+        self._format('bold_link', display_text, url)
 
     def add_horizontal_rule(self):
         """Add a visual divider using a bottom-bordered empty paragraph."""
-        start, end = self._advance('\n')
-        self._format_ops.append({
-            'updateParagraphStyle': {
-                'range': {'startIndex': start, 'endIndex': end},
-                'paragraphStyle': {
-                    'borderBottom': {
-                        'color': {'color': {'rgbColor': {'red': 0.8, 'green': 0.8, 'blue': 0.8}}},
-                        'width': {'magnitude': 1, 'unit': 'PT'},
-                        'padding': {'magnitude': 6, 'unit': 'PT'},
-                        'dashStyle': 'SOLID',
-                    }
-                },
-                'fields': 'borderBottom',
-            }
-        })
+        self._format('rule', '\n')
 
     def add_colored_text(self, text, red=0.0, green=0.0, blue=0.0):
         """Add text with a custom color."""
-        start, end = self._advance(text)
-        self._format_ops.append({
-            'updateTextStyle': {
-                'range': {'startIndex': start, 'endIndex': end},
-                'textStyle': {
-                    'foregroundColor': {
-                        'color': {'rgbColor': {'red': red, 'green': green, 'blue': blue}}
-                    }
-                },
-                'fields': 'foregroundColor',
-            }
-        })
+        self._format('color', text, red, green, blue)
 
     def add_bullet_item(self, text):
         """Add a line of text. Bullet formatting is applied separately via add_bullets_to_range."""
@@ -139,12 +218,7 @@ class DocFormatter:
 
     def add_bullets_to_range(self, start_index, end_index):
         """Apply bullet list formatting to a range of paragraphs."""
-        self._format_ops.append({
-            'createParagraphBullets': {
-                'range': {'startIndex': start_index, 'endIndex': end_index},
-                'bulletPreset': 'BULLET_DISC_CIRCLE_SQUARE',
-            }
-        })
+        self._format_ops.append(('bullets', start_index, end_index, ()))
 
     def build_requests(self):
         """Return the complete list of API requests: insert text, then apply formatting."""
@@ -158,4 +232,17 @@ class DocFormatter:
                 'text': full_text,
             }
         }
-        return [insert_request] + self._format_ops
+        return [insert_request] + [_op_request(op) for op in self._format_ops]
+
+    def build_payload(self):
+        """Return the batchUpdate body {"requests": build_requests()} as compact JSON bytes.
+
+        Each op is written straight from its precompiled template, without
+        building the request dicts.
+        """
+        full_text = ''.join(self._text_parts)
+        if not full_text:
+            return b'{"requests":[]}'
+        parts = ['{"insertText":{"location":{"index":1},"text":%s}}' % _encode(full_text)]
+        parts.extend(map(_op_json, self._format_ops))
+        return ('{"requests":[' + ','.join(parts) + ']}').encode()
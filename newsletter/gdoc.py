@@ -1,22 +1,28 @@
 """Google Doc read/write/clear operations."""
 
+import json
 import datetime
+import collections
 
+from . import config
+from .formatter import utf16_length
+from .log import get_logger
+from .state import load_state, save_state
 
-def _log(message, level="INFO"):
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{level}] {timestamp} - {message}")
+PUBLISHED_STATE = 'published_editions'
+
+logger = get_logger(__name__)
 
 
 def clear_document(docs_service, doc_id):
     """Delete all content from the Google Doc before inserting a new edition."""
-    _log("Clearing existing document content")
+    logger.info("Clearing existing document content")
     doc = docs_service.documents().get(documentId=doc_id).execute()
     body = doc.get('body', {})
     content = body.get('content', [])
 
     if len(content) <= 1:
-        _log("Document is already empty")
+        logger.info("Document is already empty")
         return
 
     # Find the end index of the document body
@@ -35,19 +41,165 @@ def clear_document(docs_service, doc_id):
             documentId=doc_id,
             body={'requests': requests},
         ).execute()
-        _log("Document cleared successfully")
+        logger.info("Document cleared successfully")
+
+
+_PAYLOAD_PREFIX = b'{"requests":['
+_compact = json.JSONEncoder(separators=(',', ':')).encode
+
 
+def _execute_payload(docs_service, doc_id, payload):
+    """Send payload (JSON bytes) as the body of a batchUpdate, as is.
 
-def write_to_doc(docs_service, doc_id, api_requests):
-    """Execute a list of Google Docs API requests (insert + formatting)."""
-    if not api_requests:
-        _log("No requests to execute", "WARNING")
+    The request is built with an empty body and its body then replaced, so
+    googleapiclient never parses or re-serializes the payload.
+    """
+    request = docs_service.documents().batchUpdate(documentId=doc_id, body={})
+    request.body = payload
+    request.headers['content-length'] = str(len(payload))
+    return request.execute()
+
+
+def write_to_doc(docs_service, doc_id, payload):
+    """Execute an edition's batchUpdate body (DocFormatter.build_payload(): insert + formatting)."""
+    if not payload or payload == _PAYLOAD_PREFIX + b']}':
+        logger.warning("No requests to execute")
         return False
 
-    _log(f"Writing to Google Doc ({len(api_requests)} API requests)")
-    docs_service.documents().batchUpdate(
-        documentId=doc_id,
-        body={'requests': api_requests},
-    ).execute()
-    _log("Google Doc updated successfully")
+    logger.info("Writing to Google Doc (%d bytes)", len(payload))
+    _execute_payload(docs_service, doc_id, payload)
+    logger.info("Google Doc updated successfully")
     return True
+
+
+def _split_payload(payload):
+    """Split a build_payload() body into (inserted text, insert request JSON, formatting requests JSON).
+
+    Only the insert request is decoded; the formatting requests are sliced
+    out as they are ("" if there are none).
+    """
+    text = payload.decode()
+    start = len(_PAYLOAD_PREFIX)
+    insert, end = json.JSONDecoder().raw_decode(text, start)
+    return insert['insertText']['text'], text[start:end], text[end + 1:-2]
+
+
+def _swap_payload(payload, old_end_index, write_control=None):
+    """Rewrite an edition's body to prepend it ahead of the old content and delete the old content.
+
+    The edition's requests assume an empty document (text inserted at
+    index 1), which is still true for the inserted region. The new region is
+    first reset to plain, unbulleted paragraphs, because text inserted at
+    index 1 would otherwise inherit the old first paragraph's style. The
+    formatting requests are spliced in without being decoded.
+    """
+    inserted, insert, format_ops = _split_payload(payload)
+    new_length = utf16_length(inserted)
+    new_range = {'startIndex': 1, 'endIndex': 1 + new_length}
+    parts = [insert] + [_compact(request) for request in (
+        {'updateParagraphStyle': {
+            'range': new_range,
+            'paragraphStyle': {'namedStyleType': 'NORMAL_TEXT'},
+            'fields': 'namedStyleType',
+        }},
+        {'updateTextStyle': {
+            'range': new_range,
+            'textStyle': {},
+            'fields': 'bold,italic,link,foregroundColor',
+        }},
+        {'deleteParagraphBullets': {'range': new_range}},
+    )]
+    if format_ops:
+        parts.append(format_ops)
+    if old_end_index > 2:
+        parts.append(_compact({'deleteContentRange': {'range': {
+            'startIndex': 1 + new_length,
+            'endIndex': old_end_index - 1 + new_length,  # preserve the final newline
+        }}}))
+    body = '{"requests":[' + ','.join(parts) + ']'
+    if write_control:
+        body += ',"writeControl":' + _compact(write_control)
+    return (body + '}').encode()
+
+
+def publish_staged(docs_service, doc_id, payload):
+    """Replace the document's content with one atomic batchUpdate.
+
+    payload is the edition's batchUpdate body from DocFormatter.build_payload().
+    The new edition is inserted ahead of the old content, formatted, and the
+    old content deleted in the same request, so readers never see an empty
+    document and a failed write leaves the previous edition in place. The
+    request is pinned to the revision read just before with
+    writeControl.requiredRevisionId, so a concurrent edit makes it fail
+    instead of deleting the wrong range. The edition it replaced is kept
+    for rollback().
+    """
+    if not payload or payload == _PAYLOAD_PREFIX + b']}':
+        logger.warning("No requests to execute")
+        return False
+
+    doc = docs_service.documents().get(documentId=doc_id).execute()
+    content = doc.get('body', {}).get('content', [])
+    end_index = content[-1].get('endIndex', 1) if len(content) > 1 else 1
+    revision_id = doc.get('revisionId')
+
+    write_control = {'requiredRevisionId': revision_id} if revision_id else None
+    body = _swap_payload(payload, end_index, write_control)
+
+    logger.info("Publishing staged edition (%d bytes, base revision %s)", len(body), revision_id)
+    _execute_payload(docs_service, doc_id, body)
+    logger.info("Google Doc updated successfully")
+
+    published = load_state(PUBLISHED_STATE, {}) or {}
+    published[doc_id] = {
+        'current': {
+            'payload': payload.decode(),
+            'replaced_revision': revision_id,
+            'published_at': datetime.datetime.now().isoformat(),
+        },
+        'previous': published.get(doc_id, {}).get('current'),
+    }
+    save_state(PUBLISHED_STATE, published)
+    return True
+
+
+def rollback(docs_service, doc_id):
+    """Re-publish the edition that the last publish replaced.
+
+    Returns False if no previous edition was recorded for this document.
+    """
+    previous = (load_state(PUBLISHED_STATE, {}) or {}).get(doc_id, {}).get('previous')
+    if not previous:
+        logger.warning("No previous edition recorded for rollback")
+        return False
+    logger.info("Rolling back to the edition published at %s", previous['published_at'])
+    if 'payload' in previous:
+        payload = previous['payload'].encode()
+    else:  # recorded before editions were kept as payloads
+        payload = _compact({'requests': previous['requests']}).encode()
+    return publish_staged(docs_service, doc_id, payload)
+
+
+def payload_stats(payload):
+    """Size and cost statistics for a batchUpdate body (JSON bytes), with warnings near API limits."""
+    api_requests = json.loads(payload)['requests']
+    inserted = [r['insertText']['text'] for r in api_requests if 'insertText' in r]
+    stats = {
+        'total_characters': sum(len(t) for t in inserted),
+        'utf16_length': sum(utf16_length(t) for t in inserted),
+        'request_count': len(api_requests),
+        'requests_by_type': dict(collections.Counter(next(iter(r)) for r in api_requests)),
+        'payload_bytes': len(payload),
+    }
+
+    warnings = []
+    limits = (
+        ('utf16_length', config.DOCS_MAX_DOCUMENT_CHARS, "document length"),
+        ('payload_bytes', config.DOCS_MAX_REQUEST_BYTES, "batchUpdate payload size"),
+    )
+    for key, limit, label in limits:
+        ratio = stats[key] / limit
+        if ratio >= config.DOCS_LIMIT_WARNING_RATIO:
+            warnings.append(f"{label} is {stats[key]:,} ({ratio:.0%} of the {limit:,} limit)")
+    stats['warnings'] = warnings
+    return stats
@@ -0,0 +1,118 @@
+"""Hedged feed downloads to cut tail latency.
+
+If a feed has not answered within its historical p90 latency (from the
+feed health store), a second request for it is sent and whichever answers
+first is used; the other is left to finish in the background. Hedges are
+extra load on the feed hosts, so they go through the host's rate limiter
+and are capped for the whole run at HEDGE_BUDGET_MIN plus
+HEDGE_BUDGET_RATIO of the downloads made so far.
+
+hedge_stats() reports how many hedges were sent, how many won and the
+latency they saved: for each win, the time from the hedge's answer to the
+slower request's answer (or, if it is still running, to now).
+"""
+
+import time
+import threading
+import collections
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from . import config
+from . import feed_health
+from .transport import download_feed
+from .ratelimit import acquire
+from .log import get_logger, in_context
+
+logger = get_logger(__name__)
+
+_lock = threading.Lock()
+_pool = None
+_stats = collections.Counter()
+_saved = []  # [winner finished, loser finished or None] per hedge win
+
+
+def _get_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=config.HEDGE_WORKERS, thread_name_prefix='hedge')
+        return _pool
+
+
+def _take_budget():
+    """Reserve one hedge if the run's budget allows it."""
+    with _lock:
+        if _stats['hedged'] >= config.HEDGE_BUDGET_MIN + config.HEDGE_BUDGET_RATIO * _stats['downloads']:
+            _stats['budget_exhausted'] += 1
+            return False
+        _stats['hedged'] += 1
+        return True
+
+
+def _timed(fn, *args, **kwargs):
+    result = fn(*args, **kwargs)
+    return result, time.monotonic()
+
+
+def _hedge(url, queue_key, timeout):
+    acquire(url, queue_key)
+    return _timed(download_feed, url, timeout=timeout)
+
+
+def hedged_download(url, queue_key="default", timeout=None):
+    """download_feed(), with a second request if the first outlasts the feed's p90 latency.
+
+    The caller has already acquired a rate-limit token for the first
+    request. Raises the first request's error if no request succeeds.
+    """
+    with _lock:
+        _stats['downloads'] += 1
+    p90 = feed_health.latency_p90(url) if config.HEDGE_REQUESTS else None
+    if p90 is None:
+        return download_feed(url, timeout=timeout)
+
+    pool = _get_pool()
+    primary = pool.submit(in_context(_timed), download_feed, url, timeout=timeout)
+    done, _ = wait([primary], timeout=max(p90, config.HEDGE_MIN_DELAY_SECONDS))
+    if done or not _take_budget():
+        return primary.result()[0]
+
+    logger.info("Hedging %s after %.2fs (p90)", url, max(p90, config.HEDGE_MIN_DELAY_SECONDS),
+                extra={'feed': url, 'section': queue_key})
+    hedge = pool.submit(in_context(_hedge), url, queue_key, timeout)
+    pending = {primary, hedge}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is not None:
+                continue
+            result, finished = future.result()
+            if future is hedge:
+                _record_win(finished, primary)
+            return result
+    return primary.result()[0]  # both failed: raise the first request's error
+
+
+def _record_win(finished, loser):
+    with _lock:
+        _stats['hedge_wins'] += 1
+        entry = [finished, None]
+        _saved.append(entry)
+
+    def done(future):
+        with _lock:
+            entry[1] = future.result()[1] if future.exception() is None else time.monotonic()
+    loser.add_done_callback(done)
+
+
+def hedge_stats():
+    now = time.monotonic()
+    with _lock:
+        saved = sum(max(0, (loser or now) - winner) for winner, loser in _saved)
+        return {
+            'downloads': _stats['downloads'],
+            'hedged': _stats['hedged'],
+            'hedge_wins': _stats['hedge_wins'],
+            'budget_exhausted': _stats['budget_exhausted'],
+            'saved_seconds': round(saved, 3),
+        }
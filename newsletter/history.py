@@ -1,12 +1,26 @@
-"""Content history tracking to avoid repeating content across newsletter editions."""
+"""Content history tracking to avoid repeating content across newsletter editions.
+
+Several processes (overlapping workflow runs, tenant workers) may share the
+history file. Readers never lock: the file is only ever replaced atomically,
+so load_history() always sees a complete snapshot. Writers are serialized
+by an exclusive lock on a sidecar lock file, and save_history() merges its
+changes into whatever is on disk at that moment, so recorded titles from
+concurrent writers are never lost.
+"""
 
 import json
+import fcntl
 import hashlib
 import datetime
+import tempfile
 import os
 
+from .bundle import load_section
+from .urls import url_key
+
 HISTORY_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'content_history.json')
 HISTORY_MAX_DAYS = 90
+INDEXES = ("published_titles", "published_urls")
 
 
 def _title_hash(title):
@@ -15,43 +29,131 @@ def _title_hash(title):
     return hashlib.md5(normalized.encode()).hexdigest()
 
 
-def load_history():
-    """Load content history from JSON file."""
-    if not os.path.exists(HISTORY_FILE):
-        return {"published_titles": {}, "last_updated": None}
+def _read_history_file():
     try:
         with open(HISTORY_FILE, 'r') as f:
             return json.load(f)
     except (json.JSONDecodeError, IOError):
-        return {"published_titles": {}, "last_updated": None}
+        return None
 
 
-def save_history(history):
-    """Save content history, pruning entries older than HISTORY_MAX_DAYS."""
-    cutoff = (datetime.datetime.now() - datetime.timedelta(days=HISTORY_MAX_DAYS)).isoformat()
+def load_history():
+    """Load a snapshot of the content history (from the state bundle if the file is missing)."""
+    if not os.path.exists(HISTORY_FILE):
+        return load_section('history') or {"published_titles": {}, "last_updated": None}
+    return _read_history_file() or {"published_titles": {}, "last_updated": None}
 
-    # Prune old entries
-    history["published_titles"] = {
-        k: v for k, v in history.get("published_titles", {}).items()
-        if v.get("date", "") >= cutoff
-    }
-    history["last_updated"] = datetime.datetime.now().isoformat()
 
-    with open(HISTORY_FILE, 'w') as f:
-        json.dump(history, f, indent=2)
+def merge_history(ours, theirs):
+    """Merge another writer's history into ours, in place.
+
+    Index entries are united; where both have the same key the more recent
+    date wins. Other fields (e.g. last_fingerprint, last_edition) keep our
+    value if we have one.
+    """
+    for index in INDEXES:
+        merged = dict(theirs.get(index, {}))
+        for key, entry in ours.get(index, {}).items():
+            if key not in merged or entry.get("date", "") >= merged[key].get("date", ""):
+                merged[key] = entry
+        ours[index] = merged
+    for key, value in theirs.items():
+        if key not in INDEXES:
+            ours.setdefault(key, value)
+    return ours
+
+
+def save_history(history, forget=None):
+    """Merge history into the saved file under an exclusive lock, pruning old entries.
+
+    history is updated in place with the merged result. forget maps an
+    index to keys removed after merging (e.g. by a rollback), so the copy
+    on disk does not bring them back.
+    """
+    directory = os.path.dirname(os.path.abspath(HISTORY_FILE))
+    with open(HISTORY_FILE + '.lock', 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            current = _read_history_file() if os.path.exists(HISTORY_FILE) else None
+            if current:
+                merge_history(history, current)
+            for index, keys in (forget or {}).items():
+                for key in keys:
+                    history.get(index, {}).pop(key, None)
 
+            # Prune old entries
+            cutoff = (datetime.datetime.now() - datetime.timedelta(days=HISTORY_MAX_DAYS)).isoformat()
+            for index in INDEXES:
+                history[index] = {
+                    k: v for k, v in history.get(index, {}).items()
+                    if v.get("date", "") >= cutoff
+                }
+            history["last_updated"] = datetime.datetime.now().isoformat()
 
-def was_published(title, history):
-    """Check if a title was already published."""
+            # Readers never see a partial file: write aside, then swap in
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.content_history.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(history, f, indent=2)
+                os.replace(tmp_path, HISTORY_FILE)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def content_fingerprint(sections):
+    """Return a stable hash of an edition's content.
+
+    Keys are sorted before hashing so the fingerprint only changes when the
+    items themselves change, not their dict ordering.
+    """
+    payload = json.dumps(sections, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def was_published(title, history, url=None):
+    """Check if a title, or an item at the same normalized URL, was already published."""
     h = _title_hash(title)
-    return h in history.get("published_titles", {})
+    if h in history.get("published_titles", {}):
+        return True
+    key = url_key(url)
+    return key is not None and key in history.get("published_urls", {})
 
 
-def record_published(title, history, category="news"):
-    """Record a title as published."""
+def record_published(title, history, category="news", when=None, url=None):
+    """Record a title (and its URL, if given) as published at `when`, defaulting to now.
+
+    Returns the recorded (title hash, URL key); the URL key is None without a usable URL.
+    """
     h = _title_hash(title)
+    date = (when or datetime.datetime.now()).isoformat()
     history.setdefault("published_titles", {})[h] = {
         "title": title,
         "category": category,
-        "date": datetime.datetime.now().isoformat(),
+        "date": date,
+    }
+    key = url_key(url)
+    if key is not None:
+        history.setdefault("published_urls", {})[key] = {"title_hash": h, "date": date}
+    return h, key
+
+
+def history_as_of(history, when):
+    """Return a copy of history as it stood at `when`.
+
+    Keeps entries recorded before `when` and within HISTORY_MAX_DAYS of it,
+    i.e. what save_history would have kept had it run at that time.
+    """
+    cutoff = (when - datetime.timedelta(days=HISTORY_MAX_DAYS)).isoformat()
+    until = when.isoformat()
+    as_of = {
+        index: {
+            k: dict(v) for k, v in history.get(index, {}).items()
+            if cutoff <= v.get("date", "") < until
+        }
+        for index in INDEXES
     }
+    as_of["last_updated"] = None
+    return as_of
@@ -0,0 +1,142 @@
+"""Incremental ingestion of feed entries across runs.
+
+Feeds mostly return the same top entries run after run. For every feed the
+index keeps a watermark (the newest published time processed) and the ids
+of the entries already seen, each with the candidate it produced: the
+cleaned item if it was relevant and survived dedup, or None. Entries seen
+before are answered from the index; only entries newer than the watermark
+are cleaned, scored and deduplicated again.
+"""
+
+import time
+import calendar
+import threading
+import collections
+import email.utils
+
+from . import config
+from .state import load_state, save_state
+
+STATE_NAME = 'ingest_index'
+
+_lock = threading.Lock()
+_index = None
+_stats = collections.Counter()
+
+
+def _load():
+    global _index
+    if _index is None:
+        _index = load_state(STATE_NAME, {}) or {}
+    return _index
+
+
+def _entry_id(entry):
+    return entry.get('id') or entry.get('link') or entry.get('title', '')
+
+
+def _published_ts(entry):
+    """Entry publication time as epoch seconds, or None if unknown."""
+    parsed = entry.get('published_parsed')
+    if parsed:
+        return calendar.timegm(tuple(parsed)[:6])
+    published = entry.get('published')
+    if published:
+        parts = email.utils.parsedate_tz(published)
+        if parts:
+            return email.utils.mktime_tz(parts)
+    return None
+
+
+def split_entries(url, entries, process, pending, carried_slots=None):
+    """Split a feed's entries into carried-forward and newly processed candidates.
+
+    Entries seen on an earlier run are answered from the index: the stored
+    candidate is carried forward if it was relevant and not a duplicate.
+    Unseen entries at or below the feed's watermark are skipped. Everything
+    else is passed to process(entry), which returns a candidate or None.
+    Returns (carried, fresh). Each fresh candidate is appended to pending,
+    the caller's list for this fetch; pass it to record_dedup() once the
+    fresh candidates have been deduplicated. If carried_slots is given,
+    each carried candidate is appended to it as (slot, item) so the caller
+    can update it with refresh_carried().
+    """
+    carried, todo = [], []
+    with _lock:
+        record = _load().setdefault(url, {'watermark': None, 'seen': {}})
+        seen = record['seen']
+        watermark = record['watermark']
+        for entry in entries:
+            eid = _entry_id(entry)
+            if eid in seen:
+                _stats['carried'] += 1
+                slot = seen.pop(eid)
+                seen[eid] = slot  # most recently seen last, so eviction drops stale ids
+                if slot and slot.get('unique', True):
+                    item = dict(slot['item'])
+                    carried.append(item)
+                    if carried_slots is not None:
+                        carried_slots.append((slot, item))
+                continue
+            published = _published_ts(entry)
+            if watermark is not None and published is not None and published <= watermark:
+                _stats['below_watermark'] += 1
+                continue
+            todo.append((eid, published, entry))
+
+    results = [(eid, published, process(entry)) for eid, published, entry in todo]
+
+    fresh = []
+    with _lock:
+        record = _load()[url]
+        seen = record['seen']
+        for eid, published, item in results:
+            _stats['processed'] += 1
+            if item is None:
+                seen[eid] = None
+            else:
+                slot = {'item': dict(item), 'unique': True}
+                seen[eid] = slot
+                pending.append((slot, item))
+                fresh.append(item)
+            if published is not None:
+                record['watermark'] = max(record['watermark'] or published, published)
+        while len(seen) > config.INGEST_MAX_SEEN_PER_FEED:
+            seen.pop(next(iter(seen)))
+        record['updated'] = time.time()
+    return carried, fresh
+
+
+def record_dedup(kept, pending):
+    """Remember which fresh candidates in pending survived dedup; later runs carry forward only those.
+
+    The stored copies are refreshed, so fields added after split_entries
+    (such as canonical_url) are carried forward too.
+    """
+    kept_ids = {id(item) for item in kept}
+    with _lock:
+        for slot, item in pending:
+            slot['item'] = dict(item)
+            slot['unique'] = id(item) in kept_ids
+            if not slot['unique']:
+                _stats['duplicates'] += 1
+
+
+def refresh_carried(carried_slots):
+    """Store the current fields of carried candidates, e.g. a canonical_url resolved this run."""
+    with _lock:
+        for slot, item in carried_slots:
+            slot['item'] = dict(item)
+            _stats['refreshed'] += 1
+
+
+def ingest_stats():
+    with _lock:
+        return dict(_stats)
+
+
+def save_index():
+    """Persist the index if it was used during this run."""
+    with _lock:
+        if _index is not None:
+            save_state(STATE_NAME, _index)
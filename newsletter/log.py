@@ -0,0 +1,205 @@
+"""Logging for the newsletter package.
+
+Every module logs through get_logger(__name__). Records are put on a queue
+by the calling thread and formatted and written by a background listener,
+so logging never blocks on stdout or disk. Disabled levels are filtered by
+the logger before a record (or its message) is ever built, provided calls
+use %-style arguments rather than f-strings.
+
+Records carry structured context: run_id and tenant (bound per run with
+bind_context, and carried into pool workers by in_context) plus optional
+feed/section passed via extra={...}.
+
+Importing a module starts nothing: the listener thread is started, and the
+log file opened, when the first record is logged.
+
+Sinks:
+- stdout: the familiar "[LEVEL] timestamp - message" lines, or JSON lines
+  with NEWSLETTER_LOG_FORMAT=json
+- config.LOG_FILE (last_run.log): rotating JSON lines
+"""
+
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+import datetime
+import threading
+import contextvars
+import logging.handlers
+
+from . import config
+
+CONTEXT_FIELDS = ('run_id', 'tenant', 'feed', 'section')
+
+_context = contextvars.ContextVar('newsletter_log_context', default={})
+_lock = threading.Lock()
+_listener = None
+_queue_handler = None
+_settings = {}  # setup_logging() arguments, applied when the listener starts
+
+
+def bind_context(**fields):
+    """Attach fields (run_id, tenant, ...) to all records logged in this context.
+
+    Worker threads see the fields only if their task was wrapped with
+    in_context() when it was submitted.
+    """
+    merged = {**_context.get(), **fields}
+    _context.set(merged)
+    return merged
+
+
+def in_context(fn):
+    """Wrap fn so it runs in a copy of the caller's logging context, e.g. in a pool worker."""
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        # A context can only be entered by one thread at a time: copy it per call
+        return context.copy().run(fn, *args, **kwargs)
+    return run
+
+
+class _ContextFilter(logging.Filter):
+    """Stamp context fields onto the record in the calling thread."""
+
+    def filter(self, record):
+        context = _context.get()
+        for field in CONTEXT_FIELDS:
+            if not hasattr(record, field):
+                setattr(record, field, context.get(field))
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records unformatted; the listener thread does the formatting.
+
+    The listener (and the log file) is started by the first record handled.
+    """
+
+    def prepare(self, record):
+        return record
+
+    def emit(self, record):
+        if _listener is None:
+            _start_listener()
+        super().emit(record)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            'ts': datetime.datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                payload[field] = value
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("[%(levelname)s] %(asctime)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+
+
+def _install_handler():
+    """Attach the queue handler to the package logger (idempotent; starts no thread)."""
+    global _queue_handler
+    with _lock:
+        if _queue_handler is not None:
+            return
+        level = _settings.get('level') or os.environ.get('NEWSLETTER_LOG_LEVEL', config.LOG_LEVEL)
+        _queue_handler = _QueueHandler(queue.SimpleQueue())
+        _queue_handler.addFilter(_ContextFilter())
+        package_logger = logging.getLogger('newsletter')
+        package_logger.setLevel(level)
+        package_logger.addHandler(_queue_handler)
+        package_logger.propagate = False
+
+
+def _start_listener():
+    """Open the sinks and start the background listener (idempotent)."""
+    global _listener
+    with _lock:
+        if _listener is not None or _queue_handler is None:
+            return
+        console_format = _settings.get('console_format') or os.environ.get('NEWSLETTER_LOG_FORMAT', 'text')
+        log_file = _settings.get('log_file')
+        if log_file is None:
+            log_file = config.LOG_FILE
+
+        console = logging.StreamHandler(sys.stdout)
+        console.setFormatter(JsonFormatter() if console_format == 'json' else TextFormatter())
+        handlers = [console]
+        if log_file:
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=config.LOG_MAX_BYTES, backupCount=config.LOG_BACKUP_COUNT,
+                encoding='utf-8',
+            )
+            file_handler.setFormatter(JsonFormatter())
+            handlers.append(file_handler)
+
+        _listener = logging.handlers.QueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+
+
+def setup_logging(level=None, console_format=None, log_file=None):
+    """Configure the sinks and install the queue handler.
+
+    Call before the first record is logged for the settings to take effect;
+    the listener thread starts, and the log file is opened, with that
+    record. log_file=False disables the file sink.
+    """
+    with _lock:
+        _settings.update({k: v for k, v in (('level', level), ('console_format', console_format),
+                                            ('log_file', log_file)) if v is not None})
+    _install_handler()
+    if level:
+        logging.getLogger('newsletter').setLevel(level)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener; call before printing final output."""
+    global _listener, _queue_handler
+    with _lock:
+        if _queue_handler is None:
+            return
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+        logging.getLogger('newsletter').removeHandler(_queue_handler)
+        _listener = None
+        _queue_handler = None
+
+
+def _reset_after_fork():
+    # The listener thread does not survive fork: the child starts its own
+    # listener on its first record (console only, so processes never rotate
+    # the same file)
+    global _listener, _queue_handler, _lock
+    _lock = threading.Lock()
+    _settings['log_file'] = False
+    if _queue_handler is not None:
+        logging.getLogger('newsletter').removeHandler(_queue_handler)
+        _listener = None
+        _queue_handler = None
+        _install_handler()
+
+
+def get_logger(name):
+    """Return a package logger; the logging subsystem starts with its first record."""
+    _install_handler()
+    return logging.getLogger(name)
+
+
+atexit.register(shutdown_logging)
+os.register_at_fork(after_in_child=_reset_after_fork)
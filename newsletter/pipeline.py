@@ -0,0 +1,118 @@
+"""Lazy, short-circuiting stages for sourcing a section's items from feeds.
+
+A section is built as a chain of generators:
+
+    take(unique(keep(keep(record(parse(source(urls), ...), ...), relevant), unpublished)), n)
+
+Items flow through one at a time as (feed url, item) pairs, so nothing is
+fetched or processed beyond what the consumer asks for. When take() has
+n items it closes the chain; each stage closes its upstream in turn and
+source() (fetchers.fetch_feeds) cancels the downloads that have not
+started. Feeds are consumed in their configured priority order.
+
+record() notes the first candidates of the stream before any filter, for
+the edition fingerprint (see NewsletterAgent._edition_fingerprint).
+
+A meter (new_meter()) counts, per feed, the entries looked at and those
+rejected by parse or a filter; record_yields() turns it into the feed
+health store's yield statistics.
+"""
+
+import contextlib
+import collections
+
+from .fetchers import fetch_feeds, record_yield
+from .urls import url_key, item_url
+
+
+def new_meter():
+    return {'considered': collections.Counter(), 'rejected': collections.Counter()}
+
+
+@contextlib.contextmanager
+def _upstream(iterable):
+    """Iterate an upstream stage and close it when this stage stops."""
+    iterator = iter(iterable)
+    try:
+        yield iterator
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close:
+            close()
+
+
+def source(urls, queue_key="default", max_retries=None, lookahead=None):
+    """(url, feed) pairs in priority order; see fetchers.fetch_feeds."""
+    return fetch_feeds(urls, max_retries=max_retries, queue_key=queue_key, lookahead=lookahead)
+
+
+def parse(feeds, parse_entry, limit, meter):
+    """Turn the first `limit` entries of each feed into items with parse_entry(entry, feed).
+
+    Entries for which parse_entry returns None are dropped.
+    """
+    with _upstream(feeds) as feeds:
+        for url, feed in feeds:
+            if not feed:
+                continue
+            for entry in feed.entries[:limit]:
+                meter['considered'][url] += 1
+                item = parse_entry(entry, feed)
+                if item is None:
+                    meter['rejected'][url] += 1
+                    continue
+                yield url, item
+
+
+def record(pairs, sink, limit, describe):
+    """Pass items on unchanged, appending describe(item) for the first `limit` to sink.
+
+    Does nothing if sink is None.
+    """
+    with _upstream(pairs) as pairs:
+        for url, item in pairs:
+            if sink is not None and limit > 0:
+                sink.append(describe(item))
+                limit -= 1
+            yield url, item
+
+
+def keep(pairs, predicate, meter):
+    """Pass on the items for which predicate(item) is true."""
+    with _upstream(pairs) as pairs:
+        for url, item in pairs:
+            if predicate(item):
+                yield url, item
+            else:
+                meter['rejected'][url] += 1
+
+
+def unique(pairs, key):
+    """Drop items whose key(item) was already seen, or whose normalized URL was."""
+    seen = set()
+    with _upstream(pairs) as pairs:
+        for url, item in pairs:
+            keys = {key(item), url_key(item_url(item))} - {None}
+            if keys & seen:
+                continue
+            seen |= keys
+            yield url, item
+
+
+def take(pairs, n):
+    """Return the first n items and stop the pipeline."""
+    items = []
+    if n <= 0:
+        return items
+    with _upstream(pairs) as pairs:
+        for _, item in pairs:
+            items.append(item)
+            if len(items) >= n:
+                break
+    return items
+
+
+def record_yields(meter):
+    """Record each feed's yield: entries that passed parse and all filters."""
+    for url, considered in meter['considered'].items():
+        record_yield(url, considered - meter['rejected'][url], considered)
@@ -0,0 +1,193 @@
+"""Opt-in CPU and memory profiling around pipeline stages.
+
+Enabled with flags on the entry point or with environment variables:
+
+    NEWSLETTER_PROFILE=cprofile|sample   deterministic or sampling CPU profile
+    NEWSLETTER_TRACEMALLOC=1             tracemalloc snapshot diff per stage
+    NEWSLETTER_PROFILE_DIR=path          where profile files are written
+
+cProfile stages are written as .pstats files, sampled stages as
+collapsed-stack files (one "frame;frame;frame count" line per stack) that
+flamegraph tools read directly. A top-N summary goes into the run result.
+
+cProfile only sees the thread that runs the stage, so the fetch and render
+work done in pool threads is missing from its profile; use the sampler for
+those stages. The sampler covers every thread but drops samples of threads
+parked waiting for work (idle pool workers, the log listener, the token
+refresher), which would otherwise dominate the top frames.
+"""
+
+import os
+import sys
+import time
+import queue
+import pstats
+import cProfile
+import threading
+import contextlib
+import collections
+import tracemalloc
+import logging.handlers
+import concurrent.futures.thread
+
+from . import config
+
+MODES = ('cprofile', 'sample')
+
+# (file, function) of leaf frames where a thread is parked waiting for work or a lock
+_IDLE_LEAVES = frozenset({
+    (threading.__file__, 'wait'),
+    (threading.__file__, '_wait_for_tstate_lock'),
+    (queue.__file__, 'get'),
+    (concurrent.futures.thread.__file__, '_worker'),
+    (logging.handlers.__file__, 'dequeue'),
+})
+
+
+class _Sampler:
+    """Samples the stacks of all other busy threads at a fixed interval."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (frame.f_code.co_filename, frame.f_code.co_name) in _IDLE_LEAVES:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+class RunProfiler:
+    """Profiles named pipeline stages; a no-op unless a mode or tracemalloc is enabled."""
+
+    def __init__(self, mode=None, trace_memory=False, out_dir=None, top_n=None):
+        if mode and mode not in MODES:
+            raise ValueError(f"Unknown profile mode {mode!r} (choose from {', '.join(MODES)})")
+        self.mode = mode
+        self.trace_memory = trace_memory
+        self.out_dir = out_dir or config.PROFILE_DIR
+        self.top_n = top_n or config.PROFILE_TOP_N
+        self.run_id = time.strftime("%Y%m%d-%H%M%S")
+        self.stages = {}
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            mode=os.environ.get('NEWSLETTER_PROFILE') or None,
+            trace_memory=os.environ.get('NEWSLETTER_TRACEMALLOC', '') not in ('', '0'),
+            out_dir=os.environ.get('NEWSLETTER_PROFILE_DIR') or None,
+        )
+
+    @property
+    def enabled(self):
+        return bool(self.mode or self.trace_memory)
+
+    def _path(self, stage, suffix):
+        os.makedirs(self.out_dir, exist_ok=True)
+        return os.path.join(self.out_dir, f"{self.run_id}-{stage}.{suffix}")
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Profile the enclosed block as one pipeline stage."""
+        if not self.enabled:
+            yield
+            return
+
+        summary = {}
+        profile = sampler = mem_before = None
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            mem_before = tracemalloc.take_snapshot()
+        if self.mode == 'cprofile':
+            profile = cProfile.Profile()
+            profile.enable()
+        elif self.mode == 'sample':
+            sampler = _Sampler(config.PROFILE_SAMPLE_INTERVAL_SECONDS)
+            sampler.start()
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            summary['wall_seconds'] = round(time.perf_counter() - start, 4)
+            if profile is not None:
+                profile.disable()
+                summary.update(self._cprofile_summary(name, profile))
+            if sampler is not None:
+                sampler.stop()
+                summary.update(self._sample_summary(name, sampler))
+            if mem_before is not None:
+                summary.update(self._memory_summary(mem_before))
+            self.stages[name] = summary
+
+    def _cprofile_summary(self, stage, profile):
+        path = self._path(stage, 'pstats')
+        profile.dump_stats(path)
+        stats = pstats.Stats(profile)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return {
+            'profile_file': path,
+            'top_functions': [
+                {
+                    'function': f"{os.path.basename(filename)}:{lineno}({func})",
+                    'calls': ncalls,
+                    'tottime': round(tottime, 4),
+                    'cumtime': round(cumtime, 4),
+                }
+                for (filename, lineno, func), (_, ncalls, tottime, cumtime, _) in rows[:self.top_n]
+            ],
+        }
+
+    def _sample_summary(self, stage, sampler):
+        path = self._path(stage, 'collapsed')
+        with open(path, 'w') as f:
+            for stack, count in sampler.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        leaves = collections.Counter()
+        for stack, count in sampler.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        total = sum(leaves.values())
+        return {
+            'profile_file': path,
+            'samples': total,
+            'top_frames': [
+                {'frame': frame, 'samples': count, 'share': round(count / total, 3)}
+                for frame, count in leaves.most_common(self.top_n)
+            ],
+        }
+
+    def _memory_summary(self, before):
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        diff = after.compare_to(before, 'lineno')
+        return {
+            'memory_peak_bytes': peak,
+            'memory_current_bytes': current,
+            'top_allocations': [
+                {'location': str(stat.traceback[0]), 'size_diff_bytes': stat.size_diff, 'count_diff': stat.count_diff}
+                for stat in diff[:self.top_n]
+            ],
+        }
+
+    def summary(self):
+        """Per-stage profile summary for the run result."""
+        return {'mode': self.mode, 'tracemalloc': self.trace_memory, 'stages': self.stages}
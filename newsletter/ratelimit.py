@@ -0,0 +1,160 @@
+"""Per-host token-bucket rate limiting for feed fetching.
+
+Each upstream host gets a token bucket sized from config.HOST_RATE_LIMITS.
+Callers waiting on the same host are served round-robin by queue key
+(a section name, or a tenant/section pair), so one section with many feeds
+cannot starve the others. A Retry-After from the host pauses its bucket.
+"""
+
+import time
+import threading
+import collections
+import email.utils
+import datetime
+from urllib.parse import urlsplit
+
+from . import config
+
+
+class HostBucket:
+    """A token bucket with a fair, round-robin wait queue."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._queues = collections.OrderedDict()  # queue key -> deque of tickets
+        self._cond = threading.Condition()
+        # Queueing-delay metrics
+        self.granted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.retry_after_pauses = 0
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _head(self):
+        """The ticket allowed to take the next token: first in line of the first key."""
+        if not self._queues:
+            return None
+        return next(iter(self._queues.values()))[0]
+
+    def _pop_head(self, key):
+        queue = self._queues[key]
+        queue.popleft()
+        if queue:
+            self._queues.move_to_end(key)  # rotate so the next key goes first
+        else:
+            del self._queues[key]
+
+    def acquire(self, key):
+        """Block until a token is granted to this caller; return seconds waited."""
+        ticket = object()
+        start = time.monotonic()
+        with self._cond:
+            self._queues.setdefault(key, collections.deque()).append(ticket)
+            while True:
+                now = time.monotonic()
+                if self._head() is ticket:
+                    self._refill(now)
+                    if now >= self.paused_until and self.tokens >= 1:
+                        self.tokens -= 1
+                        self._pop_head(key)
+                        self._cond.notify_all()
+                        waited = now - start
+                        self.granted += 1
+                        self.total_wait += waited
+                        self.max_wait = max(self.max_wait, waited)
+                        return waited
+                    self._cond.wait(max(self.paused_until - now, (1 - self.tokens) / self.rate))
+                else:
+                    self._cond.wait()
+
+    def pause(self, seconds):
+        """Stop granting tokens for the given number of seconds."""
+        with self._cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+            self.retry_after_pauses += 1
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'requests': self.granted,
+                'total_wait_seconds': round(self.total_wait, 3),
+                'mean_wait_seconds': round(self.total_wait / self.granted, 3) if self.granted else 0.0,
+                'max_wait_seconds': round(self.max_wait, 3),
+                'retry_after_pauses': self.retry_after_pauses,
+                'queued': sum(len(q) for q in self._queues.values()),
+            }
+
+
+_lock = threading.Lock()
+_buckets = {}
+
+
+def _host(url):
+    return urlsplit(url).hostname or ''
+
+
+def get_bucket(url, scope=None):
+    """Return the bucket for the URL's host, creating it from config on first use.
+
+    A scope (e.g. "resolve") gets its own bucket per host, sized by
+    config.SCOPE_RATE_LIMITS, so its requests never queue behind feed fetches.
+    """
+    host = _host(url)
+    name = f"{scope}:{host}" if scope else host
+    with _lock:
+        bucket = _buckets.get(name)
+        if bucket is None:
+            if scope:
+                rate, burst = config.SCOPE_RATE_LIMITS[scope]
+            else:
+                rate, burst = config.HOST_RATE_LIMITS.get(host, config.DEFAULT_HOST_RATE_LIMIT)
+            bucket = HostBucket(rate, burst)
+            _buckets[name] = bucket
+        return bucket
+
+
+def acquire(url, key="default", scope=None):
+    """Wait for permission to request the URL; return seconds spent queued."""
+    return get_bucket(url, scope).acquire(key)
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = int(value)
+    else:
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=datetime.timezone.utc)  # "-0000" parses as naive UTC
+        seconds = (when - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+    return max(0, min(seconds, config.MAX_RETRY_AFTER_SECONDS))
+
+
+def honour_retry_after(url, retry_after):
+    """Pause the URL's host for the duration given by a Retry-After header."""
+    seconds = parse_retry_after(retry_after)
+    if seconds is not None:
+        get_bucket(url).pause(seconds)
+    return seconds
+
+
+def rate_limit_stats():
+    """Return per-host queueing metrics for the run report."""
+    with _lock:
+        buckets = dict(_buckets)
+    return {host: bucket.stats() for host, bucket in sorted(buckets.items())}
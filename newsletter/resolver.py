@@ -0,0 +1,152 @@
+"""Canonical URL resolution with a persistent TTL cache.
+
+Google News links point at news.google.com redirect URLs, so the same
+article found by several queries arrives under different links. Links on
+config.REDIRECT_HOSTS are resolved by following their redirects to the
+publisher's URL; other links are already canonical. Lookups run
+concurrently through the shared feed session, rate-limited per host by
+their own "resolve" buckets so they never queue behind feed downloads,
+and at most URL_RESOLVE_BUDGET per run (start_run() resets the count);
+links over the budget are left as they are until a later run.
+
+Results are cached between runs. A link that answers without redirecting
+(Google News article links often return 200 with an HTML page) is
+terminal: it is cached as its own canonical URL for the full TTL, like a
+resolved one. Only errors are retried after the shorter failure TTL.
+"""
+
+import time
+import threading
+import collections
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from . import config
+from .transport import get_feed_session
+from .ratelimit import acquire
+from .state import load_state, save_state
+from .log import get_logger, in_context
+
+STATE_NAME = 'url_cache'
+
+logger = get_logger(__name__)
+
+_lock = threading.Lock()
+_cache = None  # url -> [canonical url or None, resolved at]
+_stats = collections.Counter()
+
+
+def _load():
+    global _cache
+    if _cache is None:
+        _cache = load_state(STATE_NAME, {}) or {}
+    return _cache
+
+
+def start_run():
+    """Reset the lookup budget and counters for a new run."""
+    with _lock:
+        _stats.clear()
+
+
+def needs_resolution(url):
+    return bool(url) and urlsplit(url).hostname in config.REDIRECT_HOSTS
+
+
+def _cached(url, now):
+    with _lock:
+        entry = _load().get(url)
+    if not entry:
+        return None
+    canonical, resolved_at = entry
+    ttl = config.URL_CACHE_TTL_SECONDS if canonical else config.URL_CACHE_FAILURE_TTL_SECONDS
+    return entry if now - resolved_at <= ttl else None
+
+
+def _follow(url):
+    """Follow url's redirects and return the final URL (url itself if none), or None on failure."""
+    acquire(url, key="resolve", scope="resolve")
+    timeout = (config.FEED_CONNECT_TIMEOUT_SECONDS, config.URL_RESOLVE_TIMEOUT_SECONDS)
+    session = get_feed_session()
+    try:
+        resp = session.head(url, allow_redirects=True, timeout=timeout)
+        if resp.status_code in (405, 501):
+            resp = session.get(url, allow_redirects=True, timeout=timeout, stream=True)
+            resp.close()
+    except requests.RequestException as e:
+        logger.warning("Could not resolve %s: %s", url, e)
+        return None
+    if resp.status_code >= 400:
+        return None
+    return resp.url
+
+
+def resolve_urls(urls, now=None):
+    """Return {url: canonical url} for urls, resolving redirect links concurrently.
+
+    URLs that need no resolution, do not redirect, failed or are over the
+    run's lookup budget map to themselves.
+    """
+    now = now or time.time()
+    result = {}
+    todo = []
+    for url in dict.fromkeys(urls):
+        if not needs_resolution(url):
+            result[url] = url
+            continue
+        entry = _cached(url, now)
+        if entry is not None:
+            _stats['cache_hits'] += 1
+            result[url] = entry[0] or url
+        else:
+            todo.append(url)
+
+    with _lock:
+        budget = max(0, config.URL_RESOLVE_BUDGET - _stats['lookups'])
+        todo, deferred = todo[:budget], todo[budget:]
+        _stats['lookups'] += len(todo)
+        _stats['over_budget'] += len(deferred)
+    for url in deferred:
+        result[url] = url
+
+    if todo:
+        with ThreadPoolExecutor(max_workers=config.URL_RESOLVE_WORKERS, thread_name_prefix='resolve') as pool:
+            resolved = list(pool.map(in_context(_follow), todo))
+        with _lock:
+            cache = _load()
+            for url, canonical in zip(todo, resolved):
+                cache[url] = [canonical, now]
+                if canonical is None:
+                    _stats['failed'] += 1
+                else:
+                    _stats['resolved' if canonical != url else 'terminal'] += 1
+                result[url] = canonical or url
+    return result
+
+
+def resolve_items(items):
+    """Set 'canonical_url' on each item whose link resolves to a different URL."""
+    canonical = resolve_urls([item['link'] for item in items if item.get('link')])
+    for item in items:
+        target = canonical.get(item.get('link'))
+        if target and target != item['link']:
+            item['canonical_url'] = target
+    return items
+
+
+def resolver_stats():
+    with _lock:
+        return dict(_stats)
+
+
+def save_url_cache(now=None):
+    """Persist the cache, dropping expired entries."""
+    now = now or time.time()
+    with _lock:
+        if _cache is None:
+            return
+        for url in [u for u, (c, at) in _cache.items() if now - at > config.URL_CACHE_TTL_SECONDS]:
+            del _cache[url]
+        save_state(STATE_NAME, _cache)
@@ -0,0 +1,255 @@
+"""Newsletter sections rendered as independent, relocatable DocFormatter fragments.
+
+Each renderer takes only the data its section shows (random picks such as
+emojis are made by the caller beforehand), so a section's output is fully
+determined by its inputs. That lets render_sections() serve unchanged
+sections from a cache keyed by a hash of (section, inputs) and render the
+rest concurrently; the fragments are then concatenated in order.
+"""
+
+import json
+import hashlib
+import threading
+import collections
+from concurrent.futures import ThreadPoolExecutor
+
+from . import config
+from .formatter import DocFormatter, FORMAT_VERSION
+from .state import load_state, save_state
+from .log import in_context
+
+STATE_NAME = 'render_cache'
+
+
+def _closing_rule(fmt):
+    fmt.add_newline()
+    fmt.add_horizontal_rule()
+    fmt.add_newline()
+
+
+def render_title(today):
+    fmt = DocFormatter.fragment()
+    fmt.add_heading(f"Return of the Jed(AI) - {today}", level=1)
+    fmt.add_newline()
+    return fmt
+
+
+def render_headline(emoji, title):
+    fmt = DocFormatter.fragment()
+    if title:
+        fmt.add_heading(f"{emoji} {title}", level=2)
+        fmt.add_italic_text("PLUS: The AI tools reshaping how we work & create")
+        fmt.add_newline()
+    else:
+        fmt.add_heading(f"{emoji} AI's Wild Week: Breakthroughs & Innovations", level=2)
+    _closing_rule(fmt)
+    return fmt
+
+
+def render_welcome(emoji):
+    fmt = DocFormatter.fragment()
+    fmt.add_heading(f"{emoji} Welcome, fellow humans!", level=2)
+    fmt.add_text("Hope your algorithms are optimized and your neural nets are firing on all nodes today. ")
+    fmt.add_text("Let's dive into the latest from the AI universe.")
+    fmt.add_newline()
+    _closing_rule(fmt)
+    return fmt
+
+
+def render_main_story(story, why):
+    fmt = DocFormatter.fragment()
+    fmt.add_heading("Main Story", level=2)
+    fmt.add_newline()
+    fmt.add_heading(f"{story['title']}", level=3)
+    fmt.add_text(story['summary'])
+    fmt.add_newline()
+    fmt.add_newline()
+    fmt.add_bold_text("Why it matters: ")
+    fmt.add_text(why)
+    fmt.add_newline()
+    fmt.add_newline()
+    fmt.add_link("Read the full story \u2192", story['link'])
+    fmt.add_newline()
+    _closing_rule(fmt)
+    return fmt
+
+
+def render_prompt_tip(emoji, tip):
+    fmt = DocFormatter.fragment()
+    fmt.add_heading(f"{emoji} Prompt Magic of the Day", level=2)
+    fmt.add_newline()
+    fmt.add_bold_text(tip['intro'])
+    fmt.add_newline()
+    fmt.add_newline()
+    fmt.add_text("Try this prompt:")
+    fmt.add_newline()
+    fmt.add_newline()
+    fmt.add_italic_text(tip['prompt'])
+    fmt.add_newline()
+    fmt.add_newline()
+    fmt.add_text(tip['explanation'])
+    fmt.add_newline()
+    _closing_rule(fmt)
+    return fmt
+
+
+def render_tools(emoji, tools):
+    fmt = DocFormatter.fragment()
+    fmt.add_heading(f"{emoji} AI Toolkit: New & Noteworthy", level=2)
+    fmt.add_newline()
+    bullet_start = fmt._cursor
+    for tool in tools:
+        fmt.add_bold_text(tool['name'])
+        fmt.add_text(f" \u2014 {tool['description']}")
+        fmt.add_newline()
+    fmt.add_bullets_to_range(bullet_start, fmt._cursor)
+    _closing_rule(fmt)
+    return fmt
+
+
+def render_quick_hits(emoji, items):
+    fmt = DocFormatter.fragment()
+    fmt.add_heading(f"{emoji} Around the Horn (Quick Hits)", level=2)
+    fmt.add_newline()
+    bullet_start = fmt._cursor
+    for news in items:
+        fmt.add_bold_text(f"{news['source']}: ")
+        fmt.add_text(news['title'])
+        fmt.add_newline()
+    fmt.add_bullets_to_range(bullet_start, fmt._cursor)
+    _closing_rule(fmt)
+    return fmt
+
+
+def render_video(emoji, video):
+    fmt = DocFormatter.fragment()
+    fmt.add_heading(f"{emoji} This Week in AI (Video Pick)", level=2)
+    fmt.add_newline()
+    fmt.add_bold_text(video['title'])
+    fmt.add_text(f" from {video['channel']}")
+    fmt.add_newline()
+    fmt.add_newline()
+    fmt.add_link("Watch Now \u2192", video['link'])
+    fmt.add_newline()
+    _closing_rule(fmt)
+    return fmt
+
+
+def render_insights(emoji, insights):
+    fmt = DocFormatter.fragment()
+    fmt.add_heading(f"{emoji} Intelligent Insights", level=2)
+    fmt.add_newline()
+    bullet_start = fmt._cursor
+    for insight in insights:
+        if insight.get('source') and insight['source'] != 'AI Research':
+            fmt.add_bold_text(f"{insight['source']}: ")
+        fmt.add_text(insight['text'])
+        if insight.get('link'):
+            fmt.add_text(" ")
+            fmt.add_link("[source]", insight['link'])
+        fmt.add_newline()
+    fmt.add_bullets_to_range(bullet_start, fmt._cursor)
+    _closing_rule(fmt)
+    return fmt
+
+
+def render_footer():
+    fmt = DocFormatter.fragment()
+    fmt.add_heading("That's a wrap!", level=2)
+    fmt.add_newline()
+    fmt.add_text("Thanks for reading! The best way to support us is by sharing this newsletter with a friend.")
+    fmt.add_newline()
+    return fmt
+
+
+RENDERERS = {
+    'title': render_title,
+    'headline': render_headline,
+    'welcome': render_welcome,
+    'main_story': render_main_story,
+    'prompt_tip': render_prompt_tip,
+    'tools': render_tools,
+    'quick_hits': render_quick_hits,
+    'video': render_video,
+    'insights': render_insights,
+    'footer': render_footer,
+}
+
+
+# ---------------------------------------------------------------------------
+# Render cache
+# ---------------------------------------------------------------------------
+
+_lock = threading.Lock()
+_cache = None  # key -> fragment dict, in least-recently-used order
+_stats = collections.Counter()
+
+
+def _load_cache():
+    global _cache
+    if _cache is None:
+        _cache = collections.OrderedDict(load_state(STATE_NAME, {}) or {})
+    return _cache
+
+
+def section_key(name, inputs):
+    """Content hash identifying a section's rendered output."""
+    payload = json.dumps([FORMAT_VERSION, name, inputs], sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _cached(key):
+    with _lock:
+        cache = _load_cache()
+        data = cache.get(key)
+        if data is None:
+            _stats['misses'] += 1
+            return None
+        cache.move_to_end(key)
+        _stats['hits'] += 1
+    return DocFormatter.from_dict(data)
+
+
+def _remember(key, fragment):
+    with _lock:
+        cache = _load_cache()
+        cache[key] = fragment.to_dict()
+        cache.move_to_end(key)
+        while len(cache) > config.RENDER_CACHE_MAX_ENTRIES:
+            cache.popitem(last=False)
+
+
+def render_section(name, inputs):
+    """Render one section, serving it from the cache when its inputs are unchanged."""
+    key = section_key(name, inputs)
+    fragment = _cached(key)
+    if fragment is None:
+        fragment = RENDERERS[name](**inputs)
+        _remember(key, fragment)
+    return fragment
+
+
+def render_sections(specs):
+    """Render (name, inputs) specs concurrently; return fragments in spec order."""
+    with ThreadPoolExecutor(max_workers=config.RENDER_WORKERS, thread_name_prefix='render') as pool:
+        return list(pool.map(in_context(lambda spec: render_section(*spec)), specs))
+
+
+def assemble(fragments):
+    """Concatenate fragments into one document and return its batchUpdate body as JSON bytes."""
+    fmt = DocFormatter()
+    for fragment in fragments:
+        fmt.extend(fragment)
+    return fmt.build_payload()
+
+
+def render_cache_stats():
+    with _lock:
+        return dict(_stats)
+
+
+def save_render_cache():
+    """Persist the render cache if it was used during this run."""
+    with _lock:
+        if _cache is not None:
+            save_state(STATE_NAME, dict(_cache))
@@ -0,0 +1,101 @@
+"""Last-known-good feed snapshots.
+
+After every successful fetch the feed's entries are stored with the time
+they were fetched. When a feed later fails, is too slow, or is not due for
+polling, its snapshot is served instead so the section keeps recent content
+rather than falling back to the static pools. Snapshots older than
+config.SNAPSHOT_MAX_AGE_SECONDS are never served.
+"""
+
+import time
+import threading
+
+import feedparser
+
+from . import config
+from .state import load_state, save_state
+
+STATE_NAME = 'feed_snapshots'
+
+_lock = threading.Lock()
+_snapshots = None
+_served = {}  # section -> list of served-snapshot records for this run
+
+
+def _load():
+    global _snapshots
+    if _snapshots is None:
+        _snapshots = load_state(STATE_NAME, {}) or {}
+    return _snapshots
+
+
+def _entry_to_dict(entry):
+    return {k: entry.get(k) for k in ('id', 'title', 'link', 'summary', 'published') if entry.get(k)}
+
+
+def store(url, feed, now=None):
+    """Remember the entries of a successful fetch."""
+    with _lock:
+        _load()[url] = {
+            'fetched_at': now or time.time(),
+            'feed': {k: feed.feed.get(k) for k in ('title', 'author') if feed.feed.get(k)},
+            'entries': [_entry_to_dict(e) for e in feed.entries[:config.SNAPSHOT_ENTRIES]],
+        }
+
+
+def age(url, now=None):
+    """Seconds since the feed's snapshot was taken, or None if there is none."""
+    with _lock:
+        snapshot = _load().get(url)
+    if not snapshot:
+        return None
+    return (now or time.time()) - snapshot['fetched_at']
+
+
+def has_fresh(url, now=None):
+    """True if a snapshot exists and is within the age limit."""
+    snapshot_age = age(url, now)
+    return snapshot_age is not None and snapshot_age <= config.SNAPSHOT_MAX_AGE_SECONDS
+
+
+def serve(url, section="default", reason="fetch_failed", now=None):
+    """Return the feed's snapshot as a feedparser-like result and note it for the staleness report.
+
+    Returns None if there is no snapshot within the age limit.
+    """
+    now = now or time.time()
+    with _lock:
+        snapshot = _load().get(url)
+    if not snapshot or now - snapshot['fetched_at'] > config.SNAPSHOT_MAX_AGE_SECONDS:
+        return None
+    with _lock:
+        _served.setdefault(section, []).append({
+            'url': url,
+            'reason': reason,
+            'age_hours': round((now - snapshot['fetched_at']) / 3600, 1),
+        })
+    return feedparser.FeedParserDict(
+        feed=feedparser.FeedParserDict(snapshot['feed']),
+        entries=[feedparser.FeedParserDict(e) for e in snapshot['entries']],
+    )
+
+
+def staleness_report():
+    """Per-section summary of the snapshots served during this run."""
+    with _lock:
+        served = {section: list(records) for section, records in _served.items()}
+    return {
+        section: {
+            'snapshots_served': len(records),
+            'max_age_hours': max(r['age_hours'] for r in records),
+            'feeds': records,
+        }
+        for section, records in sorted(served.items())
+    }
+
+
+def save_snapshots():
+    """Persist the snapshot store if it was loaded during this run."""
+    with _lock:
+        if _snapshots is not None:
+            save_state(STATE_NAME, _snapshots)
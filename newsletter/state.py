@@ -0,0 +1,42 @@
+"""Small JSON state files kept between runs (feed registry, caches, snapshots).
+
+Files in config.STATE_DIR take precedence; a state missing there is read
+from the warm-start bundle (see bundle.py), if one was restored.
+"""
+
+import os
+import json
+import tempfile
+
+from . import config
+from .bundle import load_section
+
+
+def state_path(name):
+    """Return the path of the named state file inside config.STATE_DIR."""
+    return os.path.join(config.STATE_DIR, f"{name}.json")
+
+
+def load_state(name, default=None):
+    """Load a state file, falling back to the bundle, then to default."""
+    path = state_path(name)
+    if not os.path.exists(path):
+        return load_section(name, default)
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return default
+
+
+def save_state(name, data):
+    """Atomically write a state file so a crash never leaves it half-written."""
+    os.makedirs(config.STATE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=config.STATE_DIR, prefix=f".{name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, state_path(name))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,308 @@
+"""Shared, pooled HTTP transport for Google Docs API calls and feed downloads.
+
+googleapiclient defaults to one httplib2.Http per client, which is not
+thread-safe and re-establishes connections per client. DocsHttp exposes the
+httplib2 request() interface on top of a shared requests.Session so that
+every Docs call in the process reuses the same keep-alive connection pool.
+
+Feed downloads go through a second shared session (download_feed) so that
+back-to-back requests to one host, e.g. the Google News queries, reuse
+connections, negotiate compression and are capped in size.
+"""
+
+import json
+import threading
+import datetime
+
+import httplib2
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from google.auth.transport.requests import Request as AuthRequest
+from google.oauth2 import service_account
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient import discovery_cache
+
+from . import config
+from .log import get_logger
+from .state import load_state, save_state
+
+
+DOCS_SCOPES = ('https://www.googleapis.com/auth/documents',)
+DISCOVERY_STATE = 'docs_discovery'
+
+_lock = threading.Lock()
+_docs_session = None
+_feed_session = None
+_token_managers = {}
+_services = {}
+
+
+logger = get_logger(__name__)
+
+
+class FeedFetchError(Exception):
+    """A feed download failed with an HTTP error status or exceeded the size cap."""
+
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def _build_session(pool_connections, pool_maxsize):
+    """Create a requests.Session with keep-alive pools mounted for http and https.
+
+    urllib3 keeps one pool per host inside the adapter, so pool_connections
+    is the number of hosts kept warm and pool_maxsize the connections per host.
+    Retries are left to the callers (googleapiclient, fetch_feed_with_retry).
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=0,
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    # Includes br/zstd when brotli or zstandard is installed for urllib3 to decode
+    session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+    return session
+
+
+def _docs_session_locked():
+    global _docs_session
+    if _docs_session is None:
+        _docs_session = _build_session(
+            config.HTTP_POOL_CONNECTIONS, config.HTTP_POOL_MAXSIZE,
+        )
+    return _docs_session
+
+
+def get_docs_session():
+    """Return the process-wide session used for Docs API traffic."""
+    with _lock:
+        return _docs_session_locked()
+
+
+def get_feed_session():
+    """Return the process-wide session used for RSS/Atom downloads."""
+    global _feed_session
+    with _lock:
+        if _feed_session is None:
+            _feed_session = _build_session(
+                config.HTTP_POOL_CONNECTIONS, config.HTTP_POOL_MAXSIZE,
+            )
+            _feed_session.headers['User-Agent'] = config.FEED_USER_AGENT
+        return _feed_session
+
+
+def download_feed(url, timeout=None, max_bytes=None):
+    """Download a feed body through the shared session.
+
+    Returns (content, headers) where content is the decoded body as a single
+    bytes object, read in one call so it can be handed to feedparser as is.
+    Raises FeedFetchError on HTTP errors or when the body exceeds max_bytes.
+    """
+    timeout = timeout or (config.FEED_CONNECT_TIMEOUT_SECONDS, config.FEED_READ_TIMEOUT_SECONDS)
+    max_bytes = max_bytes or config.FEED_MAX_BYTES
+
+    resp = get_feed_session().get(url, stream=True, timeout=timeout)
+    try:
+        if resp.status_code >= 400:
+            raise FeedFetchError(
+                f"HTTP {resp.status_code} for {url}",
+                status=resp.status_code,
+                retry_after=resp.headers.get('Retry-After'),
+            )
+        declared = resp.headers.get('Content-Length')
+        if declared and declared.isdigit() and 'Content-Encoding' not in resp.headers \
+                and int(declared) > max_bytes:
+            raise FeedFetchError(f"Feed too large ({declared} bytes) for {url}")
+        # Read one byte past the cap: urllib3 counts decoded bytes, so this
+        # also bounds what a compressed response can expand to.
+        content = resp.raw.read(max_bytes + 1, decode_content=True)
+        if len(content) > max_bytes:
+            raise FeedFetchError(f"Feed exceeds {max_bytes} bytes: {url}")
+        return content, resp.headers
+    finally:
+        resp.close()
+
+
+class TokenManager:
+    """Caches a credentials object and keeps its access token fresh.
+
+    Refreshes happen under a lock so concurrent publishes never race on the
+    token, and a daemon thread renews the token shortly before it expires so
+    requests on the critical path rarely pay for a refresh.
+    """
+
+    def __init__(self, credentials, session):
+        self.credentials = credentials
+        self._auth_request = AuthRequest(session)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _refresh_locked(self):
+        self.credentials.refresh(self._auth_request)
+
+    def refresh(self):
+        """Force a token refresh (e.g. after a 401)."""
+        with self._lock:
+            self._refresh_locked()
+
+    def apply(self, headers):
+        """Add a valid Authorization header, refreshing first if needed."""
+        with self._lock:
+            if not self.credentials.valid:
+                self._refresh_locked()
+            self.credentials.apply(headers)
+        self._start_background_refresh()
+
+    def _start_background_refresh(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._refresh_loop, name='docs-token-refresh', daemon=True,
+                )
+                self._thread.start()
+
+    def _seconds_until_refresh(self):
+        expiry = self.credentials.expiry
+        if expiry is None:
+            return None
+        # google-auth stores expiry as a naive UTC datetime
+        if expiry.tzinfo is None:
+            expiry = expiry.replace(tzinfo=datetime.timezone.utc)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        return (expiry - now).total_seconds() - config.TOKEN_REFRESH_MARGIN_SECONDS
+
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            wait = self._seconds_until_refresh()
+            if wait is None:
+                return
+            if wait > 0 and self._stop.wait(wait):
+                return
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning("Background token refresh failed: %s", e)
+                if self._stop.wait(config.RETRY_DELAY_SECONDS):
+                    return
+
+    def stop(self):
+        self._stop.set()
+
+
+class DocsHttp:
+    """httplib2-compatible transport backed by a shared, pooled requests.Session.
+
+    Safe to share between threads: the session's connection pool is
+    thread-safe and token access is serialized by the TokenManager.
+    Pass token_manager=None for unauthenticated use, e.g. against a local
+    stand-in server.
+    """
+
+    def __init__(self, token_manager=None, session=None, timeout=None):
+        self.token_manager = token_manager
+        self.session = session or get_docs_session()
+        self.timeout = timeout or config.DOCS_HTTP_TIMEOUT_SECONDS
+
+    @property
+    def credentials(self):
+        # googleapiclient looks for http.credentials when batching requests
+        return self.token_manager.credentials if self.token_manager else None
+
+    def _send(self, uri, method, body, headers, redirections):
+        if self.token_manager:
+            self.token_manager.apply(headers)
+        return self.session.request(
+            method, uri, data=body, headers=headers,
+            timeout=self.timeout, allow_redirects=redirections > 0,
+        )
+
+    def request(self, uri, method="GET", body=None, headers=None,
+                redirections=httplib2.DEFAULT_MAX_REDIRECTS, connection_type=None):
+        headers = dict(headers or {})
+        resp = self._send(uri, method, body, headers, redirections)
+        if resp.status_code == 401 and self.token_manager:
+            self.token_manager.refresh()
+            resp = self._send(uri, method, body, headers, redirections)
+
+        info = {k.lower(): v for k, v in resp.headers.items()}
+        # requests has already decoded the body, mirror httplib2's bookkeeping
+        if 'content-encoding' in info:
+            info['-content-encoding'] = info.pop('content-encoding')
+            info.pop('content-length', None)
+        info['status'] = str(resp.status_code)
+        response = httplib2.Response(info)
+        response.reason = resp.reason
+        return response, resp.content
+
+    def close(self):
+        """No-op: the underlying session is shared for the process lifetime."""
+
+
+def get_token_manager(creds_dict, scopes=DOCS_SCOPES):
+    """Return a cached TokenManager for a service account, creating it on first use."""
+    key = (creds_dict.get('client_email'), tuple(scopes))
+    with _lock:
+        manager = _token_managers.get(key)
+        if manager is None:
+            credentials = service_account.Credentials.from_service_account_info(
+                creds_dict, scopes=list(scopes),
+            )
+            manager = TokenManager(credentials, _docs_session_locked())
+            _token_managers[key] = manager
+        return manager
+
+
+def _discovery_document():
+    """Return the Docs v1 discovery document, kept in state so runs skip fetching it.
+
+    Falls back to the copy shipped with googleapiclient; returns None if
+    neither exists and build() has to fetch it.
+    """
+    document = load_state(DISCOVERY_STATE)
+    if document is None:
+        static = discovery_cache.get_static_doc('docs', 'v1')
+        if static is not None:
+            document = json.loads(static)
+            save_state(DISCOVERY_STATE, document)
+    return document
+
+
+def get_docs_service(creds_dict=None, api_endpoint=None):
+    """Return a Docs v1 client bound to the shared pooled transport.
+
+    Clients are cached per service account and endpoint, so repeated agents
+    in one process (tenants, daemon cycles) reuse connections and tokens.
+    With creds_dict=None the client is unauthenticated.
+    """
+    api_endpoint = api_endpoint or config.DOCS_API_ENDPOINT
+    key = (creds_dict.get('client_email') if creds_dict else None, api_endpoint)
+    with _lock:
+        service = _services.get(key)
+    if service is not None:
+        return service
+
+    token_manager = get_token_manager(creds_dict) if creds_dict else None
+    client_options = {'api_endpoint': api_endpoint} if api_endpoint else None
+    document = _discovery_document()
+    if document is not None:
+        service = build_from_document(
+            document, http=DocsHttp(token_manager), client_options=client_options,
+        )
+    else:
+        service = build(
+            'docs', 'v1',
+            http=DocsHttp(token_manager),
+            cache_discovery=False,
+            client_options=client_options,
+        )
+    with _lock:
+        return _services.setdefault(key, service)
@@ -0,0 +1,52 @@
+"""URL normalization and hashing for exact-match dedup.
+
+Two links are treated as the same article when their normalized forms are
+equal: scheme and host lowercased, "www." and default ports dropped,
+fragments and tracking parameters removed, the remaining query parameters
+sorted and a trailing slash stripped.
+"""
+
+import hashlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+TRACKING_PARAMS = frozenset({
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid',
+    'ref', 'ref_src', 'ocid', 'oc', 'cmpid', 'spm',
+})
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url):
+    """Return a normalized form of url, or None for empty and placeholder links."""
+    if not url or url == '#':
+        return None
+    parts = urlsplit(url.strip())
+    if not parts.netloc:
+        return None
+    scheme = parts.scheme.lower() or 'https'
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    netloc = host
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith('utm_')
+    )
+    path = parts.path.rstrip('/') or '/'
+    # http and https variants of a link are the same article
+    return urlunsplit(('https' if scheme == 'http' else scheme, netloc, path, urlencode(query), ''))
+
+
+def url_key(url):
+    """Hash of the normalized URL, or None if the URL is not usable."""
+    normalized = normalize_url(url)
+    if normalized is None:
+        return None
+    return hashlib.md5(normalized.encode()).hexdigest()
+
+
+def item_url(item):
+    """The best-known URL of a content item: its resolved canonical URL, else its link."""
+    return item.get('canonical_url') or item.get('link')
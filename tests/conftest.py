@@ -0,0 +1,134 @@
+import feedparser
+import pytest
+
+from newsletter import (
+    config, history, bundle, feed_health, feed_registry, ingest, resolver, sections, snapshots,
+)
+from newsletter.log import setup_logging
+
+# Keep test runs out of last_run.log
+setup_logging(log_file=False)
+
+
+@pytest.fixture
+def state_dir(tmp_path, monkeypatch):
+    """Point every state file, the history, the archive and the bundle at tmp_path."""
+    monkeypatch.setattr(config, 'STATE_DIR', str(tmp_path / 'state'))
+    monkeypatch.setattr(config, 'STATE_BUNDLE_FILE', str(tmp_path / 'state.bundle'))
+    monkeypatch.setattr(config, 'ARCHIVE_DIR', str(tmp_path / 'archive'))
+    monkeypatch.setattr(history, 'HISTORY_FILE', str(tmp_path / 'content_history.json'))
+    monkeypatch.setattr(bundle, '_bundle', None)
+    monkeypatch.setattr(bundle, '_bundle_loaded', False)
+    for module, name in ((feed_health, '_health'), (feed_registry, '_registry'), (ingest, '_index'),
+                         (resolver, '_cache'), (sections, '_cache'), (snapshots, '_snapshots')):
+        monkeypatch.setattr(module, name, None)
+    monkeypatch.setattr(snapshots, '_served', {})
+    return tmp_path
+
+
+def make_feed(title, entries):
+    return feedparser.FeedParserDict(
+        feed=feedparser.FeedParserDict(title=title),
+        entries=[feedparser.FeedParserDict(e) for e in entries],
+    )
+
+
+NEWS_TOPICS = [
+    "OpenAI opens a research lab in Tokyo", "Anthropic publishes its interpretability roadmap",
+    "Chip makers race to build inference accelerators", "Hospitals adopt LLM triage assistants",
+    "Regulators in Brussels finalize model audit rules", "Startup raises funding for robot kitchens",
+    "Machine learning forecasts monsoon rainfall", "Open weights model tops coding leaderboard",
+    "Schools pilot ChatGPT tutoring programs", "Deep learning speeds up drug screening",
+    "Claude helps archivists transcribe letters", "Satellite imagery analysed with neural networks",
+    "Banks deploy generative AI for fraud review", "Game studios test AI voice actors",
+    "Farmers use computer vision to sort apples",
+]
+
+
+class FakeFeeds:
+    """Canned feeds for every configured URL, served through fetchers.use_feed_source."""
+
+    def __init__(self):
+        self.feeds = {}
+        for i, url in enumerate(config.NEWS_FEEDS):
+            self.feeds[url] = make_feed(f"News {i}", [{
+                'id': f"news-{i}-{j}",
+                'title': f"{NEWS_TOPICS[(i * 3 + j) % len(NEWS_TOPICS)]} - Source {i}",
+                'link': f"https://example.com/news/{i}/{j}",
+                'summary': "A story about artificial intelligence.",
+                'published': f"Mon, 0{j + 1} Jun 2026 0{i}:00:00 GMT",
+            } for j in range(3)])
+        for group in ('tools', 'videos', 'insights'):
+            urls = {'tools': config.TOOL_FEEDS, 'videos': config.YOUTUBE_CHANNEL_FEEDS,
+                    'insights': config.INSIGHT_FEEDS}[group]
+            for i, url in enumerate(urls):
+                self.feeds[url] = make_feed(f"{group} {i}", [{
+                    'id': f"{group}-{i}-{j}",
+                    'title': f"{group} entry {i}-{j}",
+                    'link': f"https://example.com/{group}/{i}/{j}",
+                    'summary': f"Description of {group} entry {i}-{j}.",
+                } for j in range(10)])
+
+    def add_news(self, title):
+        url = config.NEWS_FEEDS[0]
+        entries = list(self.feeds[url].entries)
+        entries.insert(0, feedparser.FeedParserDict({
+            'id': title, 'title': title, 'link': f"https://example.com/extra/{len(entries)}",
+            'summary': "Breaking artificial intelligence news.",
+            'published': "Tue, 30 Jun 2026 12:00:00 GMT",
+        }))
+        self.feeds[url] = make_feed(self.feeds[url].feed.title, entries)
+
+    def __call__(self, url):
+        return self.feeds.get(url)
+
+
+@pytest.fixture
+def fake_feeds():
+    return FakeFeeds()
+
+
+class StandInServer:
+    """A local HTTP server answering from a {path: (status, headers, body)} table."""
+
+    def __init__(self):
+        import http.server
+        import threading
+
+        routes = self.routes = {}
+        self.requests = []
+        requests = self.requests
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def _answer(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                requests.append((self.command, self.path, self.rfile.read(length) if length else b''))
+                status, headers, body = routes.get(self.path.split('?')[0], (404, {}, b''))
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self.wfile.write(body)
+
+            do_GET = do_HEAD = do_POST = _answer
+
+            def log_message(self, *args):
+                pass
+
+        self._server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def stand_in_server():
+    server = StandInServer()
+    yield server
+    server.close()
@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import datetime
+
+from newsletter import config, checkpoints, fake_docs, fetchers, history
+from newsletter.agent import NewsletterAgent, SECTIONS
+from newsletter.fake_docs import FakeDocsService, FakeDocsError
+from newsletter.fetchers import use_feed_source
+
+NOW = datetime.datetime(2026, 7, 1, 7, 0)
+
+
+def _publish(feeds, docs, now=NOW):
+    agent = NewsletterAgent(now=now, offline=True)
+    agent._docs_service = docs
+    agent.doc_id = 'doc'
+    with use_feed_source(feeds):
+        return agent.run()
+
+
+def test_rerun_with_same_feeds_is_unchanged(state_dir, fake_feeds):
+    docs = FakeDocsService()
+    first = _publish(fake_feeds, docs)
+    assert first['status'] == 'success'
+
+    second = _publish(fake_feeds, docs)
+    assert second['status'] == 'unchanged'
+    assert second['fingerprint'] == first['fingerprint']
+    assert len(docs.docs['doc']['batches']) == 1
+
+
+def test_rerun_with_new_feed_entries_publishes(state_dir, fake_feeds):
+    docs = FakeDocsService()
+    first = _publish(fake_feeds, docs)
+
+    fake_feeds.add_news("Anthropic ships a new Claude model - Source 0")
+    second = _publish(fake_feeds, docs)
+    assert second['status'] == 'success'
+    assert second['fingerprint'] != first['fingerprint']
+    assert len(docs.docs['doc']['batches']) == 2
+
+
+def test_dry_run_leaves_state_untouched(state_dir, fake_feeds, monkeypatch, tmp_path):
+    # Live fetch path (not use_feed_source), so registry, snapshots, watermarks
+    # and health are all updated in memory
+    monkeypatch.setattr(fetchers, 'fetch_feed_with_retry', lambda url, **kwargs: fake_feeds(url))
+    out = tmp_path / 'payload.json'
+
+    agent = NewsletterAgent(now=NOW, dry_run=str(out))
+    result = agent.run()
+
+    assert result['status'] == 'dry_run'
+    assert json.loads(out.read_text())['requests']
+    assert not os.path.exists(config.STATE_DIR)
+    assert not os.path.exists(history.HISTORY_FILE)
+
+
+def test_replayed_fetch_leaves_state_untouched(state_dir, fake_feeds):
+    # The backfill fetches each past edition this way
+    agent = NewsletterAgent(now=NOW, offline=True)
+    with use_feed_source(fake_feeds):
+        agent._fetch_all_content()
+
+    assert agent.news_items
+    assert not os.path.exists(config.STATE_DIR)
+
+
+def test_rollback_forgets_the_rolled_back_edition(state_dir, fake_feeds):
+    docs = FakeDocsService()
+    first = _publish(fake_feeds, docs)
+    before = history.load_history()
+    fake_feeds.add_news("Anthropic ships a new Claude model - Source 0")
+    second = _publish(fake_feeds, docs)
+    assert second['status'] == 'success'
+
+    agent = NewsletterAgent(now=NOW, offline=True)
+    agent._docs_service = docs
+    agent.doc_id = 'doc'
+    assert agent.rollback()['status'] == 'success'
+
+    after = history.load_history()
+    assert after['last_fingerprint'] == first['fingerprint']
+    for index in history.INDEXES:
+        assert after[index].keys() == before[index].keys()
+    # The rolled-back edition's content is publishable again
+    assert _publish(fake_feeds, docs)['status'] == 'success'
+
+
+def test_resume_retries_a_failed_publish_without_refetching(state_dir, fake_feeds, monkeypatch):
+    fetched = []
+
+    def feeds(url):
+        fetched.append(url)
+        return fake_feeds(url)
+
+    docs = FakeDocsService()
+    bodies = []  # raw batchUpdate bodies sent
+    execute = fake_docs._Call.execute
+
+    def flaky(call):
+        if isinstance(call.body, bytes):
+            bodies.append(call.body)
+            if len(bodies) == 1:
+                raise FakeDocsError("Service unavailable")
+        return execute(call)
+    monkeypatch.setattr(fake_docs._Call, 'execute', flaky)
+
+    assert _publish(feeds, docs)['status'] == 'error'
+    assert fetched
+    assert 'render' in checkpoints.load(checkpoints.edition_key(NOW))
+
+    fetched.clear()
+    agent = NewsletterAgent(now=NOW, offline=True)
+    agent._docs_service = docs
+    agent.doc_id = 'doc'
+    with use_feed_source(feeds):
+        result = agent.run(resume=True)
+
+    assert result['status'] == 'success'
+    assert fetched == []
+    assert len(bodies) == 2 and bodies[1] == bodies[0]
+    assert 'publish' in checkpoints.load(checkpoints.edition_key(NOW))
+
+
+def test_sections_are_yielded_while_later_sources_are_fetched(state_dir, fake_feeds):
+    groups = {url: 'news' for url in config.NEWS_FEEDS}
+    groups.update({url: 'tools' for url in config.TOOL_FEEDS})
+    groups.update({url: 'videos' for url in config.YOUTUBE_CHANNEL_FEEDS})
+    groups.update({url: 'insights' for url in config.INSIGHT_FEEDS})
+    events = []
+
+    def feeds(url):
+        events.append(('fetch', groups[url]))
+        if groups[url] != 'news':
+            time.sleep(0.05)  # slower than rendering a section
+        return fake_feeds(url)
+
+    agent = NewsletterAgent(now=NOW, offline=True)
+    with use_feed_source(feeds):
+        for name, fragment in agent.iter_sections():
+            events.append(('section', name))
+
+    def first(event):
+        return events.index(event)
+
+    def last(event):
+        return len(events) - 1 - events[::-1].index(event)
+
+    # Sections needing no feeds, or only the news, are out before the later feeds are fetched
+    for name in ('title', 'welcome', 'footer', 'headline', 'main_story', 'quick_hits'):
+        assert first(('section', name)) < first(('fetch', 'insights'))
+    # Each section follows the fetch of the content it shows
+    assert first(('section', 'tools')) > last(('fetch', 'tools'))
+    assert first(('section', 'insights')) > last(('fetch', 'insights'))
+
+    yielded = [name for kind, name in events if kind == 'section']
+    assert sorted(yielded) == sorted(name for name, _ in agent.specs)
+    assert [name for name, _ in agent.specs] == [name for name, _ in SECTIONS if name in yielded]
@@ -0,0 +1,47 @@
+import os
+import json
+import datetime
+
+from newsletter import archive
+from newsletter.formatter import DocFormatter
+
+
+def _entry(day, text):
+    fmt = DocFormatter()
+    fmt.add_heading(text, 1)
+    return archive.make_entry(
+        datetime.datetime(2026, 7, day, 7, 0), None, f"Edition {day}", [['title', {}]],
+        fmt.build_requests(), {'news_items': 1}, fingerprint=f"fp{day}",
+    )
+
+
+def test_append_list_show_round_trip(state_dir, capsys):
+    archive.append(_entry(1, "First edition"))
+    archive.append(_entry(2, "Second edition"))
+
+    assert [row[0] for row in archive.index()] == ['2026-07-01', '2026-07-02']
+    assert archive.get('2026-07-02')['fingerprint'] == 'fp2'
+    assert archive.previous('2026-07-02')['title'] == "Edition 1"
+
+    assert archive.main(['list']) == 0
+    # Log lines share stdout with the command output
+    listing = [line for line in capsys.readouterr().out.splitlines() if not line.startswith('[')]
+    assert [line.split()[0] for line in listing] == ['2026-07-01', '2026-07-02']
+
+    assert archive.main(['show', '2026-07-01']) == 0
+    assert "First edition\n" in capsys.readouterr().out
+
+    assert archive.main(['show', '2026-07-03']) == 1
+
+
+def test_index_is_rebuilt_from_the_data_file(state_dir):
+    archive.append(_entry(1, "First edition"))
+    rows = archive.index()
+    data_path, index_path = archive._paths()
+    os.remove(index_path)
+
+    assert archive.index() == rows
+    archive.append(_entry(2, "Second edition"))
+    with open(index_path) as f:
+        assert [row[0] for row in json.load(f)] == ['2026-07-01', '2026-07-02']
+    assert [e['title'] for e in archive.iter_entries()] == ["Edition 1", "Edition 2"]
@@ -0,0 +1,32 @@
+import datetime
+
+import pytest
+
+from newsletter.agent import NewsletterAgent
+from newsletter.auth import AuthError, start_client_init
+from newsletter.fetchers import use_feed_source
+
+
+def test_background_init_failure_is_raised_from_the_future():
+    future = start_client_init('{not json', 'doc')
+    with pytest.raises(AuthError, match="not valid JSON"):
+        future.result(timeout=5)
+
+
+def test_auth_failure_stops_the_run_before_later_fetches(state_dir, fake_feeds, monkeypatch):
+    monkeypatch.setenv('GOOGLE_CREDENTIALS', '{not json')
+    monkeypatch.setenv('DOCUMENT_ID', 'doc')
+    fetched = []
+
+    def feeds(url):
+        fetched.append(url)
+        return fake_feeds(url)
+
+    agent = NewsletterAgent(now=datetime.datetime(2026, 7, 1, 7, 0))
+    agent._client_future.exception(timeout=5)  # let the background init fail first
+    with use_feed_source(feeds):
+        result = agent.run()
+
+    assert result['status'] == 'error'
+    assert "not valid JSON" in result['message']
+    assert fetched == []
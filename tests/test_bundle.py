@@ -0,0 +1,60 @@
+import shutil
+
+from newsletter import bundle, config
+from newsletter.state import load_state, save_state
+
+
+def _flip_byte(path, offset):
+    with open(path, 'r+b') as f:
+        f.seek(offset)
+        byte = f.read(1)
+        f.seek(offset)
+        f.write(bytes([byte[0] ^ 0xFF]))
+
+
+def _reopen(monkeypatch):
+    monkeypatch.setattr(bundle, '_bundle', None)
+    monkeypatch.setattr(bundle, '_bundle_loaded', False)
+
+
+def test_state_round_trips_through_the_bundle(state_dir, monkeypatch):
+    save_state('feed_registry', {'a': 1})
+    save_state('render_cache', {'b': 2})
+    assert bundle.save_bundle(history={'published_titles': {}})['sections'] == 3
+
+    shutil.rmtree(config.STATE_DIR)
+    _reopen(monkeypatch)
+    assert load_state('feed_registry') == {'a': 1}
+    assert load_state('render_cache') == {'b': 2}
+    assert bundle.load_section('history') == {'published_titles': {}}
+
+
+def test_corrupt_section_falls_back_to_default(state_dir, monkeypatch):
+    save_state('feed_registry', {'a': 1})
+    save_state('render_cache', {'b': 2})
+    bundle.save_bundle()
+    shutil.rmtree(config.STATE_DIR)
+    _reopen(monkeypatch)
+
+    offset, _, _ = bundle.get_bundle()._index['render_cache']
+    bundle.get_bundle().close()
+    _flip_byte(config.STATE_BUNDLE_FILE, offset)
+    _reopen(monkeypatch)
+
+    assert load_state('render_cache', {}) == {}
+    assert load_state('feed_registry') == {'a': 1}
+
+    # The next save drops the corrupt section and keeps the rest
+    bundle.save_bundle()
+    assert bundle.get_bundle().names() == ['feed_registry']
+
+
+def test_corrupt_index_ignores_the_bundle(state_dir, monkeypatch):
+    save_state('feed_registry', {'a': 1})
+    bundle.save_bundle()
+    shutil.rmtree(config.STATE_DIR)
+    _flip_byte(config.STATE_BUNDLE_FILE, bundle._HEADER.size)  # first index byte
+    _reopen(monkeypatch)
+
+    assert bundle.get_bundle() is None
+    assert load_state('feed_registry', {}) == {}
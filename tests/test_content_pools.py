@@ -0,0 +1,22 @@
+from newsletter import config
+from newsletter.content_pools import fetch_insights
+from newsletter.fetchers import use_feed_source
+from newsletter.history import load_history
+
+
+def test_insights_sample_every_feed(state_dir, fake_feeds):
+    fetched = []
+
+    def feeds(url):
+        fetched.append(url)
+        return fake_feeds(url)
+
+    candidates = []
+    with use_feed_source(feeds):
+        insights = fetch_insights(load_history(), candidates)
+
+    assert len(insights) == 4
+    assert sorted(fetched) == sorted(config.INSIGHT_FEEDS)
+    last = len(config.INSIGHT_FEEDS) - 1
+    assert f"insights entry {last}-0" in candidates
+    assert len(candidates) == len(config.INSIGHT_FEEDS) * config.INSIGHT_ENTRIES_PER_FEED
@@ -0,0 +1,39 @@
+import time
+
+from newsletter import config, feed_health, fetchers
+
+
+def _fail(url, times, now):
+    for _ in range(times):
+        feed_health.record_attempt(url, 0.1, 'error', now=now)
+
+
+def test_dead_feed_is_skipped_then_probed_again(state_dir, monkeypatch):
+    fetched = []
+
+    def get_feed(url, max_retries, queue_key):
+        fetched.append(url)
+        feed_health.record_attempt(url, 0.1, 'ok')
+        return url
+
+    monkeypatch.setattr(fetchers, 'get_feed', get_feed)
+    live, dead = 'https://example.com/live', 'https://example.com/dead'
+    _fail(dead, config.HEALTH_DEAD_AFTER, now=time.time())
+
+    assert feed_health.is_dead(dead)
+    assert list(fetchers.fetch_feeds([dead, live])) == [(live, live)]
+    assert fetched == [live]
+
+    # Once the retry interval has passed the feed is probed, and a success revives it
+    fetched.clear()
+    _fail(dead, 1, now=time.time() - config.HEALTH_DEAD_RETRY_SECONDS - 1)
+    assert not feed_health.is_dead(dead)
+    assert list(fetchers.fetch_feeds([dead, live])) == [(dead, dead), (live, live)]
+    assert sorted(fetched) == [dead, live]
+    assert feed_health.stats(dead)['dead'] is False
+
+
+def test_fewer_failures_than_the_threshold_keep_a_feed_alive(state_dir):
+    url = 'https://example.com/flaky'
+    _fail(url, config.HEALTH_DEAD_AFTER - 1, now=time.time())
+    assert not feed_health.is_dead(url)
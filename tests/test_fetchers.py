@@ -0,0 +1,31 @@
+import time
+import threading
+
+from newsletter import config, fetchers
+
+
+def test_closed_fetch_leaves_running_downloads_to_wait_for(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    finished = []
+
+    def get_feed(url, max_retries, queue_key):
+        if url != 'https://example.com/0':
+            started.set()
+            release.wait(5)
+            time.sleep(0.05)
+        finished.append(url)
+        return url
+
+    monkeypatch.setattr(fetchers, 'get_feed', get_feed)
+    monkeypatch.setattr(config, 'FETCH_WORKERS', 2)
+    urls = [f"https://example.com/{i}" for i in range(4)]
+
+    feeds = fetchers.fetch_feeds(urls, queue_key="test", lookahead=2)
+    assert next(feeds) == (urls[0], urls[0])
+    started.wait(5)
+    feeds.close()
+    release.set()
+
+    fetchers.wait_for_downloads()
+    # The download running at close has finished; the queued ones never started
+    assert sorted(finished) == urls[:2]
@@ -0,0 +1,50 @@
+import json
+
+from newsletter import fake_docs
+from newsletter.fake_docs import FakeDocsService
+from newsletter.formatter import DocFormatter
+from newsletter.gdoc import write_to_doc, publish_staged, rollback
+
+
+def _payload():
+    fmt = DocFormatter()
+    fmt.add_heading("Return of the Jed(AI) 🚀", 1)
+    fmt.add_link("Résumé of the week", "https://example.com/a")
+    fmt.add_newline()
+    return fmt.build_payload()
+
+
+def _record_bodies(monkeypatch):
+    bodies = []
+    execute = fake_docs._Call.execute
+
+    def recording(call):
+        bodies.append(call.body)
+        return execute(call)
+    monkeypatch.setattr(fake_docs._Call, 'execute', recording)
+    return bodies
+
+
+def test_write_to_doc_sends_payload_bytes_unchanged(monkeypatch):
+    docs = FakeDocsService()
+    payload = _payload()
+    bodies = _record_bodies(monkeypatch)
+
+    assert write_to_doc(docs, 'doc', payload)
+    assert bodies == [payload]
+    assert docs.docs['doc']['batches'][-1] == json.loads(payload)
+
+
+def test_publish_staged_splices_payload_and_rolls_back(state_dir):
+    docs = FakeDocsService()
+    publish_staged(docs, 'doc', _payload())
+    before = docs.docs['doc']['text']
+
+    fmt = DocFormatter()
+    fmt.add_text("Second edition")
+    fmt.add_newline()
+    publish_staged(docs, 'doc', fmt.build_payload())
+    assert docs.docs['doc']['text'] == "Second edition\n\n"
+
+    assert rollback(docs, 'doc')
+    assert docs.docs['doc']['text'] == before
@@ -0,0 +1,52 @@
+import time
+import itertools
+
+from newsletter import config, feed_health, hedging
+
+URL = 'https://example.com/feed'
+
+
+def _slow_then_fast(monkeypatch, slow_seconds=0.5):
+    calls = itertools.count()
+
+    def download_feed(url, timeout=None):
+        if next(calls) == 0:
+            time.sleep(slow_seconds)
+            return 'primary', {}
+        return 'hedge', {}
+    monkeypatch.setattr(hedging, 'download_feed', download_feed)
+    monkeypatch.setattr(hedging, 'acquire', lambda url, key: None)
+    monkeypatch.setattr(hedging, '_stats', hedging.collections.Counter())
+    monkeypatch.setattr(hedging, '_saved', [])
+    monkeypatch.setattr(config, 'HEDGE_MIN_DELAY_SECONDS', 0.05)
+
+
+def test_hedge_fires_past_p90_and_wins(state_dir, monkeypatch):
+    _slow_then_fast(monkeypatch)
+    for _ in range(5):
+        feed_health.record_attempt(URL, 0.01, 'ok')
+
+    assert hedging.hedged_download(URL)[0] == 'hedge'
+    stats = hedging.hedge_stats()
+    assert (stats['downloads'], stats['hedged'], stats['hedge_wins']) == (1, 1, 1)
+
+    time.sleep(0.6)  # the primary request finishes in the background
+    assert hedging.hedge_stats()['saved_seconds'] >= 0.3
+
+
+def test_no_hedge_without_latency_history(state_dir, monkeypatch):
+    _slow_then_fast(monkeypatch, slow_seconds=0.1)
+    assert hedging.hedged_download(URL)[0] == 'primary'
+    assert hedging.hedge_stats()['hedged'] == 0
+
+
+def test_hedges_stop_when_the_budget_is_spent(state_dir, monkeypatch):
+    _slow_then_fast(monkeypatch, slow_seconds=0.2)
+    monkeypatch.setattr(config, 'HEDGE_BUDGET_MIN', 0)
+    monkeypatch.setattr(config, 'HEDGE_BUDGET_RATIO', 0)
+    for _ in range(5):
+        feed_health.record_attempt(URL, 0.01, 'ok')
+
+    assert hedging.hedged_download(URL)[0] == 'primary'
+    stats = hedging.hedge_stats()
+    assert (stats['hedged'], stats['budget_exhausted']) == (0, 1)
@@ -0,0 +1,44 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from newsletter import log
+
+
+def _stamped():
+    record = logging.LogRecord('newsletter.test', logging.INFO, __file__, 0, 'message', (), None)
+    log._ContextFilter().filter(record)
+    return record.run_id, record.tenant
+
+
+def _bound(run_id):
+    log.bind_context(run_id=run_id, tenant='acme')
+    return _stamped()
+
+
+def test_context_reaches_pool_workers_only_through_in_context():
+    results = {}
+
+    def run(run_id):
+        log.bind_context(run_id=run_id, tenant='acme')
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results[run_id] = (pool.submit(log.in_context(_stamped)).result(),
+                               pool.submit(_stamped).result())
+
+    threads = [threading.Thread(target=run, args=(run_id,)) for run_id in ('run-a', 'run-b')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Concurrent runs keep their own run_id; unwrapped tasks carry none
+    assert results['run-a'] == (('run-a', 'acme'), (None, None))
+    assert results['run-b'] == (('run-b', 'acme'), (None, None))
+
+
+def test_bind_context_does_not_leak_between_threads():
+    before = _stamped()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        assert pool.submit(_bound, 'run-c').result() == ('run-c', 'acme')
+        assert pool.submit(log.in_context(_stamped)).result() == before
+    assert _stamped() == before
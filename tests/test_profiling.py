@@ -0,0 +1,28 @@
+import time
+import threading
+
+from newsletter.profiling import _Sampler
+
+
+def _spin(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_skips_parked_threads():
+    stop = threading.Event()
+    idle = threading.Thread(target=stop.wait, name='idle')
+    busy = threading.Thread(target=_spin, args=(stop,), name='busy')
+    idle.start()
+    busy.start()
+    sampler = _Sampler(0.001)
+    sampler.start()
+    time.sleep(0.1)
+    sampler.stop()
+    stop.set()
+    idle.join()
+    busy.join()
+
+    leaves = {stack.rsplit(';', 1)[-1] for stack in sampler.stacks}
+    assert any(leaf.endswith(':_spin') for leaf in leaves)
+    assert 'threading.py:wait' not in leaves
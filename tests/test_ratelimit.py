@@ -0,0 +1,32 @@
+import datetime
+import email.utils
+
+from newsletter import config
+from newsletter.ratelimit import parse_retry_after
+
+
+def test_delta_seconds():
+    assert parse_retry_after('30') == 30
+
+
+def test_http_date_with_unknown_zone_is_utc():
+    # "-0000" makes parsedate_to_datetime return a naive datetime
+    when = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=60)
+    value = email.utils.format_datetime(when.replace(tzinfo=None))
+    assert value.endswith('-0000')
+    assert 50 <= parse_retry_after(value) <= 60
+
+
+def test_http_date_in_gmt():
+    when = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=60)
+    assert 50 <= parse_retry_after(email.utils.format_datetime(when, usegmt=True)) <= 60
+
+
+def test_past_date_and_cap():
+    assert parse_retry_after('Mon, 01 Jan 2001 00:00:00 GMT') == 0
+    assert parse_retry_after(str(10 * config.MAX_RETRY_AFTER_SECONDS)) == config.MAX_RETRY_AFTER_SECONDS
+
+
+def test_unparseable():
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(None) is None
@@ -0,0 +1,81 @@
+from newsletter import config, fetchers, ingest, resolver
+from newsletter.history import load_history
+
+from conftest import make_feed, NEWS_TOPICS
+
+
+def test_resolution_caches_redirects_and_terminal_links(state_dir, stand_in_server, monkeypatch):
+    base = stand_in_server.url
+    stand_in_server.routes.update({
+        '/redirect': (302, {'Location': f"{base}/article"}, b''),
+        '/article': (200, {}, b'publisher page'),
+        '/landing': (200, {}, b'no redirect'),
+        '/broken': (500, {}, b''),
+    })
+    monkeypatch.setattr(config, 'REDIRECT_HOSTS', {'127.0.0.1'})
+    resolver.start_run()
+
+    urls = [f"{base}/redirect", f"{base}/landing", f"{base}/broken"]
+    assert resolver.resolve_urls(urls, now=1000) == {
+        f"{base}/redirect": f"{base}/article",
+        f"{base}/landing": f"{base}/landing",
+        f"{base}/broken": f"{base}/broken",
+    }
+    stats = resolver.resolver_stats()
+    assert (stats['resolved'], stats['terminal'], stats['failed']) == (1, 1, 1)
+
+    # Past the failure TTL only the error is looked up again
+    later = 1000 + config.URL_CACHE_FAILURE_TTL_SECONDS + 1
+    stand_in_server.requests.clear()
+    resolver.resolve_urls(urls, now=later)
+    assert {path for _, path, _ in stand_in_server.requests} == {'/broken'}
+
+
+def test_lookups_are_capped_per_run(state_dir, stand_in_server, monkeypatch):
+    base = stand_in_server.url
+    monkeypatch.setattr(config, 'REDIRECT_HOSTS', {'127.0.0.1'})
+    monkeypatch.setattr(config, 'URL_RESOLVE_BUDGET', 2)
+    resolver.start_run()
+    for i in range(3):
+        stand_in_server.routes[f"/page{i}"] = (200, {}, b'')
+
+    urls = [f"{base}/page{i}" for i in range(3)]
+    assert resolver.resolve_urls(urls) == {url: url for url in urls}
+    assert resolver.resolver_stats()['over_budget'] == 1
+    assert len(stand_in_server.requests) == 2
+
+
+def test_links_over_budget_are_resolved_on_a_later_run(state_dir, stand_in_server, monkeypatch):
+    base = stand_in_server.url
+    feed_url = 'https://feeds.test/news'
+    monkeypatch.setattr(config, 'NEWS_FEEDS', [feed_url])
+    monkeypatch.setattr(config, 'REDIRECT_HOSTS', {'127.0.0.1'})
+    monkeypatch.setattr(config, 'URL_RESOLVE_BUDGET', 2)
+    feed = make_feed("News", [{
+        'id': f"news-{i}",
+        'title': f"{NEWS_TOPICS[i]} - Source",
+        'link': f"{base}/r{i}",
+        'summary': "A story about artificial intelligence.",
+        'published': f"Mon, 0{i + 1} Jun 2026 00:00:00 GMT",
+    } for i in range(4)])
+    monkeypatch.setattr(fetchers, 'fetch_feed_with_retry', lambda url, **kwargs: feed)
+    for i in range(4):
+        stand_in_server.routes[f"/r{i}"] = (302, {'Location': f"{base}/article{i}"}, b'')
+        stand_in_server.routes[f"/article{i}"] = (200, {}, b'')
+
+    resolver.start_run()
+    first = fetchers.fetch_ai_news(load_history())
+    assert sum('canonical_url' in item for item in first) == 2
+    assert resolver.resolver_stats()['over_budget'] == 2
+
+    resolver.start_run()
+    second = fetchers.fetch_ai_news(load_history())
+    assert ingest.ingest_stats()['carried'] >= 4
+    assert resolver.resolver_stats()['lookups'] == 2
+    assert sorted(item['canonical_url'] for item in second) == [f"{base}/article{i}" for i in range(4)]
+
+    # The resolved links are stored, so a third run carries them without lookups
+    resolver.start_run()
+    third = fetchers.fetch_ai_news(load_history())
+    assert all('canonical_url' in item for item in third)
+    assert resolver.resolver_stats().get('lookups', 0) == 0
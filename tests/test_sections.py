@@ -0,0 +1,36 @@
+from newsletter import config, sections
+from newsletter.sections import render_section, render_sections, assemble, section_key
+
+
+def _headline(title):
+    return ('headline', {'emoji': '📰', 'title': title})
+
+
+def test_render_cache_hits_and_misses(state_dir, monkeypatch):
+    monkeypatch.setattr(sections, '_stats', sections.collections.Counter())
+    specs = [_headline("One"), _headline("Two"), ('footer', {})]
+
+    first = assemble(render_sections(specs))
+    assert sections.render_cache_stats() == {'misses': 3}
+
+    second = assemble(render_sections(specs))
+    assert sections.render_cache_stats() == {'misses': 3, 'hits': 3}
+    assert second == first
+
+    # The cache survives a save and reload
+    sections.save_render_cache()
+    monkeypatch.setattr(sections, '_cache', None)
+    assert assemble(render_sections(specs)) == first
+    assert sections.render_cache_stats()['hits'] == 6
+
+
+def test_render_cache_evicts_least_recently_used(state_dir, monkeypatch):
+    monkeypatch.setattr(config, 'RENDER_CACHE_MAX_ENTRIES', 2)
+    a, b, c = _headline("A"), _headline("B"), _headline("C")
+
+    render_section(*a)
+    render_section(*b)
+    render_section(*a)  # a is now the most recently used
+    render_section(*c)
+
+    assert list(sections._cache) == [section_key(*a), section_key(*c)]
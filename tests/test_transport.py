@@ -0,0 +1,25 @@
+import json
+
+from newsletter import config
+from newsletter.formatter import DocFormatter
+from newsletter.gdoc import write_to_doc
+from newsletter.transport import get_docs_service
+
+
+def test_docs_service_talks_to_stand_in_endpoint(state_dir, stand_in_server, monkeypatch):
+    monkeypatch.setattr(config, 'DOCS_API_ENDPOINT', stand_in_server.url)
+    stand_in_server.routes['/v1/documents/doc:batchUpdate'] = (
+        200, {'Content-Type': 'application/json'}, b'{"documentId": "doc", "replies": []}',
+    )
+    fmt = DocFormatter()
+    fmt.add_heading("Return of the Jed(AI)", 1)
+    fmt.add_link("Read more", "https://example.com/a")
+    payload = fmt.build_payload()
+
+    docs = get_docs_service(creds_dict=None)
+    assert write_to_doc(docs, 'doc', payload)
+
+    [(method, path, body)] = stand_in_server.requests
+    assert (method, path.split('?')[0]) == ('POST', '/v1/documents/doc:batchUpdate')
+    assert body == payload
+    assert json.loads(body)['requests'][0]['insertText']['text'].startswith("Return of the Jed(AI)")
@@ -3,21 +3,82 @@
 
 All logic lives in the newsletter/ package. This file is kept as
 the entry point for backward compatibility with the GitHub Actions workflow.
+
+Pass --dry-run PATH (or set NEWSLETTER_DRY_RUN=PATH) to fetch and render
+without touching the Google Doc: the request payload and its size
+statistics are written to PATH, and no state is saved.
+
+Pass --rollback to restore the edition that the last publish replaced.
+
+Each stage (fetch, select, render, publish) is checkpointed. After a failed
+run, --resume continues after the last completed stage, so a failed publish
+is retried without refetching; --stage NAME runs a single stage from the
+checkpoints of the stages before it. The exit status is 1 if the run
+failed, so the workflow can retry it with --resume.
+
+All state is packed into the warm-start bundle (config.STATE_BUNDLE_FILE)
+at the end of the run (except for a dry run).
+
+Profiling is opt-in:
+    --profile cprofile|sample   CPU profile per pipeline stage
+    --tracemalloc               memory snapshot diff per stage
+    --profile-dir PATH          where profile files are written
+The same can be enabled with NEWSLETTER_PROFILE, NEWSLETTER_TRACEMALLOC and
+NEWSLETTER_PROFILE_DIR.
 """
 
+import os
+import sys
 import json
+import argparse
 import datetime
 
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Return of the Jed(AI) newsletter agent")
+    parser.add_argument('--dry-run', metavar='PATH', default=os.environ.get('NEWSLETTER_DRY_RUN'),
+                        help="Write the Docs payload to PATH instead of publishing")
+    parser.add_argument('--rollback', action='store_true',
+                        help="Restore the previous edition instead of publishing a new one")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue today's edition after its last checkpointed stage")
+    parser.add_argument('--stage', choices=['fetch', 'select', 'render', 'publish'],
+                        help="Run only this stage, from the checkpoints of the stages before it")
+    parser.add_argument('--profile', choices=['cprofile', 'sample'], help="Profile each pipeline stage")
+    parser.add_argument('--tracemalloc', action='store_true', help="Record memory allocations per stage")
+    parser.add_argument('--profile-dir', help="Directory for profile output files")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = _parse_args()
     try:
         from newsletter.agent import NewsletterAgent
+        from newsletter.profiling import RunProfiler
+        from newsletter.log import shutdown_logging
+        from newsletter.bundle import save_bundle
 
-        agent = NewsletterAgent()
-        result = agent.run()
+        profiler = None
+        if args.profile or args.tracemalloc or args.profile_dir:
+            env_profiler = RunProfiler.from_env()
+            profiler = RunProfiler(
+                mode=args.profile or env_profiler.mode,
+                trace_memory=args.tracemalloc or env_profiler.trace_memory,
+                out_dir=args.profile_dir or env_profiler.out_dir,
+            )
+
+        agent = NewsletterAgent(profiler=profiler, dry_run=args.dry_run)
+        result = agent.rollback() if args.rollback else agent.run(resume=args.resume, stage=args.stage)
+        # Pack all state into the bundle the workflow caches for the next run
+        if not args.dry_run:
+            result["state_bundle"] = save_bundle(history=agent.history)
+        shutdown_logging()
         print(json.dumps(result, indent=2))
     except Exception as e:
-        print(json.dumps({
+        result = {
             "status": "error",
             "message": str(e),
             "timestamp": datetime.datetime.now().isoformat(),
-        }, indent=2))
+        }
+        print(json.dumps(result, indent=2))
+    sys.exit(1 if result["status"] == "error" else 0)